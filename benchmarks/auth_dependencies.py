@@ -0,0 +1,94 @@
+"""Замер процессорного времени цепочки зависимостей авторизации с кешем JWT и без него.
+
+Цепочка `is_authorized` → `get_current_user` вызывается напрямую, как это делает FastAPI,
+с одним и тем же access-токеном — так ведут себя клиенты, повторно использующие токен до
+истечения срока. Замеряется процессорное время (без ожидания ответа базы данных) и полное
+время одного вызова; отдельно — только проверка токена.
+
+Запуск (настройки подключения берутся из `.env`, в базе создаётся пользователь-покупатель):
+    uv run python -m benchmarks.auth_dependencies --iterations 5000
+"""
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+from collections import defaultdict
+
+from benchmarks.search_languages import percentile
+from sqlalchemy import select
+
+from src.api.auth import create_token, get_current_user, hash_password, is_authorized
+from src.config import get_settings
+from src.models import User as UserModel
+from src.services.auth.tokens import DecodedTokenCache
+from src.services.database.postgresql import PostgreSQLDatabase
+from src.utils import routes
+
+BENCH_EMAIL = 'bench-auth@loadtest.io'
+MODES = {'uncached': 0, 'cached': 10_000}
+
+
+async def benchmark(iterations: int) -> dict[tuple[str, str], list[float]]:
+    """Задержки в микросекундах по режиму кеша и виду замера (cpu, wall, decode)."""
+    settings = get_settings()
+    database = PostgreSQLDatabase(settings=settings)
+    await database.startup()
+    assert database.session_factory is not None
+
+    timings: dict[tuple[str, str], list[float]] = defaultdict(list)
+    try:
+        async with database.session_factory() as session:
+            user = await session.scalar(select(UserModel).where(UserModel.email == BENCH_EMAIL))
+            if user is None:
+                user = UserModel(email=BENCH_EMAIL, hashed_password=hash_password('bench-password'), role='buyer')
+                session.add(user)
+                await session.commit()
+            token = create_token(data={'sub': user.email, 'role': user.role, 'id': user.id}, access=True)
+            check_role = is_authorized(['buyer'])
+
+            for mode, cache_size in MODES.items():
+                routes.decoded_tokens = DecodedTokenCache(max_size=cache_size)
+                for iteration in range(-iterations // 10, iterations):
+                    cpu_started, wall_started = time.process_time(), time.perf_counter()
+                    await check_role(await get_current_user(session, token))
+                    if iteration >= 0:
+                        timings[mode, 'cpu'].append((time.process_time() - cpu_started) * 1e6)
+                        timings[mode, 'wall'].append((time.perf_counter() - wall_started) * 1e6)
+
+                    started = time.perf_counter()
+                    routes.decoded_tokens.decode(token, settings.api_secret_key, settings.api_jwt_encode_algorithm)
+                    if iteration >= 0:
+                        timings[mode, 'decode'].append((time.perf_counter() - started) * 1e6)
+    finally:
+        await database.teardown()
+    return timings
+
+
+def render_report(timings: dict[tuple[str, str], list[float]]) -> str:
+    """Таблица p50/p95/среднего по режимам; процессорное время — суммарное по всем вызовам."""
+    lines = [f'{"mode":<10}{"metric":<8}{"n":>7}{"p50, us":>10}{"p95, us":>10}{"mean, us":>10}']
+    for mode in MODES:
+        for metric in ('cpu', 'wall', 'decode'):
+            values = timings[mode, metric]
+            lines.append(
+                f'{mode:<10}{metric:<8}{len(values):>7}{percentile(values, 0.5):>10.1f}'
+                f'{percentile(values, 0.95):>10.1f}{statistics.fmean(values):>10.1f}',
+            )
+    uncached, cached = sum(timings['uncached', 'cpu']), sum(timings['cached', 'cpu'])
+    lines.append(f'cpu saving: {(1 - cached / uncached) * 100:.1f}%' if uncached else 'cpu saving: n/a')
+    return '\n'.join(lines)
+
+
+def main() -> None:
+    """Точка входа бенчмарка."""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--iterations', type=int, default=2000, help='Количество вызовов цепочки в каждом режиме')
+    args = parser.parse_args()
+
+    timings = asyncio.run(benchmark(args.iterations))
+    sys.stdout.write(render_report(timings) + '\n')
+
+
+if __name__ == '__main__':
+    main()
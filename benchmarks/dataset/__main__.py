@@ -0,0 +1,277 @@
+"""Генерация синтетического набора данных production-масштаба.
+
+Заполняет таблицы моделей `src.models`: дерево категорий заданной глубины, пользователей
+(администратор, продавцы, покупатели), товары с русскими и английскими названиями, отзывы
+и заказы с распределением Ципфа по товарам и корзины части покупателей. Данные
+детерминированы по `--seed`, поэтому замеры на них воспроизводимы.
+
+Строки генерируются частями в нескольких процессах и загружаются через COPY. Вторичные индексы
+на время загрузки удаляются и затем создаются заново параллельно; после загрузки пересчитываются
+рейтинг и число продаж товаров, сдвигаются последовательности ID и обновляется статистика.
+
+Схема должна быть создана заранее (`alembic upgrade head`), настройки подключения берутся из `.env`:
+    uv run python -m benchmarks.dataset --scale 0.1 --truncate
+    uv run python -m benchmarks.dataset --products 1000000 --reviews 5000000 --workers 8
+"""
+import argparse
+import asyncio
+import os
+import random
+import sys
+import time
+from collections import Counter
+from collections.abc import Callable, Sequence
+from concurrent.futures import ProcessPoolExecutor
+from datetime import timedelta
+from typing import Any
+
+import asyncpg
+import bcrypt
+from benchmarks.dataset import generators
+from benchmarks.dataset.generators import DatasetSpec, Row
+
+from src.config import get_settings
+
+DEFAULT_SIZES = {'users': 200_000, 'sellers': 2_000, 'products': 1_000_000, 'reviews': 3_000_000, 'orders': 500_000}
+DEFAULT_PASSWORD = 'password'
+BCRYPT_ALPHABET = './ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789'
+BCRYPT_ROUNDS = 12
+TABLES = ('categories', 'users', 'products', 'reviews', 'cart_items', 'orders', 'order_items')
+# агрегаты аналитики очищаются каскадно вместе с пользователями и строятся заново после загрузки
+ROLLUP_TABLES = ('seller_daily_sales', 'seller_product_daily_sales')
+COLUMNS = {
+    'categories': ('id', 'name', 'parent_id', 'is_active'),
+    'users': ('id', 'email', 'hashed_password', 'is_active', 'role'),
+    'products': (
+        'id', 'name', 'description', 'price', 'image_url', 'stock', 'is_active', 'category_id', 'seller_id', 'created_at',
+    ),
+    'reviews': ('id', 'user_id', 'product_id', 'comment', 'comment_date', 'grade', 'is_active'),
+    'cart_items': ('id', 'user_id', 'product_id', 'quantity', 'created_at', 'updated_at'),
+    'orders': ('id', 'user_id', 'status', 'total_amount', 'created_at', 'updated_at'),
+    'order_items': ('id', 'order_id', 'product_id', 'quantity', 'unit_price', 'total_price', 'order_created_at'),
+}
+GENERATORS: dict[str, Callable[[DatasetSpec, int, int], list[Row]]] = {
+    'users': generators.user_rows,
+    'products': generators.product_rows,
+    'reviews': generators.review_rows,
+    'cart_items': generators.cart_rows,
+}
+SECONDARY_INDEXES_QUERY = """
+SELECT index_class.relname, pg_get_indexdef(pg_index.indexrelid)
+FROM pg_index
+JOIN pg_class AS index_class ON index_class.oid = pg_index.indexrelid
+JOIN pg_class AS table_class ON table_class.oid = pg_index.indrelid
+WHERE table_class.relname = any($1::text[])
+  AND NOT EXISTS (SELECT 1 FROM pg_constraint WHERE pg_constraint.conindid = pg_index.indexrelid)
+"""
+POST_LOAD_STATEMENTS = (
+    """
+    UPDATE products SET rating = stats.rating
+    FROM (SELECT product_id, avg(grade) AS rating FROM reviews WHERE is_active GROUP BY product_id) AS stats
+    WHERE products.id = stats.product_id
+    """,
+    """
+    UPDATE products SET sales_count = stats.sales_count
+    FROM (SELECT product_id, sum(quantity) AS sales_count FROM order_items GROUP BY product_id) AS stats
+    WHERE products.id = stats.product_id
+    """,
+    """
+    INSERT INTO seller_product_daily_sales (seller_id, day, product_id, revenue, units)
+    SELECT products.seller_id, (items.order_created_at AT TIME ZONE 'UTC')::date, items.product_id,
+           sum(items.total_price), sum(items.quantity)
+    FROM order_items AS items
+    JOIN products ON products.id = items.product_id
+    GROUP BY 1, 2, 3
+    """,
+    """
+    INSERT INTO seller_daily_sales (seller_id, day, revenue, units, orders)
+    SELECT products.seller_id, (items.order_created_at AT TIME ZONE 'UTC')::date,
+           sum(items.total_price), sum(items.quantity), count(DISTINCT items.order_id)
+    FROM order_items AS items
+    JOIN products ON products.id = items.product_id
+    GROUP BY 1, 2
+    """,
+    # рекомендации очищены вместе с товарами; приложение пересчитает их по всей истории заказов
+    "UPDATE order_watermarks SET order_created_at = NULL, order_id = NULL",
+)
+
+
+def database_dsn() -> str:
+    """DSN asyncpg по настройкам приложения."""
+    settings = get_settings()
+    return (
+        f'postgresql://{settings.postgres_user}:{settings.postgres_password}'
+        f'@{settings.postgres_host}:{settings.postgres_port}/{settings.postgres_db}'
+    )
+
+
+async def _copy(dsn: str, tables: Sequence[tuple[str, list[Row]]]) -> None:
+    connection = await asyncpg.connect(dsn)
+    try:
+        async with connection.transaction():
+            for table, rows in tables:
+                if rows:
+                    await connection.copy_records_to_table(table, records=rows, columns=COLUMNS[table])
+    finally:
+        await connection.close()
+
+
+def load_chunk(dsn: str, spec: DatasetSpec, table: str, start: int, stop: int) -> dict[str, int]:
+    """Генерация и загрузка одной части таблицы в отдельном процессе; возвращает число строк по таблицам."""
+    if table == 'orders':
+        orders, items = generators.order_rows(spec, start, stop)
+        asyncio.run(_copy(dsn, [('orders', orders), ('order_items', items)]))
+        return {'orders': len(orders), 'order_items': len(items)}
+    rows = GENERATORS[table](spec, start, stop)
+    asyncio.run(_copy(dsn, [(table, rows)]))
+    return {table: len(rows)}
+
+
+def _chunks(total: int, chunk_size: int) -> list[tuple[int, int]]:
+    """Диапазоны ID с границами, кратными размеру блока генератора."""
+    chunk_size = max(1, chunk_size // generators.BLOCK_SIZE) * generators.BLOCK_SIZE
+    return [(start, min(start + chunk_size, total + 1)) for start in range(1, total + 1, chunk_size)]
+
+
+def _run_stage(pool: ProcessPoolExecutor, dsn: str, spec: DatasetSpec, jobs: dict[str, int], chunk_size: int) -> None:
+    """Параллельная загрузка таблиц одного этапа (таблицы этапа не ссылаются друг на друга)."""
+    started = time.perf_counter()
+    futures = [
+        pool.submit(load_chunk, dsn, spec, table, start, stop)
+        for table, total in jobs.items()
+        for start, stop in _chunks(total, chunk_size)
+    ]
+    loaded: Counter[str] = Counter()
+    for future in futures:
+        loaded.update(future.result())
+    elapsed = time.perf_counter() - started
+    report = ', '.join(f'{table}: {rows}' for table, rows in loaded.items())
+    sys.stdout.write(f'loaded {report} in {elapsed:.1f}s\n')
+
+
+async def prepare_tables(dsn: str, truncate: bool, keep_indexes: bool) -> list[tuple[str, str]]:
+    """Проверка или очистка таблиц и удаление вторичных индексов; возвращает их определения."""
+    connection = await asyncpg.connect(dsn)
+    try:
+        if truncate:
+            await connection.execute(f'TRUNCATE {", ".join(TABLES)} RESTART IDENTITY CASCADE')
+        else:
+            for table in TABLES:
+                if await connection.fetchval(f'SELECT EXISTS (SELECT 1 FROM {table})'):
+                    msg = f'Table {table} is not empty, pass --truncate to replace existing data'
+                    raise SystemExit(msg)
+        await connection.execute(
+            'SELECT create_order_partitions($1, now())',
+            generators.NOW - timedelta(days=generators.HISTORY_DAYS + 1),
+        )
+        if keep_indexes:
+            return []
+        # индекс секционированной таблицы описывается как ON ONLY и без этой замены не создал бы индексы секций
+        indexes = [
+            (name, definition.replace(' ON ONLY ', ' ON '))
+            for name, definition in await connection.fetch(SECONDARY_INDEXES_QUERY, list(TABLES))
+        ]
+        for name, _ in indexes:
+            await connection.execute(f'DROP INDEX IF EXISTS "{name}"')
+        return indexes
+    finally:
+        await connection.close()
+
+
+async def finalize(dsn: str, indexes: list[tuple[str, str]], workers: int) -> None:
+    """Пересчёт денормализованных полей, восстановление индексов, последовательностей и статистики."""
+    connection = await asyncpg.connect(dsn)
+    try:
+        for statement in POST_LOAD_STATEMENTS:
+            await connection.execute(statement)
+
+        started = time.perf_counter()
+        semaphore = asyncio.Semaphore(workers)
+
+        async def create_index(definition: str) -> None:
+            async with semaphore:
+                index_connection = await asyncpg.connect(dsn)
+                try:
+                    await index_connection.execute("SET maintenance_work_mem = '256MB'")
+                    await index_connection.execute(definition)
+                finally:
+                    await index_connection.close()
+
+        await asyncio.gather(*(create_index(definition) for _, definition in indexes))
+        if indexes:
+            sys.stdout.write(f'rebuilt {len(indexes)} indexes in {time.perf_counter() - started:.1f}s\n')
+
+        for table in TABLES:
+            await connection.execute(
+                f"SELECT setval(pg_get_serial_sequence('{table}', 'id'), coalesce(max(id), 0) + 1, false) FROM {table}",
+            )
+        await connection.execute(f'VACUUM ANALYZE {", ".join(TABLES + ROLLUP_TABLES)}')
+    finally:
+        await connection.close()
+
+
+def deterministic_password_hash(password: str, seed: int) -> str:
+    """Хеш bcrypt с солью, зависящей от seed, чтобы набор данных полностью определялся параметрами."""
+    rng = random.Random(f'{seed}:password')
+    # последний символ соли кодирует только 2 бита, допустимы лишь '.', 'O', 'e' и 'u'
+    salt = ''.join(rng.choices(BCRYPT_ALPHABET, k=21)) + rng.choice('.Oeu')
+    return bcrypt.hashpw(password.encode(), f'$2b${BCRYPT_ROUNDS}${salt}'.encode()).decode()
+
+
+def build_spec(args: argparse.Namespace) -> DatasetSpec:
+    """Параметры набора данных с учётом масштаба и явно заданных размеров."""
+    sizes: dict[str, Any] = {
+        name: getattr(args, name) if getattr(args, name) is not None else max(1, int(default * args.scale))
+        for name, default in DEFAULT_SIZES.items()
+    }
+    sizes['users'] = max(sizes['users'], sizes['sellers'] + 2)
+    return DatasetSpec(
+        seed=args.seed,
+        cart_share=args.cart_share,
+        category_roots=args.category_roots,
+        category_depth=args.category_depth,
+        category_branching=args.category_branching,
+        zipf_exponent=args.zipf_exponent,
+        hashed_password=deterministic_password_hash(args.password, args.seed),
+        **sizes,
+    )
+
+
+def main() -> None:
+    """Точка входа генератора."""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--seed', type=int, default=42, help='Начальное значение генератора случайных чисел')
+    parser.add_argument('--scale', type=float, default=1.0, help='Множитель размеров по умолчанию')
+    for name, default in DEFAULT_SIZES.items():
+        parser.add_argument(f'--{name}', type=int, help=f'Количество строк {name} (по умолчанию {default}, умноженное на scale)')
+    parser.add_argument('--cart-share', type=float, default=0.2, help='Доля покупателей с непустой корзиной')
+    parser.add_argument('--category-roots', type=int, default=10, help='Количество корневых категорий')
+    parser.add_argument('--category-depth', type=int, default=5, help='Глубина дерева категорий')
+    parser.add_argument('--category-branching', type=int, default=4, help='Количество подкатегорий в каждой категории')
+    parser.add_argument('--zipf-exponent', type=float, default=1.1, help='Показатель распределения Ципфа')
+    parser.add_argument('--password', default=DEFAULT_PASSWORD, help='Пароль всех сгенерированных пользователей')
+    parser.add_argument('--workers', type=int, default=os.cpu_count() or 1, help='Количество процессов генерации')
+    parser.add_argument('--chunk-size', type=int, default=50_000, help='Количество строк в одной части (округляется до 1000)')
+    parser.add_argument('--truncate', action='store_true', help='Очистить таблицы перед загрузкой')
+    parser.add_argument('--keep-indexes', action='store_true', help='Сохранять вторичные индексы во время загрузки')
+    args = parser.parse_args()
+
+    spec = build_spec(args)
+    dsn = database_dsn()
+    started = time.perf_counter()
+    indexes = asyncio.run(prepare_tables(dsn, args.truncate, args.keep_indexes))
+    asyncio.run(_copy(dsn, [('categories', generators.category_rows(spec))]))
+
+    with ProcessPoolExecutor(max_workers=args.workers) as pool:
+        _run_stage(pool, dsn, spec, {'users': spec.users}, args.chunk_size)
+        _run_stage(pool, dsn, spec, {'products': spec.products}, args.chunk_size)
+        _run_stage(
+            pool, dsn, spec, {'reviews': spec.reviews, 'cart_items': spec.users, 'orders': spec.orders}, args.chunk_size,
+        )
+
+    asyncio.run(finalize(dsn, indexes, args.workers))
+    sys.stdout.write(f'dataset ready in {time.perf_counter() - started:.1f}s\n')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,241 @@
+"""Детерминированная генерация строк таблиц по частям.
+
+Каждый блок из `BLOCK_SIZE` ID генерируется своим генератором случайных чисел, зависящим только
+от seed, таблицы и номера блока, поэтому результат не зависит ни от числа параллельных процессов,
+ни от размера частей (границы частей должны быть кратны `BLOCK_SIZE`).
+Значения, которые нужны в нескольких таблицах (цена и активность товара), вычисляются
+хеш-функцией от ID и не требуют обмена данными между процессами.
+"""
+import bisect
+import hashlib
+import itertools
+import math
+import random
+from collections.abc import Iterator
+from dataclasses import dataclass
+from datetime import UTC, datetime, timedelta
+from decimal import Decimal
+from functools import cache
+from statistics import NormalDist
+from typing import Any
+
+from benchmarks.dataset import text
+
+BLOCK_SIZE = 1000
+MAX_CART_ITEMS = 5
+MAX_ORDER_ITEMS = 5
+PRICE_MEDIAN = 1500
+PRICE_SIGMA = 1.2
+MAX_PRICE = Decimal('99999999.99')
+INACTIVE_PRODUCT_SHARE = 0.03
+OUT_OF_STOCK_SHARE = 0.1
+INACTIVE_REVIEW_SHARE = 0.02
+COMMENT_SHARE = 0.7
+GRADE_WEIGHTS = (5, 5, 10, 30, 50)
+ORDER_ITEM_WEIGHTS = (50, 25, 12, 8, 5)
+QUANTITY_WEIGHTS = (80, 15, 5)
+HISTORY_DAYS = 3 * 365
+NOW = datetime(2026, 1, 1, tzinfo=UTC)
+
+Row = tuple[Any, ...]
+
+
+@dataclass(frozen=True)
+class DatasetSpec:
+    """Размеры набора данных и параметры распределений.
+
+    Раскладка ID пользователей: 1 — администратор, затем продавцы, затем покупатели.
+    """
+
+    seed: int
+    users: int
+    sellers: int
+    products: int
+    reviews: int
+    orders: int
+    cart_share: float
+    category_roots: int
+    category_depth: int
+    category_branching: int
+    zipf_exponent: float
+    hashed_password: str
+
+    @property
+    def first_buyer_id(self) -> int:
+        """ID первого покупателя."""
+        return self.sellers + 2
+
+
+def _rng(spec: DatasetSpec, table: str, block: int) -> random.Random:
+    return random.Random(f'{spec.seed}:{table}:{block}')
+
+
+def _seeded_ids(spec: DatasetSpec, table: str, start: int, stop: int) -> Iterator[tuple[random.Random, int]]:
+    """ID из [start, stop) вместе с генератором их блока."""
+    rng = _rng(spec, table, (start - 1) // BLOCK_SIZE)
+    for row_id in range(start, stop):
+        if row_id != start and (row_id - 1) % BLOCK_SIZE == 0:
+            rng = _rng(spec, table, (row_id - 1) // BLOCK_SIZE)
+        yield rng, row_id
+
+
+def _unit(spec: DatasetSpec, key: str, index: int) -> float:
+    """Псевдослучайное число из [0, 1), зависящее только от seed, ключа и индекса."""
+    digest = hashlib.blake2b(f'{spec.seed}:{key}:{index}'.encode(), digest_size=8).digest()
+    return int.from_bytes(digest) / 2**64
+
+
+def product_price(spec: DatasetSpec, product_id: int) -> Decimal:
+    """Цена товара с логнормальным распределением."""
+    z = NormalDist().inv_cdf(min(max(_unit(spec, 'price', product_id), 1e-9), 1 - 1e-9))
+    price = Decimal(PRICE_MEDIAN * math.exp(PRICE_SIGMA * z)).quantize(Decimal('0.01'))
+    return min(max(price, Decimal('1.00')), MAX_PRICE)
+
+
+def _timestamp(rng: random.Random) -> datetime:
+    """Момент времени за последние годы со смещением к недавним датам."""
+    return NOW - timedelta(days=HISTORY_DAYS * rng.random() ** 2, seconds=rng.randint(0, 86399))
+
+
+class ZipfSampler:
+    """Выбор элементов по закону Ципфа: вес элемента ранга r равен 1 / r^s.
+
+    Ранги перемешаны детерминированно, чтобы популярные элементы не совпадали с младшими ID.
+    """
+
+    def __init__(self, items: list[int], exponent: float, rng: random.Random) -> None:
+        self._items = items[:]
+        rng.shuffle(self._items)
+        self._cum_weights = list(itertools.accumulate(1 / rank**exponent for rank in range(1, len(items) + 1)))
+
+    def sample(self, rng: random.Random) -> int:
+        """Один элемент."""
+        index = bisect.bisect(self._cum_weights, rng.random() * self._cum_weights[-1])
+        return self._items[min(index, len(self._items) - 1)]
+
+
+@cache
+def _sampler(spec: DatasetSpec, population: str) -> ZipfSampler:
+    """Семплер, общий для всех частей в пределах процесса."""
+    rng = random.Random(f'{spec.seed}:{population}:ranks')
+    if population == 'products':
+        return ZipfSampler(list(range(1, spec.products + 1)), spec.zipf_exponent, rng)
+    if population == 'sellers':
+        return ZipfSampler(list(range(2, spec.first_buyer_id)), spec.zipf_exponent, rng)
+    if population == 'buyers':
+        return ZipfSampler(list(range(spec.first_buyer_id, spec.users + 1)), spec.zipf_exponent / 2, rng)
+    return ZipfSampler(leaf_category_ids(spec), spec.zipf_exponent, rng)
+
+
+def category_rows(spec: DatasetSpec) -> list[Row]:
+    """Дерево категорий: `category_roots` корней и `category_branching` потомков на каждом уровне."""
+    rng = random.Random(f'{spec.seed}:categories')
+    rows: list[Row] = []
+    level: list[int | None] = [None] * spec.category_roots
+    for _ in range(spec.category_depth):
+        next_level: list[int | None] = []
+        for parent_id in level:
+            category_id = len(rows) + 1
+            rows.append((category_id, text.category_name(rng, category_id), parent_id, True))
+            next_level.extend([category_id] * spec.category_branching)
+        level = next_level
+    return rows
+
+
+@cache
+def leaf_category_ids(spec: DatasetSpec) -> list[int]:
+    """ID категорий без потомков, к которым привязываются товары."""
+    rows = category_rows(spec)
+    parents = {row[2] for row in rows}
+    return [row[0] for row in rows if row[0] not in parents]
+
+
+def user_rows(spec: DatasetSpec, start: int, stop: int) -> list[Row]:
+    """Пользователи с ID из [start, stop)."""
+    rows = []
+    for user_id in range(start, stop):
+        role = 'admin' if user_id == 1 else 'seller' if user_id < spec.first_buyer_id else 'buyer'
+        rows.append((user_id, f'user{user_id}@dataset.io', spec.hashed_password, True, role))
+    return rows
+
+
+def product_rows(spec: DatasetSpec, start: int, stop: int) -> list[Row]:
+    """Товары с ID из [start, stop)."""
+    categories, sellers = _sampler(spec, 'categories'), _sampler(spec, 'sellers')
+    rows = []
+    for rng, product_id in _seeded_ids(spec, 'products', start, stop):
+        stock = 0 if rng.random() < OUT_OF_STOCK_SHARE else rng.randint(1, 1000)
+        rows.append((
+            product_id,
+            text.product_name(rng)[:100],
+            text.product_description(rng),
+            product_price(spec, product_id),
+            None,
+            stock,
+            _unit(spec, 'active', product_id) >= INACTIVE_PRODUCT_SHARE,
+            categories.sample(rng),
+            sellers.sample(rng),
+            _timestamp(rng),
+        ))
+    return rows
+
+
+def review_rows(spec: DatasetSpec, start: int, stop: int) -> list[Row]:
+    """Отзывы с ID из [start, stop); популярные товары получают больше отзывов."""
+    products = _sampler(spec, 'products')
+    rows = []
+    for rng, review_id in _seeded_ids(spec, 'reviews', start, stop):
+        comment = text.review_comment(rng) if rng.random() < COMMENT_SHARE else None
+        rows.append((
+            review_id,
+            rng.randint(spec.first_buyer_id, spec.users),
+            products.sample(rng),
+            comment,
+            _timestamp(rng).replace(tzinfo=None),
+            rng.choices(range(1, 6), weights=GRADE_WEIGHTS)[0],
+            rng.random() >= INACTIVE_REVIEW_SHARE,
+        ))
+    return rows
+
+
+def _distinct_products(rng: random.Random, spec: DatasetSpec, count: int) -> list[int]:
+    products = _sampler(spec, 'products')
+    chosen: dict[int, None] = {}
+    while len(chosen) < min(count, spec.products):
+        chosen[products.sample(rng)] = None
+    return list(chosen)
+
+
+def cart_rows(spec: DatasetSpec, start: int, stop: int) -> list[Row]:
+    """Корзины покупателей с ID из [start, stop); ID позиции — `user_id * MAX_CART_ITEMS + номер`."""
+    rows = []
+    for rng, user_id in _seeded_ids(spec, 'carts', start, stop):
+        if user_id < spec.first_buyer_id or rng.random() >= spec.cart_share:
+            continue
+        added_at = NOW - timedelta(hours=rng.randint(0, 24 * 30))
+        for position, product_id in enumerate(_distinct_products(rng, spec, rng.randint(1, MAX_CART_ITEMS))):
+            rows.append((
+                user_id * MAX_CART_ITEMS + position, user_id, product_id, rng.choice((1, 1, 1, 2, 3)), added_at, added_at,
+            ))
+    return rows
+
+
+def order_rows(spec: DatasetSpec, start: int, stop: int) -> tuple[list[Row], list[Row]]:
+    """Заказы с ID из [start, stop) и их позиции; ID позиции — `order_id * MAX_ORDER_ITEMS + номер`."""
+    buyers = _sampler(spec, 'buyers')
+    orders: list[Row] = []
+    items: list[Row] = []
+    for rng, order_id in _seeded_ids(spec, 'orders', start, stop):
+        item_count = rng.choices(range(1, MAX_ORDER_ITEMS + 1), weights=ORDER_ITEM_WEIGHTS)[0]
+        total_amount = Decimal('0.00')
+        order_items = []
+        for position, product_id in enumerate(_distinct_products(rng, spec, item_count)):
+            quantity = rng.choices(range(1, 4), weights=QUANTITY_WEIGHTS)[0]
+            unit_price = product_price(spec, product_id)
+            total_price = min(unit_price * quantity, MAX_PRICE)
+            total_amount = min(total_amount + total_price, MAX_PRICE)
+            order_items.append((order_id * MAX_ORDER_ITEMS + position, order_id, product_id, quantity, unit_price, total_price))
+        created_at = _timestamp(rng)
+        items.extend((*item, created_at) for item in order_items)
+        orders.append((order_id, buyers.sample(rng), 'pending', total_amount, created_at, created_at))
+    return orders, items
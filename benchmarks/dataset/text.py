@@ -0,0 +1,69 @@
+"""Словари для генерации названий и описаний на русском и английском."""
+import random
+
+BRANDS = (
+    'Apple', 'Samsung', 'Xiaomi', 'Sony', 'Bosch', 'Philips', 'Lenovo', 'Asus', 'Nike', 'Adidas',
+    'Puma', 'Zara', 'Tefal', 'Braun', 'Canon', 'Logitech', 'Huawei', 'Honor', 'Redmond', 'Polaris',
+)
+EN_ADJECTIVES = (
+    'wireless', 'portable', 'smart', 'compact', 'premium', 'classic', 'lightweight', 'waterproof',
+    'ergonomic', 'professional', 'vintage', 'digital', 'gaming', 'kids', 'organic', 'red', 'black', 'white',
+)
+EN_NOUNS = (
+    'headphones', 'smartphone', 'laptop', 'watch', 'dress', 'sneakers', 'coffee machine', 'backpack',
+    'jacket', 'kettle', 'vacuum cleaner', 'camera', 'keyboard', 'mouse', 'tablet', 'speaker', 'blender',
+    'running shoes', 'phone case', 'usb-c cable', 'monitor', 'toothbrush', 'stroller', 'lego set',
+)
+RU_ADJECTIVES = (
+    'беспроводной', 'портативный', 'умный', 'компактный', 'премиальный', 'классический', 'лёгкий',
+    'водонепроницаемый', 'эргономичный', 'профессиональный', 'игровой', 'детский', 'красный', 'чёрный', 'белый',
+)
+RU_NOUNS = (
+    'наушники', 'смартфон', 'ноутбук', 'часы', 'платье', 'кроссовки', 'кофемашина', 'рюкзак', 'куртка',
+    'чайник', 'пылесос', 'фотоаппарат', 'клавиатура', 'мышь', 'планшет', 'колонка', 'блендер',
+    'чехол для телефона', 'монитор', 'зубная щётка', 'коляска', 'конструктор',
+)
+EN_PHRASES = (
+    'great value for money', 'fast delivery', 'works as expected', 'battery lasts all day',
+    'build quality could be better', 'exactly as described', 'would buy again', 'stopped working after a month',
+    'perfect gift', 'comfortable to use', 'the color is slightly different', 'highly recommend',
+)
+RU_PHRASES = (
+    'отличное соотношение цены и качества', 'быстрая доставка', 'работает как надо', 'батарея держит весь день',
+    'качество сборки могло быть лучше', 'полностью соответствует описанию', 'куплю ещё', 'сломался через месяц',
+    'отличный подарок', 'удобно пользоваться', 'цвет немного отличается', 'рекомендую',
+)
+RUSSIAN_SHARE = 0.6
+
+
+def _is_russian(rng: random.Random) -> bool:
+    return rng.random() < RUSSIAN_SHARE
+
+
+def product_name(rng: random.Random) -> str:
+    """Название товара: бренд, тип, характеристика и модель."""
+    model = f'{rng.choice("ABCDEFGHKMNPRSTX")}{rng.randint(1, 999)}'
+    if _is_russian(rng):
+        return f'{rng.choice(RU_NOUNS).capitalize()} {rng.choice(BRANDS)} {rng.choice(RU_ADJECTIVES)} {model}'
+    return f'{rng.choice(BRANDS)} {rng.choice(EN_ADJECTIVES)} {rng.choice(EN_NOUNS)} {model}'
+
+
+def product_description(rng: random.Random) -> str:
+    """Описание товара из нескольких фраз до 500 символов."""
+    if _is_russian(rng):
+        words = [*rng.sample(RU_ADJECTIVES, k=3), *rng.sample(RU_NOUNS, k=2), *rng.sample(RU_PHRASES, k=2)]
+    else:
+        words = [*rng.sample(EN_ADJECTIVES, k=3), *rng.sample(EN_NOUNS, k=2), *rng.sample(EN_PHRASES, k=2)]
+    return ', '.join(words).capitalize()[:500]
+
+
+def review_comment(rng: random.Random) -> str:
+    """Текст отзыва из одной-трёх фраз."""
+    phrases = RU_PHRASES if _is_russian(rng) else EN_PHRASES
+    return '. '.join(rng.sample(phrases, k=rng.randint(1, 3))).capitalize() + '.'
+
+
+def category_name(rng: random.Random, category_id: int) -> str:
+    """Название категории, уникальное в пределах набора данных."""
+    noun = rng.choice(RU_NOUNS) if _is_russian(rng) else rng.choice(EN_NOUNS)
+    return f'{noun.capitalize()} {category_id}'[:50]
@@ -0,0 +1,225 @@
+"""Аудит индексов: планы горячих запросов маршрутов без последовательного чтения больших таблиц.
+
+Для каждого запроса из каталога `hot_queries` — тех же, что выполняют маршруты из `src/routes`,
+с реальными ID из базы — выполняется `EXPLAIN (FORMAT JSON)` без выполнения самого запроса.
+Узел `Seq Scan` по таблице (или секции) с оценкой не меньше `--min-rows` строк считается нарушением,
+и аудит завершается с кодом 1 — так его можно запускать в CI после загрузки набора данных.
+
+Запуск (настройки подключения берутся из `.env`, база заполнена `benchmarks.dataset`):
+    uv run python -m benchmarks.index_audit --min-rows 10000
+"""
+import argparse
+import asyncio
+import json
+import sys
+from collections.abc import Iterator, Mapping
+from dataclasses import dataclass
+from datetime import UTC, datetime, timedelta
+from typing import Any, get_args
+
+from sqlalchemy import ClauseElement, desc, func, select, text, tuple_, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.config import get_settings
+from src.models import (
+    CartItem as CartItemModel,
+    Category as CategoryModel,
+    Order as OrderModel,
+    Product as ProductModel,
+    ProductRanking as ProductRankingModel,
+    ProductRecommendation as ProductRecommendationModel,
+    Review as ReviewModel,
+    SellerDailySales as SellerDailySalesModel,
+    SellerProductDailySales as SellerProductDailySalesModel,
+    User as UserModel,
+)
+from src.schemas.products import ProductSort
+from src.services.database.postgresql import PostgreSQLDatabase
+from src.services.rankings.products import BESTSELLERS_RANKING
+from src.utils.routes import _build_category_query, _build_product_order
+
+SEQ_SCAN = 'Seq Scan'
+
+
+@dataclass(frozen=True)
+class Samples:
+    """ID из базы, на которых строятся запросы: самый обсуждаемый товар, его категория и продавец, покупатель."""
+
+    product_id: int
+    category_id: int
+    seller_id: int
+    buyer_id: int
+    buyer_email: str
+
+
+@dataclass(frozen=True)
+class Violation:
+    """Последовательное чтение большой таблицы в плане запроса."""
+
+    query: str
+    relation: str
+    rows: int
+
+
+async def load_samples(session: AsyncSession) -> Samples:
+    """Выбор ID для запросов: товар с наибольшим числом отзывов и покупатель с наибольшей корзиной."""
+    product_id = await session.scalar(
+        select(ReviewModel.product_id).group_by(ReviewModel.product_id).order_by(func.count().desc()).limit(1),
+    )
+    product = await session.get(ProductModel, product_id) if product_id is not None else None
+    buyer = await session.execute(
+        select(UserModel.id, UserModel.email)
+        .join(CartItemModel, CartItemModel.user_id == UserModel.id)
+        .group_by(UserModel.id)
+        .order_by(func.count().desc())
+        .limit(1),
+    )
+    buyer_row = buyer.first()
+    if product is None or buyer_row is None:
+        msg = 'Database has no reviews or cart items, load it with benchmarks.dataset first'
+        raise RuntimeError(msg)
+    return Samples(product.id, product.category_id, product.seller_id, buyer_row.id, buyer_row.email)
+
+
+def hot_queries(samples: Samples, page_size: int) -> Iterator[tuple[str, ClauseElement]]:
+    """Запросы маршрутов в том виде, в каком их строят маршруты, с параметрами из `samples`."""
+    active_products = [ProductModel.is_active == True]
+    category_products = [*active_products, ProductModel.category_id == samples.category_id]
+    seller_products = [*active_products, ProductModel.seller_id == samples.seller_id]
+    # подсчёт всех активных товаров читает почти всю таблицу: Seq Scan для него — верный план
+    yield 'GET /products/ page', select(ProductModel.id).where(*active_products).order_by(ProductModel.id).limit(page_size)
+    for name, filters in ((' category', category_products), (' seller', seller_products)):
+        yield f'GET /products/{name} count', select(func.count()).select_from(ProductModel).where(*filters)
+        yield f'GET /products/{name} page', select(ProductModel.id).where(*filters).order_by(ProductModel.id).limit(page_size)
+    for sort in get_args(ProductSort):
+        yield f'GET /products/ sort={sort}', select(ProductModel.id).where(*category_products).order_by(
+            *_build_product_order(sort),
+        ).limit(page_size)
+
+    yield 'GET /products/{id}', select(ProductModel).where(ProductModel.id == samples.product_id, ProductModel.is_active == True)
+    yield 'GET /products/{id} category', _build_category_query(samples.category_id)
+    yield 'GET /products/{id}/related', select(ProductModel).join(
+        ProductRecommendationModel,
+        ProductRecommendationModel.related_id == ProductModel.id,
+    ).where(ProductRecommendationModel.product_id == samples.product_id, ProductModel.is_active == True).order_by(ProductRecommendationModel.rank)
+    yield 'GET /products/bestsellers', select(ProductModel).join(
+        ProductRankingModel,
+        ProductRankingModel.product_id == ProductModel.id,
+    ).where(
+        ProductRankingModel.ranking == BESTSELLERS_RANKING,
+        ProductRankingModel.category_id == samples.category_id,
+        ProductModel.is_active == True,
+    ).order_by(ProductRankingModel.rank).limit(page_size)
+    yield 'GET /categories/', select(CategoryModel).where(CategoryModel.is_active == True)
+    yield 'GET /categories/ children', select(CategoryModel.id).where(
+        CategoryModel.parent_id == samples.category_id,
+        CategoryModel.is_active == True,
+    )
+
+    yield 'GET /products/{id}/reviews/', select(ReviewModel).where(
+        ReviewModel.product_id == samples.product_id,
+        ReviewModel.is_active == True,
+    )
+    yield 'POST /reviews/ duplicate', select(ReviewModel).where(
+        ReviewModel.user_id == samples.buyer_id,
+        ReviewModel.product_id == samples.product_id,
+        ReviewModel.is_active == True,
+    )
+    average_grade = (
+        select(func.coalesce(func.avg(ReviewModel.grade), 0.0))
+        .where(ReviewModel.product_id == ProductModel.id, ReviewModel.is_active == True)
+        .scalar_subquery()
+    )
+    yield 'outbox product rating', update(ProductModel).where(ProductModel.id == samples.product_id).values(rating=average_grade)
+
+    yield 'POST /users/token', select(UserModel).where(UserModel.email == samples.buyer_email, UserModel.is_active == True)
+    yield 'GET /cart/', select(CartItemModel).where(CartItemModel.user_id == samples.buyer_id).order_by(CartItemModel.id)
+    yield 'GET /orders/', select(OrderModel.id).where(OrderModel.user_id == samples.buyer_id).order_by(
+        OrderModel.created_at.desc(),
+        OrderModel.id.desc(),
+    ).limit(page_size)
+    watermark = datetime.now(UTC) - timedelta(days=30)
+    yield 'recommendations orders batch', select(OrderModel.id, OrderModel.created_at).where(
+        OrderModel.created_at >= watermark,
+        tuple_(OrderModel.created_at, OrderModel.id) > tuple_(watermark, 0),
+    ).order_by(OrderModel.created_at, OrderModel.id).limit(5000)
+
+    date_to = datetime.now(UTC).date()
+    date_from = date_to - timedelta(days=365)
+    yield 'GET /analytics/sales', select(SellerDailySalesModel).where(
+        SellerDailySalesModel.seller_id == samples.seller_id,
+        SellerDailySalesModel.day.between(date_from, date_to),
+    )
+    yield 'GET /analytics/top-products', select(SellerProductDailySalesModel.product_id).where(
+        SellerProductDailySalesModel.seller_id == samples.seller_id,
+        SellerProductDailySalesModel.day.between(date_from, date_to),
+    ).group_by(SellerProductDailySalesModel.product_id).order_by(desc(func.sum(SellerProductDailySalesModel.units)))
+
+
+def seq_scans(plan: Mapping[str, Any]) -> Iterator[str]:
+    """Таблицы, которые план читает последовательно (включая вложенные узлы)."""
+    if plan['Node Type'] == SEQ_SCAN:
+        yield plan['Relation Name']
+    for child in plan.get('Plans', ()):
+        yield from seq_scans(child)
+
+
+async def audit(page_size: int, min_rows: int) -> tuple[list[str], list[Violation]]:
+    """Проверка планов всех горячих запросов; возвращает имена проверенных запросов и нарушения."""
+    database = PostgreSQLDatabase(settings=get_settings())
+    await database.startup()
+    assert database.session_factory is not None
+
+    checked: list[str] = []
+    violations: list[Violation] = []
+    try:
+        async with database.session_factory() as session:
+            relation_rows = await session.execute(
+                text("SELECT relname, reltuples::bigint FROM pg_class WHERE relkind = 'r' AND relnamespace = 'public'::regnamespace"),
+            )
+            table_rows = {row[0]: row[1] for row in relation_rows.all()}
+            samples = await load_samples(session)
+            dialect = session.get_bind().dialect
+            for name, statement in hot_queries(samples, page_size):
+                compiled = statement.compile(dialect=dialect, compile_kwargs={'literal_binds': True})
+                result = await session.execute(text(f'EXPLAIN (FORMAT JSON) {compiled}'))
+                raw_plan = result.scalar_one()
+                plan = json.loads(raw_plan) if isinstance(raw_plan, str) else raw_plan
+                checked.append(name)
+                violations.extend(
+                    Violation(name, relation, table_rows.get(relation, 0))
+                    for relation in seq_scans(plan[0]['Plan'])
+                    if table_rows.get(relation, 0) >= min_rows
+                )
+            await session.rollback()
+    finally:
+        await database.teardown()
+    return checked, violations
+
+
+def render_report(checked: list[str], violations: list[Violation], min_rows: int) -> str:
+    """Список проверенных запросов с отметкой о последовательном чтении больших таблиц."""
+    flagged = {violation.query: violation for violation in violations}
+    lines = [f'{"query":<40}{"result":<10}']
+    for name in checked:
+        violation = flagged.get(name)
+        result = 'ok' if violation is None else f'Seq Scan on {violation.relation} (~{violation.rows} rows)'
+        lines.append(f'{name:<40}{result}')
+    lines.append(f'{len(checked)} queries checked, {len(violations)} sequential scans over tables with >= {min_rows} rows')
+    return '\n'.join(lines)
+
+
+def main() -> None:
+    """Точка входа аудита."""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--page-size', type=int, default=20, help='Размер страницы выдачи')
+    parser.add_argument('--min-rows', type=int, default=10_000, help='Оценка числа строк, с которой таблица считается большой')
+    args = parser.parse_args()
+
+    checked, violations = asyncio.run(audit(args.page_size, args.min_rows))
+    sys.stdout.write(render_report(checked, violations, args.min_rows) + '\n')
+    sys.exit(1 if violations else 0)
+
+
+if __name__ == '__main__':
+    main()
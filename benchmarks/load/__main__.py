@@ -0,0 +1,154 @@
+"""Нагрузочный тест API на смесях пользовательских сценариев.
+
+По умолчанию приложение `src.api.main` запускается в том же процессе (через ASGI-транспорт httpx)
+поверх временного кластера PostgreSQL, который создаётся и удаляется автоматически; для каждого
+маршрута при этом считается и среднее число SQL-запросов на запрос. Если указан `--base-url`,
+нагрузка подаётся по HTTP на уже запущенный сервер.
+
+При запуске в процессе ограничение частоты запросов и защита от перегрузки отключаются (все виртуальные
+пользователи приходят с одного адреса), если не указан `--rate-limits`.
+
+Перед прогоном через API создаются категории, товары и аккаунты покупателей (по одному
+на виртуального пользователя). Результат сохраняется в JSON; с `--baseline` прогон сравнивается
+с сохранённым ранее и завершается с кодом 1, если какой-либо маршрут деградировал.
+
+Примеры:
+    uv run python -m benchmarks.load --mix shop --concurrency 20 --duration 30
+    uv run python -m benchmarks.load --mix browse --baseline benchmarks/results/main.json
+"""
+import argparse
+import asyncio
+import importlib
+import os
+import random
+import subprocess
+import sys
+import time
+from datetime import UTC, datetime
+from pathlib import Path
+from typing import Any
+
+import httpx
+from benchmarks.load.client import LoadClient, count_statements, make_samples
+from benchmarks.load.postgres import apply_environment, create_schema, throwaway_postgres
+from benchmarks.load.report import LATENCY_METRICS, find_regressions, load_result, render_report, save_result, summarize
+from benchmarks.load.scenarios import MIXES, VirtualUser, create_virtual_users, pick_scenario, seed_catalog
+
+RESULTS_DIR = Path(__file__).parent.parent.joinpath('results')
+
+
+def _git_revision() -> str | None:
+    try:
+        output = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True)
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return output.stdout.strip()
+
+
+async def run_load(http_client: httpx.AsyncClient, args: argparse.Namespace, count_queries: bool) -> dict[str, Any]:
+    """Подготовка данных, прогрев и замер под нагрузкой виртуальных пользователей."""
+    samples = make_samples()
+    client = LoadClient(http_client, samples, count_queries=count_queries)
+    run_id = f'{args.seed}-{time.time_ns()}'
+    catalog = await seed_catalog(client, run_id, random.Random(args.seed), args.categories, args.products)
+    users = await create_virtual_users(client, run_id, catalog, args.concurrency, args.seed)
+    mix = MIXES[args.mix]
+    stopped = asyncio.Event()
+
+    async def virtual_user(user: VirtualUser) -> None:
+        while not stopped.is_set():
+            try:
+                await pick_scenario(user.rng, mix)(client, user)
+            except httpx.TransportError:
+                await asyncio.sleep(0.1)
+
+    tasks = [asyncio.create_task(virtual_user(user)) for user in users]
+    await asyncio.sleep(args.warmup)
+    client.recording = True
+    started = time.perf_counter()
+    await asyncio.sleep(args.duration)
+    client.recording = False
+    elapsed = time.perf_counter() - started
+    stopped.set()
+    await asyncio.gather(*tasks)
+
+    meta = {
+        'started_at': datetime.now(UTC).isoformat(timespec='seconds'),
+        'git_revision': _git_revision(),
+        'mode': 'http' if args.base_url else 'asgi',
+        'mix': args.mix,
+        'concurrency': args.concurrency,
+        'duration_seconds': args.duration,
+        'warmup_seconds': args.warmup,
+        'seed': args.seed,
+        'categories': args.categories,
+        'products': args.products,
+    }
+    return summarize(samples, elapsed, meta)
+
+
+async def run_in_process(args: argparse.Namespace) -> dict[str, Any]:
+    """Прогон против приложения в текущем процессе с подсчётом SQL-запросов."""
+    # приложение читает настройки при импорте, поэтому импортируется после подстановки окружения
+    app = importlib.import_module('src.api.main').app
+    async with app.router.lifespan_context(app):
+        count_statements(app.state.database.engine)
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url='http://benchmark') as http_client:
+            return await run_load(http_client, args, count_queries=True)
+
+
+async def run_over_http(args: argparse.Namespace) -> dict[str, Any]:
+    """Прогон против запущенного сервера."""
+    limits = httpx.Limits(max_connections=args.concurrency * 2)
+    async with httpx.AsyncClient(base_url=args.base_url, limits=limits, timeout=30) as http_client:
+        return await run_load(http_client, args, count_queries=False)
+
+
+def main() -> None:
+    """Точка входа нагрузочного теста."""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--mix', choices=sorted(MIXES), default='shop', help='Смесь сценариев')
+    parser.add_argument('--concurrency', type=int, default=20, help='Количество виртуальных пользователей')
+    parser.add_argument('--duration', type=float, default=30, help='Длительность замера, секунды')
+    parser.add_argument('--warmup', type=float, default=5, help='Длительность прогрева без учёта в статистике, секунды')
+    parser.add_argument('--seed', type=int, default=42, help='Начальное значение генератора случайных чисел')
+    parser.add_argument('--categories', type=int, default=20, help='Количество создаваемых категорий')
+    parser.add_argument('--products', type=int, default=500, help='Количество создаваемых товаров')
+    parser.add_argument('--base-url', help='Адрес запущенного сервера (нагрузка по HTTP вместо запуска в процессе)')
+    parser.add_argument('--pg-bin', type=Path, help='Каталог с initdb и pg_ctl для временного PostgreSQL')
+    parser.add_argument('--rate-limits', action='store_true', help='Оставить включёнными лимиты запросов приложения')
+    parser.add_argument('--use-env-database', action='store_true', help='Использовать базу данных из .env вместо временной')
+    parser.add_argument('--output', type=Path, help='Файл для сохранения результата (по умолчанию в benchmarks/results)')
+    parser.add_argument('--baseline', type=Path, help='Результат прошлого прогона для проверки на деградацию')
+    parser.add_argument('--metric', choices=LATENCY_METRICS, default='p95_ms', help='Метрика задержки для сравнения')
+    parser.add_argument('--max-regression', type=float, default=0.2, help='Допустимый относительный рост метрики')
+    parser.add_argument('--min-delta-ms', type=float, default=1.0, help='Минимальный абсолютный рост метрики, мс')
+    args = parser.parse_args()
+
+    if not args.rate_limits:
+        os.environ['API_RATE_LIMIT_ENABLED'] = 'false'
+    if args.base_url:
+        result = asyncio.run(run_over_http(args))
+    elif args.use_env_database:
+        result = asyncio.run(run_in_process(args))
+    else:
+        with throwaway_postgres(args.pg_bin) as environment:
+            apply_environment(environment)
+            asyncio.run(create_schema(environment))
+            result = asyncio.run(run_in_process(args))
+
+    output = args.output or RESULTS_DIR.joinpath(f'load-{args.mix}-{datetime.now(UTC):%Y%m%dT%H%M%S}.json')
+    save_result(result, output)
+    sys.stdout.write(render_report(result) + f'\nsaved to {output}\n')
+
+    if args.baseline is not None:
+        regressions = find_regressions(result, load_result(args.baseline), args.metric, args.max_regression, args.min_delta_ms)
+        if regressions:
+            sys.stdout.write('regressions:\n' + '\n'.join(f'  {line}' for line in regressions) + '\n')
+            sys.exit(1)
+        sys.stdout.write('no regressions\n')
+
+
+if __name__ == '__main__':
+    main()
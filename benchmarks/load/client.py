@@ -0,0 +1,86 @@
+"""HTTP-клиент нагрузочного теста с учётом задержек и SQL-запросов по маршрутам."""
+import time
+from collections import defaultdict
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+from typing import Any
+
+import httpx
+from sqlalchemy import event
+from sqlalchemy.engine import Connection
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+_statement_counter: ContextVar[list[int] | None] = ContextVar('statement_counter', default=None)
+
+
+def count_statements(engine: AsyncEngine) -> None:
+    """Подсчёт SQL-выражений, выполненных в рамках текущего запроса нагрузочного теста."""
+
+    def _before_cursor_execute(conn: Connection, *_: Any) -> None:
+        counter = _statement_counter.get()
+        if counter is not None:
+            counter[0] += 1
+
+    event.listen(engine.sync_engine, 'before_cursor_execute', _before_cursor_execute)
+
+
+@dataclass
+class RouteSamples:
+    """Замеры одного маршрута."""
+
+    latencies_ms: list[float] = field(default_factory=list)
+    statements: list[int] = field(default_factory=list)
+    client_errors: int = 0
+    server_errors: int = 0
+
+
+class LoadClient:
+    """Обёртка над `httpx.AsyncClient`, которая записывает замеры по шаблону маршрута.
+
+    Пока `recording` выключен (прогрев), запросы выполняются без учёта в статистике.
+    """
+
+    def __init__(self, client: httpx.AsyncClient, samples: dict[str, RouteSamples], count_queries: bool) -> None:
+        self._client = client
+        self._samples = samples
+        self._count_queries = count_queries
+        self.recording = False
+
+    async def call(
+        self,
+        method: str,
+        route: str,
+        path_params: dict[str, Any] | None = None,
+        headers: dict[str, str] | None = None,
+        **kwargs: Any,
+    ) -> httpx.Response:
+        """Запрос по шаблону маршрута, например `GET /products/{product_id}`."""
+        url = route.format(**path_params) if path_params else route
+        counter = [0]
+        token = _statement_counter.set(counter if self._count_queries else None)
+        started = time.perf_counter()
+        try:
+            response = await self._client.request(method, url, headers=headers, **kwargs)
+        except httpx.TransportError:
+            if self.recording:
+                self._samples[f'{method} {route}'].server_errors += 1
+            raise
+        finally:
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            _statement_counter.reset(token)
+
+        if self.recording:
+            samples = self._samples[f'{method} {route}']
+            samples.latencies_ms.append(elapsed_ms)
+            if self._count_queries:
+                samples.statements.append(counter[0])
+            if response.is_server_error:
+                samples.server_errors += 1
+            elif response.is_client_error:
+                samples.client_errors += 1
+        return response
+
+
+def make_samples() -> dict[str, RouteSamples]:
+    """Хранилище замеров по маршрутам."""
+    return defaultdict(RouteSamples)
@@ -0,0 +1,102 @@
+"""Временный экземпляр PostgreSQL для прогона бенчмарков."""
+import os
+import shutil
+import socket
+import subprocess
+import tempfile
+from collections.abc import Generator
+from contextlib import contextmanager
+from pathlib import Path
+
+from sqlalchemy.ext.asyncio import create_async_engine
+
+from src.models import Product
+
+THROWAWAY_USER = 'bench'
+THROWAWAY_DB = 'bench'
+
+
+def find_postgres_bin(bin_dir: Path | None = None) -> Path:
+    """Каталог с `initdb` и `pg_ctl`: явно заданный, из PATH или из `pg_config --bindir`."""
+    if bin_dir is not None:
+        return bin_dir
+    initdb = shutil.which('initdb')
+    if initdb is not None:
+        return Path(initdb).parent
+    pg_config = shutil.which('pg_config')
+    if pg_config is not None:
+        output = subprocess.run([pg_config, '--bindir'], capture_output=True, text=True, check=True).stdout
+        return Path(output.strip())
+    candidates = sorted(Path('/usr/lib/postgresql').glob('*/bin'))
+    if candidates:
+        return candidates[-1]
+    msg = 'PostgreSQL binaries not found, pass --pg-bin'
+    raise FileNotFoundError(msg)
+
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return int(sock.getsockname()[1])
+
+
+@contextmanager
+def throwaway_postgres(bin_dir: Path | None = None) -> Generator[dict[str, str]]:
+    """Запуск пустого кластера PostgreSQL во временном каталоге.
+
+    Возвращает переменные окружения `POSTGRES_*` для подключения приложения;
+    после выхода из контекста сервер останавливается и каталог удаляется.
+    """
+    pg_bin = find_postgres_bin(bin_dir)
+    port = _free_port()
+    with tempfile.TemporaryDirectory(prefix='bench-pg-') as workdir:
+        data_dir = Path(workdir, 'data')
+        subprocess.run(
+            [pg_bin / 'initdb', '-D', data_dir, '-U', THROWAWAY_USER, '--auth=trust', '--encoding=UTF8', '--no-sync'],
+            check=True,
+            capture_output=True,
+        )
+        subprocess.run(
+            [
+                pg_bin / 'pg_ctl', '-D', data_dir, '-l', Path(workdir, 'postgres.log'), '-w',
+                '-o', f'-p {port} -k {workdir} -c listen_addresses=127.0.0.1 -c max_connections=200',
+                'start',
+            ],
+            check=True,
+            capture_output=True,
+        )
+        try:
+            subprocess.run(
+                [pg_bin / 'createdb', '-h', '127.0.0.1', '-p', str(port), '-U', THROWAWAY_USER, THROWAWAY_DB],
+                check=True,
+                capture_output=True,
+            )
+            yield {
+                'POSTGRES_HOST': '127.0.0.1',
+                'POSTGRES_PORT': str(port),
+                'POSTGRES_USER': THROWAWAY_USER,
+                'POSTGRES_PASSWORD': THROWAWAY_USER,
+                'POSTGRES_DB': THROWAWAY_DB,
+                'POSTGRES_ECHO_SQL': 'false',
+            }
+        finally:
+            subprocess.run([pg_bin / 'pg_ctl', '-D', data_dir, '-m', 'fast', 'stop'], check=False, capture_output=True)
+
+
+async def create_schema(environment: dict[str, str]) -> None:
+    """Создание таблиц и индексов по моделям приложения."""
+    url = (
+        f'postgresql+asyncpg://{environment["POSTGRES_USER"]}:{environment["POSTGRES_PASSWORD"]}'
+        f'@{environment["POSTGRES_HOST"]}:{environment["POSTGRES_PORT"]}/{environment["POSTGRES_DB"]}'
+    )
+    engine = create_async_engine(url)
+    try:
+        async with engine.begin() as conn:
+            await conn.run_sync(Product.metadata.create_all)
+    finally:
+        await engine.dispose()
+
+
+def apply_environment(environment: dict[str, str]) -> None:
+    """Подстановка параметров подключения до импорта приложения."""
+    os.environ.update(environment)
@@ -0,0 +1,107 @@
+"""Сводка нагрузочного теста, сохранение в JSON и сравнение с базовым прогоном."""
+import json
+import statistics
+from collections.abc import Sequence
+from pathlib import Path
+from typing import Any
+
+from benchmarks.load.client import RouteSamples
+
+LATENCY_METRICS = ('p50_ms', 'p95_ms', 'p99_ms', 'mean_ms')
+QUERY_TOLERANCE = 0.1
+
+
+def percentile(values: Sequence[float], share: float) -> float:
+    """Перцентиль по отсортированной выборке."""
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(share * len(ordered)))]
+
+
+def summarize(samples: dict[str, RouteSamples], elapsed_seconds: float, meta: dict[str, Any]) -> dict[str, Any]:
+    """Пропускная способность и перцентили задержек по маршрутам и в целом."""
+    routes: dict[str, dict[str, Any]] = {}
+    for route, route_samples in sorted(samples.items()):
+        latencies = route_samples.latencies_ms
+        if not latencies:
+            continue
+        routes[route] = {
+            'requests': len(latencies),
+            'throughput_rps': round(len(latencies) / elapsed_seconds, 2),
+            'p50_ms': round(percentile(latencies, 0.5), 3),
+            'p95_ms': round(percentile(latencies, 0.95), 3),
+            'p99_ms': round(percentile(latencies, 0.99), 3),
+            'mean_ms': round(statistics.fmean(latencies), 3),
+            'queries_per_request': round(statistics.fmean(route_samples.statements), 2) if route_samples.statements else None,
+            'client_errors': route_samples.client_errors,
+            'server_errors': route_samples.server_errors,
+        }
+
+    all_latencies = [latency for route_samples in samples.values() for latency in route_samples.latencies_ms]
+    total: dict[str, Any] = {'requests': len(all_latencies), 'throughput_rps': round(len(all_latencies) / elapsed_seconds, 2)}
+    if all_latencies:
+        total |= {
+            'p50_ms': round(percentile(all_latencies, 0.5), 3),
+            'p95_ms': round(percentile(all_latencies, 0.95), 3),
+            'p99_ms': round(percentile(all_latencies, 0.99), 3),
+            'server_errors': sum(route_samples.server_errors for route_samples in samples.values()),
+        }
+    return {'meta': meta | {'elapsed_seconds': round(elapsed_seconds, 3)}, 'total': total, 'routes': routes}
+
+
+def render_report(result: dict[str, Any]) -> str:
+    """Таблица результатов по маршрутам."""
+    lines = [
+        f'{"route":<42}{"n":>8}{"rps":>9}{"p50, ms":>10}{"p95, ms":>10}{"p99, ms":>10}{"queries":>9}{"5xx":>6}',
+    ]
+    for route, stats in result['routes'].items():
+        queries = stats['queries_per_request']
+        lines.append(
+            f'{route:<42}{stats["requests"]:>8}{stats["throughput_rps"]:>9.1f}{stats["p50_ms"]:>10.2f}'
+            f'{stats["p95_ms"]:>10.2f}{stats["p99_ms"]:>10.2f}{"-" if queries is None else f"{queries:.2f}":>9}'
+            f'{stats["server_errors"]:>6}',
+        )
+    total = result['total']
+    lines.append(f'total: {total["requests"]} requests, {total["throughput_rps"]:.1f} req/s')
+    return '\n'.join(lines)
+
+
+def save_result(result: dict[str, Any], path: Path) -> None:
+    """Сохранение результата прогона в JSON."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(result, ensure_ascii=False, indent=2) + '\n', encoding='utf8')
+
+
+def load_result(path: Path) -> dict[str, Any]:
+    """Чтение сохранённого результата прогона."""
+    result: dict[str, Any] = json.loads(path.read_text(encoding='utf8'))
+    return result
+
+
+def find_regressions(
+    result: dict[str, Any],
+    baseline: dict[str, Any],
+    metric: str,
+    max_regression: float,
+    min_delta_ms: float,
+) -> list[str]:
+    """Маршруты, которые деградировали относительно базового прогона.
+
+    Задержка считается деградацией, если выросла больше чем в `1 + max_regression` раз и при этом
+    больше чем на `min_delta_ms` (чтобы шум на быстрых маршрутах не давал ложных срабатываний).
+    Рост среднего числа SQL-запросов на запрос больше `QUERY_TOLERANCE` и новые ошибки 5xx тоже считаются деградацией.
+    """
+    regressions = []
+    for route, stats in result['routes'].items():
+        base = baseline['routes'].get(route)
+        if base is None:
+            continue
+        current_value, base_value = stats[metric], base[metric]
+        if current_value > base_value * (1 + max_regression) and current_value - base_value > min_delta_ms:
+            regressions.append(f'{route}: {metric} {base_value:.2f} -> {current_value:.2f} ms')
+
+        current_queries, base_queries = stats['queries_per_request'], base['queries_per_request']
+        if current_queries is not None and base_queries is not None and current_queries > base_queries + QUERY_TOLERANCE:
+            regressions.append(f'{route}: queries per request {base_queries:.2f} -> {current_queries:.2f}')
+        if stats['server_errors'] > base['server_errors']:
+            regressions.append(f'{route}: server errors {base["server_errors"]} -> {stats["server_errors"]}')
+    return regressions
@@ -0,0 +1,182 @@
+"""Сценарии поведения пользователей и их смеси для нагрузочного теста."""
+import random
+from collections.abc import Awaitable, Callable, Sequence
+from dataclasses import dataclass, field
+from decimal import Decimal
+
+from benchmarks.load.client import LoadClient
+from benchmarks.search_languages import DEFAULT_QUERY_LOG, load_queries
+
+PASSWORD = 'bench-password'
+PRODUCT_ROUTE = '/products/{product_id}'
+PRODUCT_REVIEWS_ROUTE = '/products/{product_id}/reviews/'
+CART_ITEM_ROUTE = '/cart/items/{product_id}'
+CLEAR_CART_PROBABILITY = 0.5
+PRODUCT_SORTS = (None, 'price_asc', 'price_desc', 'rating', 'created_at', 'popularity')
+DESCRIPTION_WORDS = (
+    'durable', 'compact', 'wireless', 'premium', 'classic', 'lightweight', 'waterproof',
+    'надёжный', 'компактный', 'беспроводной', 'классический', 'лёгкий', 'водонепроницаемый',
+)
+
+
+@dataclass
+class Catalog:
+    """Данные, созданные при подготовке прогона и общие для всех виртуальных пользователей."""
+
+    category_ids: list[int]
+    product_ids: list[int]
+    search_terms: list[str]
+
+
+@dataclass
+class VirtualUser:
+    """Виртуальный пользователь со своим аккаунтом покупателя и генератором случайных чисел."""
+
+    email: str
+    headers: dict[str, str]
+    rng: random.Random
+    catalog: Catalog
+    cart: set[int] = field(default_factory=set)
+
+
+Scenario = Callable[[LoadClient, VirtualUser], Awaitable[None]]
+
+
+async def _login(client: LoadClient, email: str) -> dict[str, str]:
+    response = await client.call('POST', '/users/token', data={'username': email, 'password': PASSWORD})
+    response.raise_for_status()
+    return {'Authorization': f'Bearer {response.json()["access_token"]}'}
+
+
+async def _register(client: LoadClient, email: str, role: str) -> dict[str, str]:
+    response = await client.call('POST', '/users/', json={'email': email, 'password': PASSWORD, 'role': role})
+    response.raise_for_status()
+    return await _login(client, email)
+
+
+async def seed_catalog(client: LoadClient, run_id: str, rng: random.Random, categories: int, products: int) -> Catalog:
+    """Создание категорий и товаров через API от имени администратора и продавцов."""
+    admin = await _register(client, f'bench-{run_id}-admin@loadtest.io', 'admin')
+    sellers = [await _register(client, f'bench-{run_id}-seller{index}@loadtest.io', 'seller') for index in range(3)]
+
+    category_ids: list[int] = []
+    for index in range(categories):
+        parent_id = rng.choice(category_ids) if category_ids and index % 3 else None
+        response = await client.call(
+            'POST', '/categories/', headers=admin, json={'name': f'Category {run_id} {index}', 'parent_id': parent_id},
+        )
+        response.raise_for_status()
+        category_ids.append(response.json()['id'])
+
+    search_terms = load_queries(DEFAULT_QUERY_LOG)
+    product_ids: list[int] = []
+    for index in range(products):
+        term = rng.choice(search_terms)
+        payload = {
+            'name': f'{term} {index}'[:100],
+            'description': ' '.join(rng.choices(DESCRIPTION_WORDS, k=8)),
+            'price': str(Decimal(rng.randint(100, 9_999_900)) / 100),
+            'stock': 1_000_000,
+            'category_id': rng.choice(category_ids),
+        }
+        response = await client.call('POST', '/products/', headers=rng.choice(sellers), json=payload)
+        response.raise_for_status()
+        product_ids.append(response.json()['id'])
+    return Catalog(category_ids=category_ids, product_ids=product_ids, search_terms=search_terms)
+
+
+async def create_virtual_users(client: LoadClient, run_id: str, catalog: Catalog, count: int, seed: int) -> list[VirtualUser]:
+    """Регистрация покупателей, по одному аккаунту (и одной корзине) на виртуального пользователя."""
+    users = []
+    for index in range(count):
+        email = f'bench-{run_id}-buyer{index}@loadtest.io'
+        headers = await _register(client, email, 'buyer')
+        users.append(VirtualUser(email=email, headers=headers, rng=random.Random(seed + index), catalog=catalog))
+    return users
+
+
+async def browse(client: LoadClient, user: VirtualUser) -> None:
+    """Анонимный просмотр витрины: категории, страницы каталога, карточки товаров и отзывы."""
+    rng, catalog = user.rng, user.catalog
+    await client.call('GET', '/categories/')
+    await client.call('GET', '/products/', params={'page': rng.randint(1, 5), 'sort': rng.choice(PRODUCT_SORTS[1:])})
+    await client.call('GET', '/products/', params={'category_id': rng.choice(catalog.category_ids)})
+    for product_id in rng.sample(catalog.product_ids, k=2):
+        await client.call('GET', PRODUCT_ROUTE, path_params={'product_id': product_id})
+    await client.call('GET', PRODUCT_REVIEWS_ROUTE, path_params={'product_id': rng.choice(catalog.product_ids)})
+
+
+async def search(client: LoadClient, user: VirtualUser) -> None:
+    """Поиск с фасетами и переходом по страницам выдачи."""
+    rng = user.rng
+    params: dict[str, str | int] = {'search': rng.choice(user.catalog.search_terms), 'facets': 'category'}
+    sort = rng.choice(PRODUCT_SORTS)
+    if sort is not None:
+        params['sort'] = sort
+    await client.call('GET', '/products/', params=params)
+    params.pop('facets')
+    await client.call('GET', '/products/', params={**params, 'page': 2})
+
+
+async def login(client: LoadClient, user: VirtualUser) -> None:
+    """Повторный вход покупателя."""
+    user.headers = await _login(client, user.email)
+
+
+async def _add_to_cart(client: LoadClient, user: VirtualUser, product_id: int) -> None:
+    response = await client.call(
+        'POST', '/cart/items', headers=user.headers, json={'product_id': product_id, 'quantity': user.rng.randint(1, 3)},
+    )
+    if response.is_success:
+        user.cart.add(product_id)
+
+
+async def cart_churn(client: LoadClient, user: VirtualUser) -> None:
+    """Добавление, изменение и удаление товаров в корзине."""
+    rng = user.rng
+    for product_id in rng.sample(user.catalog.product_ids, k=3):
+        await _add_to_cart(client, user, product_id)
+    if not user.cart:
+        return
+    product_id = rng.choice(sorted(user.cart))
+    await client.call(
+        'PUT', CART_ITEM_ROUTE, path_params={'product_id': product_id}, headers=user.headers,
+        json={'quantity': rng.randint(1, 5)},
+    )
+    await client.call('GET', '/cart/', headers=user.headers)
+    await client.call('DELETE', CART_ITEM_ROUTE, path_params={'product_id': product_id}, headers=user.headers)
+    user.cart.discard(product_id)
+    if rng.random() < CLEAR_CART_PROBABILITY:
+        await client.call('DELETE', '/cart/', headers=user.headers)
+        user.cart.clear()
+
+
+async def checkout(client: LoadClient, user: VirtualUser) -> None:
+    """Оформление заказа из корзины и просмотр истории заказов."""
+    rng = user.rng
+    for product_id in rng.sample(user.catalog.product_ids, k=rng.randint(1, 3)):
+        await _add_to_cart(client, user, product_id)
+    response = await client.call('POST', '/orders/checkout', headers=user.headers)
+    if response.is_success:
+        user.cart.clear()
+    await client.call('GET', '/orders/', headers=user.headers)
+
+
+SCENARIOS: dict[str, Scenario] = {
+    'browse': browse,
+    'search': search,
+    'login': login,
+    'cart': cart_churn,
+    'checkout': checkout,
+}
+MIXES: dict[str, dict[str, float]] = {
+    'browse': {'browse': 0.7, 'search': 0.3},
+    'shop': {'browse': 0.45, 'search': 0.25, 'login': 0.05, 'cart': 0.15, 'checkout': 0.1},
+    'checkout': {'cart': 0.4, 'checkout': 0.6},
+}
+
+
+def pick_scenario(rng: random.Random, mix: dict[str, float]) -> Scenario:
+    """Выбор сценария по весам смеси."""
+    names: Sequence[str] = list(mix)
+    return SCENARIOS[rng.choices(names, weights=[mix[name] for name in names])[0]]
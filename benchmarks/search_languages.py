@@ -0,0 +1,123 @@
+"""Сравнение планов полнотекстового поиска товаров на смешанном журнале запросов.
+
+Для каждого запроса из журнала выполняется тот же запрос, что и в `GET /products/?search=`
+(подсчёт совпадений и первая страница по рангу), в двух режимах:
+- `dual` — поиск всегда по английскому и русскому векторам;
+- `detected` — поиск только по векторам языков, найденных в строке запроса.
+
+Запуск (настройки подключения берутся из `.env`):
+    uv run python -m benchmarks.search_languages --repeat 20
+"""
+import argparse
+import asyncio
+import statistics
+import sys
+import time
+from collections import defaultdict
+from collections.abc import Sequence
+from pathlib import Path
+
+from sqlalchemy import desc, func, select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.config import get_settings
+from src.models import Product as ProductModel
+from src.services.database.postgresql import PostgreSQLDatabase
+from src.utils.routes import SEARCH_VECTORS, _build_search_clauses, _detect_search_languages
+
+DEFAULT_QUERY_LOG = Path(__file__).parent.joinpath('data', 'search_queries.txt')
+PLANS = ('dual', 'detected')
+
+
+def load_queries(path: Path) -> list[str]:
+    """Чтение журнала запросов: одна строка — один запрос, строки с # пропускаются."""
+    lines = (line.strip() for line in path.read_text(encoding='utf8').splitlines())
+    return [line for line in lines if line and not line.startswith('#')]
+
+
+def query_script(search_value: str) -> str:
+    """Класс запроса по алфавиту: latin, cyrillic или mixed."""
+    languages = _detect_search_languages(search_value)
+    if languages == ('english',):
+        return 'latin'
+    if languages == ('russian',):
+        return 'cyrillic'
+    return 'mixed'
+
+
+async def run_search(session: AsyncSession, search_value: str, languages: Sequence[str] | None, page_size: int) -> None:
+    """Выполнение подсчёта и первой страницы поиска так же, как в маршруте списка товаров."""
+    search_match, search_rank = _build_search_clauses(search_value, languages)
+    filters = [ProductModel.is_active == True, search_match]
+    await session.scalar(select(func.count()).select_from(ProductModel).where(*filters))
+    rank_col = search_rank.label('rank')
+    await session.execute(
+        select(ProductModel.id, rank_col)
+        .where(*filters)
+        .order_by(desc(rank_col), ProductModel.id)
+        .limit(page_size),
+    )
+
+
+async def benchmark(queries: Sequence[str], repeat: int, page_size: int) -> dict[tuple[str, str], list[float]]:
+    """Замер задержек в миллисекундах по каждому плану и классу запроса."""
+    database = PostgreSQLDatabase(settings=get_settings())
+    await database.startup()
+    assert database.session_factory is not None
+
+    timings: dict[tuple[str, str], list[float]] = defaultdict(list)
+    try:
+        async with database.session_factory() as session:
+            for search_value in queries:
+                await run_search(session, search_value, None, page_size)
+
+            for _ in range(repeat):
+                for search_value in queries:
+                    script = query_script(search_value)
+                    for plan in PLANS:
+                        languages = tuple(SEARCH_VECTORS) if plan == 'dual' else None
+                        started = time.perf_counter()
+                        await run_search(session, search_value, languages, page_size)
+                        elapsed_ms = (time.perf_counter() - started) * 1000
+                        timings[plan, script].append(elapsed_ms)
+                        timings[plan, 'all'].append(elapsed_ms)
+    finally:
+        await database.teardown()
+    return timings
+
+
+def percentile(values: Sequence[float], share: float) -> float:
+    """Перцентиль по отсортированной выборке."""
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(share * len(ordered)))]
+
+
+def render_report(timings: dict[tuple[str, str], list[float]]) -> str:
+    """Таблица p50/p95/среднего по планам и классам запросов."""
+    lines = [f'{"script":<10}{"plan":<10}{"n":>6}{"p50, ms":>10}{"p95, ms":>10}{"mean, ms":>10}']
+    for script in ('latin', 'cyrillic', 'mixed', 'all'):
+        for plan in PLANS:
+            values = timings.get((plan, script))
+            if not values:
+                continue
+            lines.append(
+                f'{script:<10}{plan:<10}{len(values):>6}{percentile(values, 0.5):>10.2f}'
+                f'{percentile(values, 0.95):>10.2f}{statistics.fmean(values):>10.2f}',
+            )
+    return '\n'.join(lines)
+
+
+def main() -> None:
+    """Точка входа бенчмарка."""
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--queries', type=Path, default=DEFAULT_QUERY_LOG, help='Файл с журналом поисковых запросов')
+    parser.add_argument('--repeat', type=int, default=10, help='Количество проходов по журналу')
+    parser.add_argument('--page-size', type=int, default=20, help='Размер страницы выдачи')
+    args = parser.parse_args()
+
+    timings = asyncio.run(benchmark(load_queries(args.queries), args.repeat, args.page_size))
+    sys.stdout.write(render_report(timings) + '\n')
+
+
+if __name__ == '__main__':
+    main()
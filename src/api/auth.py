@@ -1,5 +1,6 @@
 from collections.abc import Awaitable, Callable, Sequence
 from datetime import UTC, datetime, timedelta
+from uuid import uuid4
 
 import jwt
 from fastapi import Depends, HTTPException, status
@@ -27,13 +28,15 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
 
 
 def create_token(data: dict[str, str | int | datetime], access: bool) -> str:
-    """Создаёт JWT с payload (sub, role, id, exp, type)."""
+    """Создаёт JWT с payload (sub, role, id, exp, type); refresh-токен получает уникальный jti."""
     to_encode = data.copy()
     time_delta = timedelta(minutes=settings.api_access_token_expire_minutes) if access else timedelta(days=settings.api_refresh_token_expire_days)
     token_type = 'access' if access else 'refresh'
 
     expire = datetime.now(UTC) + time_delta
     to_encode.update({'exp': expire, 'token_type': token_type})
+    if not access:
+        to_encode['jti'] = uuid4().hex
     return jwt.encode(to_encode, settings.api_secret_key, algorithm=settings.api_jwt_encode_algorithm)
 
 
@@ -1,11 +1,25 @@
+import asyncio
 from collections.abc import AsyncIterator
-from contextlib import asynccontextmanager
+from contextlib import asynccontextmanager, suppress
 
 from fastapi import FastAPI
 
 from src.config import get_settings
-from src.routes import cart, categories, orders, products, reviews, users
+from src.routes import analytics, cart, categories, monitoring, orders, products, reviews, users
+from src.services.auth.revocations import RevokedTokens
+from src.services.cart.reservations import StockReservationSweeper
 from src.services.database.factory import make_database
+from src.services.database.partitions import OrderPartitions
+from src.services.health.state import ApplicationHealth, InFlightRequestsMiddleware
+from src.services.health.warmup import StartupTimings, warm_up
+from src.services.idempotency.middleware import IdempotencyMiddleware
+from src.services.idempotency.store import IdempotencyStore
+from src.services.limits.admission import AdmissionControlMiddleware
+from src.services.metrics.prometheus import PrometheusMiddleware, mark_process_dead, monitor_event_loop_lag
+from src.services.outbox.handlers import OUTBOX_HANDLERS
+from src.services.outbox.worker import OutboxWorker
+from src.services.rankings.products import ProductRankings, ProductViewCounter
+from src.services.recommendations.co_purchases import CoPurchaseRecommender, RelatedProductsCache
 from src.utils.misc import setup_logger
 
 settings = get_settings()
@@ -22,14 +36,89 @@ async def lifespan(app: FastAPI) -> AsyncIterator[None]:
 
     logger = setup_logger(debug=settings.api_debug)
     logger.info('Starting API...')
+    timings = StartupTimings(logger)
 
-    database = await make_database(settings=settings, logger=logger)
+    with timings.phase('database'):
+        database = await make_database(settings=settings, logger=logger)
     app.state.database = database
     logger.info('Database connected')
-    logger.info('API ready!')
+
+    revoked_tokens = RevokedTokens(
+        dsn=database.engine.url.set(drivername='postgresql').render_as_string(hide_password=False),
+        logger=logger,
+    )
+    with timings.phase('revoked_tokens'):
+        await revoked_tokens.start()
+    app.state.revoked_tokens = revoked_tokens
+
+    order_partitions = OrderPartitions(
+        engine=database.engine,
+        logger=logger,
+        months_ahead=settings.api_order_partitions_months_ahead,
+    )
+    with timings.phase('order_partitions'):
+        await order_partitions.ensure()
+
+    idempotency = IdempotencyStore(engine=database.engine, logger=logger, settings=settings)
+    app.state.idempotency = idempotency
+    app.state.related_products = RelatedProductsCache(
+        max_size=settings.api_recommendations_cache_size,
+        ttl=settings.api_recommendations_cache_seconds,
+    )
+
+    health = ApplicationHealth(
+        engine=database.engine,
+        logger=logger,
+        probe_interval=settings.api_health_probe_interval_seconds,
+        probe_timeout=settings.api_health_probe_timeout_seconds,
+        startup_phases=timings.phases,
+    )
+    app.state.health = health
+    with timings.phase('probe'):
+        await health.probe_database()
+    assert database.session_factory is not None
+    outbox_worker = OutboxWorker(
+        session_factory=database.session_factory,
+        handlers=OUTBOX_HANDLERS,
+        logger=logger,
+        settings=settings,
+    )
+    recommender = CoPurchaseRecommender(session_factory=database.session_factory, logger=logger, settings=settings)
+    product_views = ProductViewCounter(session_factory=database.session_factory, logger=logger, settings=settings)
+    app.state.product_views = product_views
+    background_tasks = [
+        asyncio.create_task(health.run_probes()),
+        asyncio.create_task(monitor_event_loop_lag()),
+        asyncio.create_task(revoked_tokens.run()),
+        asyncio.create_task(outbox_worker.run()),
+        asyncio.create_task(order_partitions.run()),
+        asyncio.create_task(idempotency.run()),
+        asyncio.create_task(recommender.run()),
+        asyncio.create_task(product_views.run()),
+        asyncio.create_task(ProductRankings(session_factory=database.session_factory, logger=logger, settings=settings).run()),
+    ]
+    if settings.api_stock_reservations_enabled:
+        sweeper = StockReservationSweeper(session_factory=database.session_factory, logger=logger, settings=settings)
+        background_tasks.append(asyncio.create_task(sweeper.run()))
+    if settings.api_warmup_enabled:
+        health.mark_warming_up()
+        await warm_up(app, database, timings, logger, settings)
+    health.mark_ready()
+    logger.info(f'API ready in {sum(timings.phases.values()):.0f} ms')
     yield
 
+    health.mark_draining()
+    logger.info('Draining in-flight requests...')
+    if not await health.wait_drained(timeout=settings.api_shutdown_drain_timeout_seconds):
+        logger.warning('Drain timeout reached, shutting down with requests in flight')
+    for task in background_tasks:
+        task.cancel()
+    with suppress(asyncio.CancelledError):
+        await asyncio.gather(*background_tasks)
+    await product_views.close()
+    await revoked_tokens.close()
     await database.teardown()
+    mark_process_dead()
     logger.info('API shutdown complete')
 
 
@@ -45,6 +134,12 @@ app.include_router(products.router)
 app.include_router(reviews.router)
 app.include_router(users.router)
 app.include_router(orders.router)
+app.include_router(analytics.router)
+app.include_router(monitoring.router)
+app.add_middleware(IdempotencyMiddleware, settings=settings)
+app.add_middleware(InFlightRequestsMiddleware)
+app.add_middleware(AdmissionControlMiddleware, settings=settings)
+app.add_middleware(PrometheusMiddleware)
 
 
 @app.get('/')
@@ -0,0 +1,186 @@
+"""Запуск приложения в production-режиме: gunicorn с воркерами uvicorn.
+
+Приложение загружается один раз в мастер-процессе (preload) и наследуется воркерами
+при fork. Количество воркеров определяется по доступным процессорам с учётом квоты
+cgroup; общий бюджет соединений с PostgreSQL делится между воркерами.
+
+Сигналы мастер-процесса:
+- HUP — плавный перезапуск воркеров без потери запросов;
+- TTIN / TTOU — добавить или убрать воркер;
+- USR2, затем WINCH и QUIT старому мастеру — обновление кода без простоя.
+"""
+import math
+import os
+import resource
+import signal
+import tempfile
+from pathlib import Path
+from typing import Any
+
+from gunicorn.app.base import BaseApplication
+from gunicorn.arbiter import Arbiter
+from gunicorn.util import import_app
+from gunicorn.workers.base import Worker
+from uvicorn_worker import UvicornWorker
+
+from src.config import Settings, get_settings
+from src.services.limits.buckets import SHARED_BUCKETS_FILE
+
+APP_URI = 'src.api.main:app'
+CGROUP_V2_CPU_MAX = Path('/sys/fs/cgroup/cpu.max')
+CGROUP_V1_CPU_QUOTA = Path('/sys/fs/cgroup/cpu/cpu.cfs_quota_us')
+CGROUP_V1_CPU_PERIOD = Path('/sys/fs/cgroup/cpu/cpu.cfs_period_us')
+
+
+def _cgroup_cpu_quota() -> float | None:
+    """Квота процессорного времени контейнера в долях ядра, если она задана."""
+    try:
+        if CGROUP_V2_CPU_MAX.exists():
+            quota, period = CGROUP_V2_CPU_MAX.read_text(encoding='utf8').split()
+            return None if quota == 'max' else int(quota) / int(period)
+        if CGROUP_V1_CPU_QUOTA.exists():
+            quota_us = int(CGROUP_V1_CPU_QUOTA.read_text(encoding='utf8'))
+            return None if quota_us <= 0 else quota_us / int(CGROUP_V1_CPU_PERIOD.read_text(encoding='utf8'))
+    except (OSError, ValueError):
+        return None
+    return None
+
+
+def available_cpus() -> int:
+    """Количество процессоров, доступных процессу, с учётом привязки и квоты cgroup."""
+    cpus = len(os.sched_getaffinity(0)) if hasattr(os, 'sched_getaffinity') else os.cpu_count() or 1
+    quota = _cgroup_cpu_quota()
+    if quota is not None:
+        cpus = min(cpus, max(1, math.ceil(quota)))
+    return cpus
+
+
+def worker_pool_budget(settings: Settings, workers: int) -> tuple[int, int]:
+    """Размер пула и допустимое переполнение на воркер в пределах общего бюджета соединений.
+
+    Бюджет равен `max_connections` сервера за вычетом резерва под миграции и администрирование;
+    пул занимает две трети доли воркера, остальное приходится на переполнение.
+    """
+    budget = settings.postgres_max_connections - settings.postgres_reserved_connections
+    per_worker = max(1, budget // workers)
+    pool_size = max(1, per_worker * 2 // 3)
+    return pool_size, per_worker - pool_size
+
+
+def _current_rss_bytes() -> int:
+    """Текущий объём резидентной памяти процесса."""
+    try:
+        resident_pages = int(Path('/proc/self/statm').read_text(encoding='utf8').split()[1])
+    except (OSError, IndexError, ValueError):
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * 1024
+    return resident_pages * resource.getpagesize()
+
+
+class MemoryLimitedUvicornWorker(UvicornWorker):  # type: ignore[misc]
+    """Воркер uvicorn, который плавно завершается при превышении лимита памяти.
+
+    Проверка выполняется при каждом heartbeat воркера; после SIGTERM uvicorn
+    дорабатывает принятые запросы, после чего мастер запускает новый воркер.
+    """
+
+    def __init__(self, *args: Any, **kwargs: Any) -> None:
+        super().__init__(*args, **kwargs)
+        self._max_memory_bytes = get_settings().api_worker_max_memory_mb * 1024 * 1024
+        self._exiting = False
+
+    async def callback_notify(self) -> None:
+        """Heartbeat воркера с проверкой потребления памяти."""
+        self.notify()
+        if not self._max_memory_bytes or self._exiting:
+            return
+        rss = _current_rss_bytes()
+        if rss > self._max_memory_bytes:
+            self._exiting = True
+            self.log.warning(f'Worker {self.pid} uses {rss // 2**20} MiB (limit {self._max_memory_bytes // 2**20} MiB), restarting')
+            os.kill(self.pid, signal.SIGTERM)
+
+
+def _remove_files(directory: Path, pattern: str) -> None:
+    """Создание каталога и удаление в нём файлов приложения по шаблону; остальное содержимое не затрагивается."""
+    directory.mkdir(parents=True, exist_ok=True)
+    for path in directory.glob(pattern):
+        path.unlink(missing_ok=True)
+
+
+def _prepare_multiprocess_metrics(workers: int) -> None:
+    """Подготовка каталога метрик Prometheus для агрегации между воркерами."""
+    metrics_dir = os.environ.get('PROMETHEUS_MULTIPROC_DIR')
+    if metrics_dir is not None:
+        # каталог задан оператором: удаляются только файлы метрик прошлого запуска
+        _remove_files(Path(metrics_dir), '*.db')
+    elif workers > 1:
+        os.environ['PROMETHEUS_MULTIPROC_DIR'] = tempfile.mkdtemp(prefix='prometheus-')
+
+
+def _prepare_shared_rate_limits(workers: int) -> None:
+    """Подготовка каталога общего хранилища лимитов запросов для нескольких воркеров."""
+    limits_dir = os.environ.get('API_RATE_LIMIT_DIR')
+    if limits_dir is not None:
+        # каталог задан оператором: удаляется только файл корзин прошлого запуска
+        _remove_files(Path(limits_dir), SHARED_BUCKETS_FILE)
+    elif workers > 1:
+        os.environ['API_RATE_LIMIT_DIR'] = tempfile.mkdtemp(prefix='rate-limits-')
+
+
+def _on_child_exit(server: Arbiter, worker: Worker) -> None:
+    """Удаление live-метрик завершившегося воркера."""
+    if 'PROMETHEUS_MULTIPROC_DIR' in os.environ:
+        # prometheus_client выбирает режим хранения метрик при импорте, поэтому импорт откладывается
+        # до подготовки каталога в `main`
+        from prometheus_client import multiprocess  # ruff: ignore[import-outside-top-level]
+
+        multiprocess.mark_process_dead(worker.pid)  # type: ignore[no-untyped-call]
+
+
+class ProductionServer(BaseApplication):  # type: ignore[misc]
+    """Приложение gunicorn с предзагрузкой ASGI-приложения."""
+
+    def __init__(self, app_uri: str, options: dict[str, Any]) -> None:
+        self._app_uri = app_uri
+        self._options = options
+        super().__init__()
+
+    def load_config(self) -> None:
+        """Передача настроек в конфигурацию gunicorn."""
+        for key, value in self._options.items():
+            self.cfg.set(key, value)
+
+    def load(self) -> Any:
+        """Импорт ASGI-приложения (в мастер-процессе при preload)."""
+        return import_app(self._app_uri)
+
+
+def main() -> None:
+    """Точка входа production-сервера."""
+    settings = get_settings()
+    workers = settings.api_workers or available_cpus()
+    pool_size, max_overflow = worker_pool_budget(settings, workers)
+
+    os.environ['POSTGRES_POOL_SIZE'] = str(pool_size)
+    os.environ['POSTGRES_MAX_OVERFLOW'] = str(max_overflow)
+    _prepare_multiprocess_metrics(workers)
+    _prepare_shared_rate_limits(workers)
+
+    options = {
+        'bind': f'{settings.api_host}:{settings.api_port}',
+        'workers': workers,
+        'worker_class': f'{MemoryLimitedUvicornWorker.__module__}.{MemoryLimitedUvicornWorker.__qualname__}',
+        'preload_app': True,
+        'max_requests': settings.api_worker_max_requests,
+        'max_requests_jitter': settings.api_worker_max_requests // 10,
+        'graceful_timeout': math.ceil(settings.api_shutdown_drain_timeout_seconds) + 5,
+        'timeout': 60,
+        'keepalive': 5,
+        'accesslog': None,
+        'child_exit': _on_child_exit,
+    }
+    ProductionServer(APP_URI, options).run()
+
+
+if __name__ == '__main__':
+    main()
@@ -30,6 +30,46 @@ class Settings(BaseConfigSettings):
     api_access_token_expire_minutes: int | float
     api_refresh_token_expire_days: int
     api_jwt_encode_algorithm: str
+    api_jwt_cache_size: int = 10000
+    api_health_probe_interval_seconds: float = 5.0
+    api_health_probe_timeout_seconds: float = 2.0
+    api_shutdown_drain_timeout_seconds: float = 30.0
+    api_warmup_enabled: bool = True
+    api_rate_limit_enabled: bool = True
+    api_rate_limit_requests_per_minute: int = 600
+    api_rate_limit_search_per_minute: int = 120
+    api_rate_limit_login_per_minute: int = 10
+    api_rate_limit_dir: str | None = None
+    api_login_max_concurrency: int = 2
+    api_max_in_flight: int = 0
+    api_max_in_flight_per_connection: int = 4
+    api_warmup_timeout_seconds: float = 30.0
+    api_outbox_batch_size: int = 100
+    api_outbox_poll_interval_seconds: float = 0.5
+    api_outbox_max_attempts: int = 10
+    api_order_partitions_months_ahead: int = 3
+    api_stock_reservations_enabled: bool = False
+    api_stock_reservation_ttl_seconds: int = 900
+    api_stock_reservation_sweep_interval_seconds: float = 30.0
+    api_stock_reservation_sweep_batch_size: int = 1000
+    api_idempotency_ttl_seconds: int = 86400
+    api_idempotency_lock_seconds: float = 60.0
+    api_recommendations_interval_seconds: float = 300.0
+    api_recommendations_batch_size: int = 5000
+    api_recommendations_top_k: int = 10
+    api_recommendations_cache_size: int = 10000
+    api_recommendations_cache_seconds: float = 300.0
+    api_product_views_flush_interval_seconds: float = 10.0
+    api_rankings_refresh_interval_seconds: float = 60.0
+    api_rankings_top_n: int = 50
+    api_bestsellers_days: int = 7
+    api_trending_window_hours: int = 48
+    api_trending_half_life_hours: float = 6.0
+    api_host: str = '0.0.0.0'
+    api_port: int = 8000
+    api_workers: int = 0
+    api_worker_max_requests: int = 10000
+    api_worker_max_memory_mb: int = 0
 
     postgres_user: str
     postgres_password: str
@@ -37,6 +77,10 @@ class Settings(BaseConfigSettings):
     postgres_host: str
     postgres_port: int
     postgres_echo_sql: bool
+    postgres_pool_size: int = 5
+    postgres_max_overflow: int = 10
+    postgres_max_connections: int = 100
+    postgres_reserved_connections: int = 10
 
 
 def get_settings() -> Settings:
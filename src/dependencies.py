@@ -1,11 +1,16 @@
 from collections.abc import AsyncGenerator
 from typing import Annotated, cast
 
-from fastapi import Depends, Request
+from fastapi import Depends, Header, HTTPException, Request, status
 from fastapi.security import OAuth2PasswordRequestForm
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from src.config import Settings
+from src.services.auth.revocations import RevokedTokens
+from src.services.health.state import ApplicationHealth
+from src.services.limits.admission import is_internal_request
+from src.services.rankings.products import ProductViewCounter
+from src.services.recommendations.co_purchases import RelatedProductsCache
 
 
 def get_settings(request: Request) -> Settings:
@@ -19,6 +24,48 @@ async def get_async_db_session(request: Request) -> AsyncGenerator[AsyncSession]
         yield session
 
 
+def get_application_health(request: Request) -> ApplicationHealth:
+    """Зависимость для получения состояния готовности приложения."""
+    return cast(ApplicationHealth, request.app.state.health)
+
+
+def get_revoked_tokens(request: Request) -> RevokedTokens:
+    """Зависимость для получения множества отозванных refresh-токенов."""
+    return cast(RevokedTokens, request.app.state.revoked_tokens)
+
+
+def get_related_products_cache(request: Request) -> RelatedProductsCache:
+    """Зависимость для получения кеша рекомендаций товаров."""
+    return cast(RelatedProductsCache, request.app.state.related_products)
+
+
+def get_product_views(request: Request) -> ProductViewCounter | None:
+    """Зависимость для получения счётчика просмотров товаров; None — запрос прогрева, просмотры которого не учитываются."""
+    if is_internal_request(request.scope):
+        return None
+    return cast(ProductViewCounter, request.app.state.product_views)
+
+
+def get_if_match_version(
+    if_match: str | None = Header(
+        None,
+        description='Версия записи (`ETag` или поле `version`): изменение выполняется, только если она не изменилась',
+    ),
+) -> int | None:
+    """Зависимость для получения ожидаемой версии записи из заголовка `If-Match`; None — без проверки версии."""
+    if if_match is None or if_match.strip() == '*':
+        return None
+    try:
+        return int(if_match.strip().removeprefix('W/').strip('"'))
+    except ValueError:
+        raise HTTPException(status_code=status.HTTP_412_PRECONDITION_FAILED, detail='If-Match must contain the resource version') from None
+
+
 SettingsDep = Annotated[Settings, Depends(get_settings)]
 AsyncDatabaseDep = Annotated[AsyncSession, Depends(get_async_db_session)]
 OAuth2PasswordRequestFormDep = Annotated[OAuth2PasswordRequestForm, Depends()]
+ApplicationHealthDep = Annotated[ApplicationHealth, Depends(get_application_health)]
+RevokedTokensDep = Annotated[RevokedTokens, Depends(get_revoked_tokens)]
+RelatedProductsCacheDep = Annotated[RelatedProductsCache, Depends(get_related_products_cache)]
+ProductViewsDep = Annotated[ProductViewCounter | None, Depends(get_product_views)]
+IfMatchDep = Annotated[int | None, Depends(get_if_match_version)]
@@ -1,13 +1,17 @@
 import asyncio
+import re
 from logging.config import fileConfig
 
 from alembic import context
-from sqlalchemy import pool
+from alembic.runtime.environment import NameFilterParentNames, NameFilterType
+from sqlalchemy import ForeignKeyConstraint, pool
 from sqlalchemy.engine import Connection
 from sqlalchemy.ext.asyncio import async_engine_from_config
+from sqlalchemy.schema import SchemaItem
 
 from src import models  # noqa: F401
 from src.config import get_settings
+from src.models.orders import ORDER_PARTITION_PATTERN
 from src.services.database.postgresql import Base, PostgreSQLDatabase
 
 DATABASE_URL = PostgreSQLDatabase(settings=get_settings()).database_url
@@ -28,6 +32,19 @@ if config.config_file_name is not None:
 # target_metadata = mymodel.Base.metadata
 target_metadata = Base.metadata
 
+
+def include_name(name: str | None, type_: NameFilterType, parent_names: NameFilterParentNames) -> bool:
+    """Секции заказов создаются функцией create_order_partitions и не описываются моделями."""
+    return not (type_ == 'table' and name is not None and re.match(ORDER_PARTITION_PATTERN, name))
+
+
+def include_object(obj: SchemaItem, name: str | None, type_: str, reflected: bool, compare_to: SchemaItem | None) -> bool:
+    """Внешние ключи, которые PostgreSQL создаёт для каждой секции заказов, тоже не сравниваются с моделями."""
+    if type_ == 'foreign_key_constraint' and reflected and isinstance(obj, ForeignKeyConstraint):
+        return not re.match(ORDER_PARTITION_PATTERN, obj.referred_table.name)
+    return True
+
+
 # other values from the config, defined by the needs of env.py,
 # can be acquired:
 # my_important_option = config.get_main_option("my_important_option")
@@ -52,6 +69,8 @@ def run_migrations_offline() -> None:
         target_metadata=target_metadata,
         literal_binds=True,
         dialect_opts={"paramstyle": "named"},
+        include_name=include_name,
+        include_object=include_object,
     )
 
     with context.begin_transaction():
@@ -59,7 +78,12 @@ def run_migrations_offline() -> None:
 
 
 def do_run_migrations(connection: Connection) -> None:
-    context.configure(connection=connection, target_metadata=target_metadata)
+    context.configure(
+        connection=connection,
+        target_metadata=target_metadata,
+        include_name=include_name,
+        include_object=include_object,
+    )
 
     with context.begin_transaction():
         context.run_migrations()
@@ -0,0 +1,53 @@
+"""Split product search vector by language
+
+Revision ID: 0002
+Revises: 0001
+Create Date: 2026-10-19 02:28:01.212302
+
+"""
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from alembic import op
+from sqlalchemy.dialects import postgresql
+
+# revision identifiers, used by Alembic.
+revision: str = '0002'
+down_revision: str | Sequence[str] | None = '0001'
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def _search_vector(name: str, *languages: str) -> sa.Column[str]:
+    """Вычисляемый поисковый вектор товара по названию (вес A) и описанию (вес B)."""
+    parts = [
+        f"setweight(to_tsvector('{language}', coalesce({column}, '')), '{weight}')"
+        for column, weight in (('name', 'A'), ('description', 'B'))
+        for language in languages
+    ]
+    return sa.Column(
+        name,
+        postgresql.TSVECTOR(),
+        sa.Computed(' || '.join(parts), persisted=True),
+        nullable=False,
+    )
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('products', _search_vector('tsv_en', 'english'))
+    op.add_column('products', _search_vector('tsv_ru', 'russian'))
+    op.create_index('ix_products_tsv_en_gin', 'products', ['tsv_en'], unique=False, postgresql_using='gin')
+    op.create_index('ix_products_tsv_ru_gin', 'products', ['tsv_ru'], unique=False, postgresql_using='gin')
+    op.drop_index('ix_products_tsv_gin', table_name='products', postgresql_using='gin')
+    op.drop_column('products', 'tsv')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.add_column('products', _search_vector('tsv', 'english', 'russian'))
+    op.create_index('ix_products_tsv_gin', 'products', ['tsv'], unique=False, postgresql_using='gin')
+    op.drop_index('ix_products_tsv_ru_gin', table_name='products', postgresql_using='gin')
+    op.drop_index('ix_products_tsv_en_gin', table_name='products', postgresql_using='gin')
+    op.drop_column('products', 'tsv_ru')
+    op.drop_column('products', 'tsv_en')
@@ -0,0 +1,53 @@
+"""Product sort columns and partial covering indexes
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-19 03:05:12.417530
+
+"""
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = '0003'
+down_revision: str | Sequence[str] | None = '0002'
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+SORT_COLUMNS = ('price', 'rating', 'created_at', 'sales_count')
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('products', sa.Column('sales_count', sa.Integer(), server_default=sa.text('0'), nullable=False))
+    op.add_column('products', sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False))
+
+    with op.get_context().autocommit_block():
+        for column in SORT_COLUMNS:
+            op.create_index(
+                f'ix_products_active_{column}',
+                'products',
+                [column, 'id'],
+                unique=False,
+                postgresql_where=sa.text('is_active'),
+                postgresql_concurrently=True,
+            )
+            op.create_index(
+                f'ix_products_active_category_{column}',
+                'products',
+                ['category_id', column, 'id'],
+                unique=False,
+                postgresql_where=sa.text('is_active'),
+                postgresql_concurrently=True,
+            )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    for column in SORT_COLUMNS:
+        op.drop_index(f'ix_products_active_category_{column}', table_name='products')
+        op.drop_index(f'ix_products_active_{column}', table_name='products')
+    op.drop_column('products', 'created_at')
+    op.drop_column('products', 'sales_count')
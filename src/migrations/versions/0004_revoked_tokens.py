@@ -0,0 +1,53 @@
+"""Revoked refresh tokens with change notifications
+
+Revision ID: 0004
+Revises: 0003
+Create Date: 2026-10-19 04:12:38.209514
+
+"""
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = '0004'
+down_revision: str | Sequence[str] | None = '0003'
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'revoked_tokens',
+        sa.Column('jti', sa.String(length=32), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('expires_at', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('revoked_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('jti'),
+    )
+    op.create_index(op.f('ix_revoked_tokens_user_id'), 'revoked_tokens', ['user_id'], unique=False)
+    op.create_index(op.f('ix_revoked_tokens_expires_at'), 'revoked_tokens', ['expires_at'], unique=False)
+    op.execute("""
+        CREATE OR REPLACE FUNCTION notify_token_revoked() RETURNS trigger AS $$
+        BEGIN
+            PERFORM pg_notify('revoked_tokens', NEW.jti || ':' || extract(epoch FROM NEW.expires_at)::bigint);
+            RETURN NEW;
+        END;
+        $$ LANGUAGE plpgsql
+    """)
+    op.execute("""
+        CREATE TRIGGER revoked_tokens_notify AFTER INSERT ON revoked_tokens
+        FOR EACH ROW EXECUTE FUNCTION notify_token_revoked()
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute('DROP TRIGGER IF EXISTS revoked_tokens_notify ON revoked_tokens')
+    op.execute('DROP FUNCTION IF EXISTS notify_token_revoked()')
+    op.drop_index(op.f('ix_revoked_tokens_expires_at'), table_name='revoked_tokens')
+    op.drop_index(op.f('ix_revoked_tokens_user_id'), table_name='revoked_tokens')
+    op.drop_table('revoked_tokens')
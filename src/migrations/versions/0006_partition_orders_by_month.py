@@ -0,0 +1,178 @@
+"""Partition orders and order items by month of order creation
+
+Revision ID: 0006
+Revises: 0005
+Create Date: 2026-10-19 06:14:52.301874
+
+Existing tables are renamed, their rows are copied into the new partitioned tables
+(partitions cover the whole order history) and the old tables are dropped. The id
+sequences are reused, so order and item IDs stay unchanged.
+"""
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = '0006'
+down_revision: str | Sequence[str] | None = '0005'
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+CREATE_ORDER_PARTITIONS_FUNCTION = """
+CREATE OR REPLACE FUNCTION create_order_partitions(start_at timestamptz, end_at timestamptz) RETURNS integer AS $$
+DECLARE
+    month_start timestamp := date_trunc('month', start_at AT TIME ZONE 'UTC');
+    month_end timestamp;
+    parent text;
+    partition text;
+    created integer := 0;
+BEGIN
+    PERFORM pg_advisory_xact_lock(hashtext('create_order_partitions'));
+    WHILE month_start <= end_at AT TIME ZONE 'UTC' LOOP
+        month_end := month_start + interval '1 month';
+        FOREACH parent IN ARRAY ARRAY['orders', 'order_items'] LOOP
+            partition := parent || '_' || to_char(month_start, 'YYYY_MM');
+            IF to_regclass(partition) IS NULL THEN
+                EXECUTE format(
+                    'CREATE TABLE %I PARTITION OF %I FOR VALUES FROM (%L) TO (%L)',
+                    partition, parent, month_start AT TIME ZONE 'UTC', month_end AT TIME ZONE 'UTC'
+                );
+                created := created + 1;
+            END IF;
+        END LOOP;
+        month_start := month_end;
+    END LOOP;
+    RETURN created;
+END;
+$$ LANGUAGE plpgsql
+"""
+LEGACY_RELATIONS = (
+    ('TABLE', 'orders'),
+    ('TABLE', 'order_items'),
+    ('INDEX', 'orders_pkey'),
+    ('INDEX', 'ix_orders_user_id'),
+    ('INDEX', 'order_items_pkey'),
+    ('INDEX', 'ix_order_items_order_id'),
+    ('INDEX', 'ix_order_items_product_id'),
+)
+
+
+def _rename_relations(relations: Sequence[tuple[str, str]], suffix: str) -> None:
+    for kind, name in relations:
+        op.execute(f'ALTER {kind} {name} RENAME TO {name}{suffix}')
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    _rename_relations(LEGACY_RELATIONS, '_legacy')
+
+    op.create_table(
+        'orders',
+        sa.Column('id', sa.Integer(), server_default=sa.text("nextval('orders_id_seq'::regclass)"), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('status', sa.String(length=20), nullable=False),
+        sa.Column('total_amount', sa.Numeric(precision=10, scale=2), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id', 'created_at'),
+        postgresql_partition_by='RANGE (created_at)',
+    )
+    op.create_index(
+        'ix_orders_user_created_at',
+        'orders',
+        ['user_id', sa.text('created_at DESC'), sa.text('id DESC')],
+        unique=False,
+        postgresql_include=['status', 'total_amount'],
+    )
+    op.create_table(
+        'order_items',
+        sa.Column('id', sa.Integer(), server_default=sa.text("nextval('order_items_id_seq'::regclass)"), nullable=False),
+        sa.Column('order_id', sa.Integer(), nullable=False),
+        sa.Column('order_created_at', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('product_id', sa.Integer(), nullable=False),
+        sa.Column('quantity', sa.Integer(), nullable=False),
+        sa.Column('unit_price', sa.Numeric(precision=10, scale=2), nullable=False),
+        sa.Column('total_price', sa.Numeric(precision=10, scale=2), nullable=False),
+        sa.ForeignKeyConstraint(['order_id', 'order_created_at'], ['orders.id', 'orders.created_at'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['product_id'], ['products.id']),
+        sa.PrimaryKeyConstraint('id', 'order_created_at'),
+        postgresql_partition_by='RANGE (order_created_at)',
+    )
+    op.create_index(op.f('ix_order_items_order_id'), 'order_items', ['order_id'], unique=False)
+    op.create_index(op.f('ix_order_items_product_id'), 'order_items', ['product_id'], unique=False)
+
+    op.execute(CREATE_ORDER_PARTITIONS_FUNCTION)
+    op.execute("""
+        SELECT create_order_partitions(coalesce(min(created_at), now()), now() + interval '3 months')
+        FROM orders_legacy
+    """)
+    op.execute('CREATE TABLE orders_default PARTITION OF orders DEFAULT')
+    op.execute('CREATE TABLE order_items_default PARTITION OF order_items DEFAULT')
+
+    op.execute("""
+        INSERT INTO orders (id, user_id, status, total_amount, created_at, updated_at)
+        SELECT id, user_id, status, total_amount, created_at, updated_at FROM orders_legacy
+    """)
+    op.execute("""
+        INSERT INTO order_items (id, order_id, order_created_at, product_id, quantity, unit_price, total_price)
+        SELECT items.id, items.order_id, orders.created_at, items.product_id, items.quantity, items.unit_price, items.total_price
+        FROM order_items_legacy AS items
+        JOIN orders_legacy AS orders ON orders.id = items.order_id
+    """)
+    op.execute('ALTER SEQUENCE orders_id_seq OWNED BY orders.id')
+    op.execute('ALTER SEQUENCE order_items_id_seq OWNED BY order_items.id')
+    op.drop_table('order_items_legacy')
+    op.drop_table('orders_legacy')
+    op.execute('ANALYZE orders, order_items')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    partitioned = (('TABLE', 'orders'), ('TABLE', 'order_items'), ('INDEX', 'ix_order_items_order_id'), ('INDEX', 'ix_order_items_product_id'))
+    _rename_relations(partitioned, '_partitioned')
+
+    op.create_table(
+        'orders',
+        sa.Column('id', sa.Integer(), server_default=sa.text("nextval('orders_id_seq'::regclass)"), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('status', sa.String(length=20), nullable=False),
+        sa.Column('total_amount', sa.Numeric(precision=10, scale=2), nullable=False),
+        sa.Column('created_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.Column('updated_at', sa.DateTime(timezone=True), server_default=sa.text('now()'), nullable=False),
+        sa.ForeignKeyConstraint(['user_id'], ['users.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('id', name='orders_plain_pkey'),
+    )
+    op.create_table(
+        'order_items',
+        sa.Column('id', sa.Integer(), server_default=sa.text("nextval('order_items_id_seq'::regclass)"), nullable=False),
+        sa.Column('order_id', sa.Integer(), nullable=False),
+        sa.Column('product_id', sa.Integer(), nullable=False),
+        sa.Column('quantity', sa.Integer(), nullable=False),
+        sa.Column('unit_price', sa.Numeric(precision=10, scale=2), nullable=False),
+        sa.Column('total_price', sa.Numeric(precision=10, scale=2), nullable=False),
+        sa.ForeignKeyConstraint(['order_id'], ['orders.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['product_id'], ['products.id']),
+        sa.PrimaryKeyConstraint('id', name='order_items_plain_pkey'),
+    )
+    op.execute("""
+        INSERT INTO orders (id, user_id, status, total_amount, created_at, updated_at)
+        SELECT id, user_id, status, total_amount, created_at, updated_at FROM orders_partitioned
+    """)
+    op.execute("""
+        INSERT INTO order_items (id, order_id, product_id, quantity, unit_price, total_price)
+        SELECT id, order_id, product_id, quantity, unit_price, total_price FROM order_items_partitioned
+    """)
+    op.execute('ALTER SEQUENCE orders_id_seq OWNED BY orders.id')
+    op.execute('ALTER SEQUENCE order_items_id_seq OWNED BY order_items.id')
+    op.drop_table('order_items_partitioned')
+    op.drop_table('orders_partitioned')
+    op.execute('DROP FUNCTION IF EXISTS create_order_partitions(timestamptz, timestamptz)')
+
+    op.execute('ALTER INDEX orders_plain_pkey RENAME TO orders_pkey')
+    op.execute('ALTER INDEX order_items_plain_pkey RENAME TO order_items_pkey')
+    op.create_index(op.f('ix_orders_user_id'), 'orders', ['user_id'], unique=False)
+    op.create_index(op.f('ix_order_items_order_id'), 'order_items', ['order_id'], unique=False)
+    op.create_index(op.f('ix_order_items_product_id'), 'order_items', ['product_id'], unique=False)
+    op.execute('ANALYZE orders, order_items')
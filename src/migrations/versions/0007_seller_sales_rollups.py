@@ -0,0 +1,70 @@
+"""Daily seller sales rollups for analytics
+
+Revision ID: 0007
+Revises: 0006
+Create Date: 2026-10-19 07:41:09.512337
+
+Rollups are backfilled from the existing order history; new orders are added
+by the outbox worker after checkout.
+"""
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = '0007'
+down_revision: str | Sequence[str] | None = '0006'
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'seller_daily_sales',
+        sa.Column('seller_id', sa.Integer(), nullable=False),
+        sa.Column('day', sa.Date(), nullable=False),
+        sa.Column('revenue', sa.Numeric(precision=14, scale=2), server_default='0', nullable=False),
+        sa.Column('units', sa.BigInteger(), server_default='0', nullable=False),
+        sa.Column('orders', sa.Integer(), server_default='0', nullable=False),
+        sa.ForeignKeyConstraint(['seller_id'], ['users.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('seller_id', 'day'),
+    )
+    op.create_table(
+        'seller_product_daily_sales',
+        sa.Column('seller_id', sa.Integer(), nullable=False),
+        sa.Column('day', sa.Date(), nullable=False),
+        sa.Column('product_id', sa.Integer(), nullable=False),
+        sa.Column('revenue', sa.Numeric(precision=14, scale=2), server_default='0', nullable=False),
+        sa.Column('units', sa.BigInteger(), server_default='0', nullable=False),
+        sa.ForeignKeyConstraint(['product_id'], ['products.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['seller_id'], ['users.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('seller_id', 'day', 'product_id'),
+    )
+    op.create_index(op.f('ix_seller_product_daily_sales_product_id'), 'seller_product_daily_sales', ['product_id'], unique=False)
+
+    op.execute("""
+        INSERT INTO seller_product_daily_sales (seller_id, day, product_id, revenue, units)
+        SELECT products.seller_id, (items.order_created_at AT TIME ZONE 'UTC')::date, items.product_id,
+               sum(items.total_price), sum(items.quantity)
+        FROM order_items AS items
+        JOIN products ON products.id = items.product_id
+        GROUP BY 1, 2, 3
+    """)
+    op.execute("""
+        INSERT INTO seller_daily_sales (seller_id, day, revenue, units, orders)
+        SELECT products.seller_id, (items.order_created_at AT TIME ZONE 'UTC')::date,
+               sum(items.total_price), sum(items.quantity), count(DISTINCT items.order_id)
+        FROM order_items AS items
+        JOIN products ON products.id = items.product_id
+        GROUP BY 1, 2
+    """)
+    op.execute('ANALYZE seller_daily_sales, seller_product_daily_sales')
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index(op.f('ix_seller_product_daily_sales_product_id'), table_name='seller_product_daily_sales')
+    op.drop_table('seller_product_daily_sales')
+    op.drop_table('seller_daily_sales')
@@ -0,0 +1,46 @@
+"""Time-limited stock reservations for cart items
+
+Revision ID: 0008
+Revises: 0007
+Create Date: 2026-10-19 08:26:37.190452
+
+"""
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = '0008'
+down_revision: str | Sequence[str] | None = '0007'
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'stock_reservations',
+        sa.Column('cart_item_id', sa.Integer(), nullable=False),
+        sa.Column('user_id', sa.Integer(), nullable=False),
+        sa.Column('product_id', sa.Integer(), nullable=False),
+        sa.Column('quantity', sa.Integer(), nullable=False),
+        sa.Column('expires_at', sa.DateTime(timezone=True), nullable=False),
+        sa.ForeignKeyConstraint(['cart_item_id'], ['cart_items.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('cart_item_id'),
+    )
+    op.create_index('ix_stock_reservations_expires_at', 'stock_reservations', ['expires_at'], unique=False)
+    op.create_index(
+        'ix_stock_reservations_product_expires_at',
+        'stock_reservations',
+        ['product_id', 'expires_at'],
+        unique=False,
+        postgresql_include=['user_id', 'quantity'],
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_stock_reservations_product_expires_at', table_name='stock_reservations')
+    op.drop_index('ix_stock_reservations_expires_at', table_name='stock_reservations')
+    op.drop_table('stock_reservations')
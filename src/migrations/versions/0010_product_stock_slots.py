@@ -0,0 +1,42 @@
+"""Stock counter slots for hot products
+
+Revision ID: 0010
+Revises: 0009
+Create Date: 2026-10-19 09:52:16.304718
+
+"""
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = '0010'
+down_revision: str | Sequence[str] | None = '0009'
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('products', sa.Column('stock_slots', sa.SmallInteger(), server_default=sa.text('0'), nullable=False))
+    op.create_table(
+        'product_stock_slots',
+        sa.Column('product_id', sa.Integer(), nullable=False),
+        sa.Column('slot', sa.SmallInteger(), nullable=False),
+        sa.Column('stock', sa.Integer(), nullable=False),
+        sa.CheckConstraint('stock >= 0', name='check_stock_slot_non_negative'),
+        sa.ForeignKeyConstraint(['product_id'], ['products.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('product_id', 'slot'),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.execute("""
+        UPDATE products SET stock = slots.stock
+        FROM (SELECT product_id, sum(stock) AS stock FROM product_stock_slots GROUP BY product_id) AS slots
+        WHERE products.id = slots.product_id
+    """)
+    op.drop_table('product_stock_slots')
+    op.drop_column('products', 'stock_slots')
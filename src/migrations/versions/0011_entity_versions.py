@@ -0,0 +1,29 @@
+"""Row versions for optimistic concurrency of products and categories
+
+Revision ID: 0011
+Revises: 0010
+Create Date: 2026-10-19 10:31:48.127905
+
+"""
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = '0011'
+down_revision: str | Sequence[str] | None = '0010'
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('products', sa.Column('version', sa.Integer(), server_default=sa.text('1'), nullable=False))
+    op.add_column('categories', sa.Column('version', sa.Integer(), server_default=sa.text('1'), nullable=False))
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('categories', 'version')
+    op.drop_column('products', 'version')
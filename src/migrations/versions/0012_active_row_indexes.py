@@ -0,0 +1,54 @@
+"""Partial indexes on active reviews, seller products and child categories
+
+Revision ID: 0012
+Revises: 0011
+Create Date: 2026-10-19 11:04:27.658213
+
+"""
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = '0012'
+down_revision: str | Sequence[str] | None = '0011'
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    with op.get_context().autocommit_block():
+        op.create_index(
+            'ix_reviews_active_product_user',
+            'reviews',
+            ['product_id', 'user_id'],
+            unique=False,
+            postgresql_where=sa.text('is_active'),
+            postgresql_include=['grade'],
+            postgresql_concurrently=True,
+        )
+        op.create_index(
+            'ix_products_active_seller',
+            'products',
+            ['seller_id', 'id'],
+            unique=False,
+            postgresql_where=sa.text('is_active'),
+            postgresql_concurrently=True,
+        )
+        op.create_index(
+            'ix_categories_active_parent_id',
+            'categories',
+            ['parent_id'],
+            unique=False,
+            postgresql_where=sa.text('is_active'),
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_categories_active_parent_id', table_name='categories')
+    op.drop_index('ix_products_active_seller', table_name='products')
+    op.drop_index('ix_reviews_active_product_user', table_name='reviews')
@@ -0,0 +1,53 @@
+"""Cascade flags for category subtree deactivation
+
+Revision ID: 0013
+Revises: 0012
+Create Date: 2026-10-19 11:38:52.904316
+
+Active subcategories and products under already inactive categories are
+deactivated as if the cascade had been applied, so read paths can rely on
+their own is_active flag.
+"""
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = '0013'
+down_revision: str | Sequence[str] | None = '0012'
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column('categories', sa.Column('deactivated_by_cascade', sa.Boolean(), server_default=sa.text('false'), nullable=False))
+    op.add_column('products', sa.Column('deactivated_by_cascade', sa.Boolean(), server_default=sa.text('false'), nullable=False))
+
+    op.execute("""
+        WITH RECURSIVE hidden AS (
+            SELECT children.id
+            FROM categories AS children
+            JOIN categories AS parents ON parents.id = children.parent_id
+            WHERE children.is_active AND NOT parents.is_active
+            UNION
+            SELECT categories.id
+            FROM categories
+            JOIN hidden ON categories.parent_id = hidden.id
+            WHERE categories.is_active
+        )
+        UPDATE categories SET is_active = false, deactivated_by_cascade = true
+        WHERE id IN (SELECT id FROM hidden)
+    """)
+    op.execute("""
+        UPDATE products SET is_active = false, deactivated_by_cascade = true
+        FROM categories
+        WHERE categories.id = products.category_id AND products.is_active AND NOT categories.is_active
+    """)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column('products', 'deactivated_by_cascade')
+    op.drop_column('categories', 'deactivated_by_cascade')
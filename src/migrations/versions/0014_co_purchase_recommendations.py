@@ -0,0 +1,58 @@
+"""Co-purchase matrix and precomputed product recommendations
+
+Revision ID: 0014
+Revises: 0013
+Create Date: 2026-10-19 12:16:05.381942
+
+The recommendations job creates its watermark on the first run and builds
+the matrix from the existing order history in batches.
+"""
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = '0014'
+down_revision: str | Sequence[str] | None = '0013'
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'product_co_purchases',
+        sa.Column('product_id', sa.Integer(), nullable=False),
+        sa.Column('related_id', sa.Integer(), nullable=False),
+        sa.Column('orders', sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(['product_id'], ['products.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['related_id'], ['products.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('product_id', 'related_id'),
+    )
+    op.create_table(
+        'product_recommendations',
+        sa.Column('product_id', sa.Integer(), nullable=False),
+        sa.Column('rank', sa.SmallInteger(), nullable=False),
+        sa.Column('related_id', sa.Integer(), nullable=False),
+        sa.Column('orders', sa.Integer(), nullable=False),
+        sa.ForeignKeyConstraint(['product_id'], ['products.id'], ondelete='CASCADE'),
+        sa.ForeignKeyConstraint(['related_id'], ['products.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('product_id', 'rank'),
+    )
+    op.create_table(
+        'order_watermarks',
+        sa.Column('name', sa.String(length=50), nullable=False),
+        sa.Column('order_created_at', sa.DateTime(timezone=True), nullable=True),
+        sa.Column('order_id', sa.Integer(), nullable=True),
+        sa.PrimaryKeyConstraint('name'),
+    )
+    op.create_index('ix_orders_created_at_id', 'orders', ['created_at', 'id'], unique=False)
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_index('ix_orders_created_at_id', table_name='orders')
+    op.drop_table('order_watermarks')
+    op.drop_table('product_recommendations')
+    op.drop_table('product_co_purchases')
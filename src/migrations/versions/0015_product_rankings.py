@@ -0,0 +1,60 @@
+"""Hourly product activity counters and precomputed product rankings
+
+Revision ID: 0015
+Revises: 0014
+Create Date: 2026-10-19 15:42:11.204518
+
+Sales of the last week (the default bestsellers period) are backfilled from
+order items; views are only counted from now on. The rankings job fills
+product_rankings on its first run.
+"""
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = '0015'
+down_revision: str | Sequence[str] | None = '0014'
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.create_table(
+        'product_activity',
+        sa.Column('product_id', sa.Integer(), nullable=False),
+        sa.Column('bucket', sa.DateTime(timezone=True), nullable=False),
+        sa.Column('views', sa.Integer(), server_default='0', nullable=False),
+        sa.Column('sales', sa.Integer(), server_default='0', nullable=False),
+        sa.ForeignKeyConstraint(['product_id'], ['products.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('product_id', 'bucket'),
+    )
+    op.create_index(op.f('ix_product_activity_bucket'), 'product_activity', ['bucket'], unique=False)
+    op.create_table(
+        'product_rankings',
+        sa.Column('ranking', sa.String(length=20), nullable=False),
+        sa.Column('category_id', sa.Integer(), nullable=False),
+        sa.Column('rank', sa.SmallInteger(), nullable=False),
+        sa.Column('product_id', sa.Integer(), nullable=False),
+        sa.Column('score', sa.Float(), nullable=False),
+        sa.ForeignKeyConstraint(['product_id'], ['products.id'], ondelete='CASCADE'),
+        sa.PrimaryKeyConstraint('ranking', 'category_id', 'rank'),
+    )
+    op.execute(
+        """
+        INSERT INTO product_activity (product_id, bucket, sales)
+        SELECT product_id, date_trunc('hour', order_created_at, 'UTC'), sum(quantity)
+        FROM order_items
+        WHERE order_created_at >= now() - interval '7 days'
+        GROUP BY 1, 2
+        """,
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_table('product_rankings')
+    op.drop_index(op.f('ix_product_activity_bucket'), table_name='product_activity')
+    op.drop_table('product_activity')
@@ -1,8 +1,18 @@
-from src.models.cart import CartItem
+from src.models.analytics import SellerDailySales, SellerProductDailySales
+from src.models.cart import CartItem, StockReservation
 from src.models.categories import Category
+from src.models.idempotency import IdempotencyKey
 from src.models.orders import Order, OrderItem
-from src.models.products import Product
+from src.models.outbox import OutboxEvent
+from src.models.products import Product, ProductStockSlot
+from src.models.rankings import ProductActivity, ProductRanking
+from src.models.recommendations import OrderWatermark, ProductCoPurchase, ProductRecommendation
 from src.models.reviews import Review
+from src.models.tokens import RevokedToken
 from src.models.users import User
 
-__all__ = ['Category', 'CartItem', 'Order', 'OrderItem', 'Product', 'Review', 'User']
+__all__ = [
+    'Category', 'CartItem', 'IdempotencyKey', 'Order', 'OrderItem', 'OrderWatermark', 'OutboxEvent', 'Product', 'ProductActivity',
+    'ProductCoPurchase', 'ProductRanking', 'ProductRecommendation', 'ProductStockSlot', 'Review', 'RevokedToken', 'SellerDailySales',
+    'SellerProductDailySales', 'StockReservation', 'User',
+]
@@ -0,0 +1,27 @@
+from datetime import date
+from decimal import Decimal
+
+from sqlalchemy import BigInteger, Date, ForeignKey, Integer, Numeric
+from sqlalchemy.orm import Mapped, mapped_column
+
+from src.services.database.postgresql import Base
+
+
+class SellerDailySales(Base):
+    __tablename__ = 'seller_daily_sales'
+
+    seller_id: Mapped[int] = mapped_column(ForeignKey('users.id', ondelete='CASCADE'), primary_key=True)
+    day: Mapped[date] = mapped_column(Date, primary_key=True)
+    revenue: Mapped[Decimal] = mapped_column(Numeric(14, 2), default=0, server_default='0', nullable=False)
+    units: Mapped[int] = mapped_column(BigInteger, default=0, server_default='0', nullable=False)
+    orders: Mapped[int] = mapped_column(Integer, default=0, server_default='0', nullable=False)
+
+
+class SellerProductDailySales(Base):
+    __tablename__ = 'seller_product_daily_sales'
+
+    seller_id: Mapped[int] = mapped_column(ForeignKey('users.id', ondelete='CASCADE'), primary_key=True)
+    day: Mapped[date] = mapped_column(Date, primary_key=True)
+    product_id: Mapped[int] = mapped_column(ForeignKey('products.id', ondelete='CASCADE'), primary_key=True, index=True)
+    revenue: Mapped[Decimal] = mapped_column(Numeric(14, 2), default=0, server_default='0', nullable=False)
+    units: Mapped[int] = mapped_column(BigInteger, default=0, server_default='0', nullable=False)
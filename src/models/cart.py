@@ -1,7 +1,7 @@
-from datetime import datetime
+from datetime import UTC, datetime
 from typing import TYPE_CHECKING
 
-from sqlalchemy import DateTime, ForeignKey, Integer, UniqueConstraint, func
+from sqlalchemy import DateTime, ForeignKey, Index, Integer, UniqueConstraint, func
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from src.services.database.postgresql import Base
@@ -26,3 +26,25 @@ class CartItem(Base):
 
     user: Mapped['User'] = relationship('User', back_populates='cart_items')
     product: Mapped['Product'] = relationship('Product', back_populates='cart_items')
+    reservation: Mapped['StockReservation | None'] = relationship('StockReservation', passive_deletes=True)
+
+    @property
+    def reserved_until(self) -> datetime | None:
+        """Срок действия резерва позиции; None — товар не зарезервирован или резерв истёк."""
+        if self.reservation is None or self.reservation.expires_at <= datetime.now(UTC):
+            return None
+        return self.reservation.expires_at
+
+
+class StockReservation(Base):
+    __tablename__ = 'stock_reservations'
+    __table_args__ = (
+        Index('ix_stock_reservations_product_expires_at', 'product_id', 'expires_at', postgresql_include=['user_id', 'quantity']),
+        Index('ix_stock_reservations_expires_at', 'expires_at'),
+    )
+
+    cart_item_id: Mapped[int] = mapped_column(ForeignKey('cart_items.id', ondelete='CASCADE'), primary_key=True)
+    user_id: Mapped[int] = mapped_column(Integer, nullable=False)
+    product_id: Mapped[int] = mapped_column(Integer, nullable=False)
+    quantity: Mapped[int] = mapped_column(Integer, nullable=False)
+    expires_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
@@ -1,6 +1,6 @@
 from typing import TYPE_CHECKING
 
-from sqlalchemy import Boolean, ForeignKey, Integer, String
+from sqlalchemy import Boolean, ForeignKey, Index, Integer, String, text
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from src.services.database.postgresql import Base
@@ -16,6 +16,8 @@ class Category(Base):
     name: Mapped[str] = mapped_column(String(50), nullable=False)
     parent_id: Mapped[int | None] = mapped_column(ForeignKey('categories.id'), nullable=True)
     is_active: Mapped[bool] = mapped_column(Boolean, default=True)
+    deactivated_by_cascade: Mapped[bool] = mapped_column(Boolean, default=False, server_default=text('false'), nullable=False)
+    version: Mapped[int] = mapped_column(Integer, default=1, server_default=text('1'), nullable=False)
     products: Mapped[list['Product']] = relationship(
         back_populates='category',
         cascade='all, delete-orphan',
@@ -25,3 +27,4 @@ class Category(Base):
         remote_side='Category.id',
     )
     children: Mapped[list['Category']] = relationship(back_populates='parent')
+    __table_args__ = (Index('ix_categories_active_parent_id', 'parent_id', postgresql_where=text('is_active')),)
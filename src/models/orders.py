@@ -2,7 +2,7 @@ from datetime import datetime
 from decimal import Decimal
 from typing import TYPE_CHECKING
 
-from sqlalchemy import DateTime, ForeignKey, Integer, Numeric, String, func
+from sqlalchemy import DDL, DateTime, ForeignKey, ForeignKeyConstraint, Index, Integer, Numeric, String, event, func
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from src.services.database.postgresql import Base
@@ -10,26 +10,74 @@ from src.services.database.postgresql import Base
 if TYPE_CHECKING:
     from src.models import Product, User
 
+# месячные секции orders_YYYY_MM и order_items_YYYY_MM создаются функцией заранее; строки вне созданных
+# диапазонов попадают в секции по умолчанию, поэтому вставка заказа никогда не завершается ошибкой
+ORDER_PARTITION_PATTERN = r'^(orders|order_items)_(\d{4}_\d{2}|default)$'
+CREATE_ORDER_PARTITIONS_FUNCTION = """
+CREATE OR REPLACE FUNCTION create_order_partitions(start_at timestamptz, end_at timestamptz) RETURNS integer AS $$
+DECLARE
+    month_start timestamp := date_trunc('month', start_at AT TIME ZONE 'UTC');
+    month_end timestamp;
+    parent text;
+    partition text;
+    created integer := 0;
+BEGIN
+    PERFORM pg_advisory_xact_lock(hashtext('create_order_partitions'));
+    WHILE month_start <= end_at AT TIME ZONE 'UTC' LOOP
+        month_end := month_start + interval '1 month';
+        FOREACH parent IN ARRAY ARRAY['orders', 'order_items'] LOOP
+            partition := parent || '_' || to_char(month_start, 'YYYY_MM');
+            IF to_regclass(partition) IS NULL THEN
+                EXECUTE format(
+                    'CREATE TABLE %I PARTITION OF %I FOR VALUES FROM (%L) TO (%L)',
+                    partition, parent, month_start AT TIME ZONE 'UTC', month_end AT TIME ZONE 'UTC'
+                );
+                created := created + 1;
+            END IF;
+        END LOOP;
+        month_start := month_end;
+    END LOOP;
+    RETURN created;
+END;
+$$ LANGUAGE plpgsql
+"""
+CREATE_DEFAULT_ORDER_PARTITIONS = (
+    'CREATE TABLE IF NOT EXISTS orders_default PARTITION OF orders DEFAULT',
+    'CREATE TABLE IF NOT EXISTS order_items_default PARTITION OF order_items DEFAULT',
+)
+
 
 class Order(Base):
     __tablename__ = 'orders'
 
-    id: Mapped[int] = mapped_column(primary_key=True)
-    user_id: Mapped[int] = mapped_column(ForeignKey('users.id', ondelete='CASCADE'), nullable=False, index=True)
+    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
+    user_id: Mapped[int] = mapped_column(ForeignKey('users.id', ondelete='CASCADE'), nullable=False)
     status: Mapped[str] = mapped_column(String(20), default='pending', nullable=False)
     total_amount: Mapped[Decimal] = mapped_column(Numeric(10, 2), default=0, nullable=False)
-    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), primary_key=True, server_default=func.now(), nullable=False)
     updated_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False)
 
     user: Mapped['User'] = relationship('User', back_populates='orders')
     items: Mapped[list['OrderItem']] = relationship('OrderItem', back_populates='order', cascade='all, delete-orphan')
+    __table_args__ = (
+        Index(
+            'ix_orders_user_created_at',
+            'user_id',
+            created_at.desc(),
+            id.desc(),
+            postgresql_include=['status', 'total_amount'],
+        ),
+        Index('ix_orders_created_at_id', 'created_at', 'id'),
+        {'postgresql_partition_by': 'RANGE (created_at)'},
+    )
 
 
 class OrderItem(Base):
     __tablename__ = 'order_items'
 
-    id: Mapped[int] = mapped_column(primary_key=True)
-    order_id: Mapped[int] = mapped_column(ForeignKey('orders.id', ondelete='CASCADE'), nullable=False, index=True)
+    id: Mapped[int] = mapped_column(primary_key=True, autoincrement=True)
+    order_id: Mapped[int] = mapped_column(Integer, nullable=False, index=True)
+    order_created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), primary_key=True, nullable=False)
     product_id: Mapped[int] = mapped_column(ForeignKey('products.id'), nullable=False, index=True)
     quantity: Mapped[int] = mapped_column(Integer, nullable=False)
     unit_price: Mapped[Decimal] = mapped_column(Numeric(10, 2), nullable=False)
@@ -37,3 +85,18 @@ class OrderItem(Base):
 
     order: Mapped['Order'] = relationship('Order', back_populates='items')
     product: Mapped['Product'] = relationship('Product', back_populates='order_items')
+    __table_args__ = (
+        ForeignKeyConstraint(['order_id', 'order_created_at'], ['orders.id', 'orders.created_at'], ondelete='CASCADE'),
+        {'postgresql_partition_by': 'RANGE (order_created_at)'},
+    )
+
+
+# DDL подставляет параметры через %, поэтому спецификаторы format() экранируются
+event.listen(OrderItem.__table__, 'after_create', DDL(CREATE_ORDER_PARTITIONS_FUNCTION.replace('%', '%%')))  # type: ignore[no-untyped-call]
+for statement in CREATE_DEFAULT_ORDER_PARTITIONS:
+    event.listen(OrderItem.__table__, 'after_create', DDL(statement))  # type: ignore[no-untyped-call]
+event.listen(
+    OrderItem.__table__,
+    'after_create',
+    DDL("SELECT create_order_partitions(now(), now() + interval '3 months')"),  # type: ignore[no-untyped-call]
+)
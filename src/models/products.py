@@ -1,7 +1,22 @@
+from datetime import datetime
 from decimal import Decimal
 from typing import TYPE_CHECKING
 
-from sqlalchemy import Boolean, Computed, Float, ForeignKey, Index, Integer, Numeric, String, text
+from sqlalchemy import (
+    Boolean,
+    CheckConstraint,
+    Computed,
+    DateTime,
+    Float,
+    ForeignKey,
+    Index,
+    Integer,
+    Numeric,
+    SmallInteger,
+    String,
+    func,
+    text,
+)
 from sqlalchemy.dialects.postgresql import TSVECTOR
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
@@ -21,21 +36,37 @@ class Product(Base):
     image_url: Mapped[str | None] = mapped_column(String(200), nullable=True)
     stock: Mapped[int] = mapped_column(Integer, nullable=False)
     is_active: Mapped[bool] = mapped_column(Boolean, default=True)
+    deactivated_by_cascade: Mapped[bool] = mapped_column(Boolean, default=False, server_default=text('false'), nullable=False)
     category_id: Mapped[int] = mapped_column(ForeignKey('categories.id'), nullable=False)
     seller_id: Mapped[int] = mapped_column(ForeignKey('users.id'), nullable=False)
     rating: Mapped[float] = mapped_column(Float, default=0.0, server_default=text('0'))
-    tsv: Mapped[TSVECTOR] = mapped_column(
+    sales_count: Mapped[int] = mapped_column(Integer, default=0, server_default=text('0'))
+    stock_slots: Mapped[int] = mapped_column(SmallInteger, default=0, server_default=text('0'), nullable=False)
+    version: Mapped[int] = mapped_column(Integer, default=1, server_default=text('1'), nullable=False)
+    created_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+    tsv_en: Mapped[TSVECTOR] = mapped_column(
         TSVECTOR,
         Computed(
             """
             setweight(to_tsvector('english', coalesce(name, '')), 'A')
-            || setweight(to_tsvector('russian', coalesce(name, '')), 'A')
             || setweight(to_tsvector('english', coalesce(description, '')), 'B')
+            """,
+            persisted=True,
+        ),
+        nullable=False,
+        deferred=True,
+    )
+    tsv_ru: Mapped[TSVECTOR] = mapped_column(
+        TSVECTOR,
+        Computed(
+            """
+            setweight(to_tsvector('russian', coalesce(name, '')), 'A')
             || setweight(to_tsvector('russian', coalesce(description, '')), 'B')
             """,
             persisted=True,
         ),
         nullable=False,
+        deferred=True,
     )
 
     category: Mapped['Category'] = relationship('Category', back_populates='products')
@@ -44,5 +75,26 @@ class Product(Base):
     cart_items: Mapped[list['CartItem']] = relationship('CartItem', back_populates='product', cascade='all, delete-orphan')
     order_items: Mapped[list['OrderItem']] = relationship('OrderItem', back_populates='product')
     __table_args__ = (
-        Index('ix_products_tsv_gin', 'tsv', postgresql_using='gin'),
+        Index('ix_products_tsv_en_gin', 'tsv_en', postgresql_using='gin'),
+        Index('ix_products_tsv_ru_gin', 'tsv_ru', postgresql_using='gin'),
+        Index('ix_products_active_price', 'price', 'id', postgresql_where=text('is_active')),
+        Index('ix_products_active_category_price', 'category_id', 'price', 'id', postgresql_where=text('is_active')),
+        Index('ix_products_active_rating', 'rating', 'id', postgresql_where=text('is_active')),
+        Index('ix_products_active_category_rating', 'category_id', 'rating', 'id', postgresql_where=text('is_active')),
+        Index('ix_products_active_created_at', 'created_at', 'id', postgresql_where=text('is_active')),
+        Index('ix_products_active_category_created_at', 'category_id', 'created_at', 'id', postgresql_where=text('is_active')),
+        Index('ix_products_active_sales_count', 'sales_count', 'id', postgresql_where=text('is_active')),
+        Index('ix_products_active_category_sales_count', 'category_id', 'sales_count', 'id', postgresql_where=text('is_active')),
+        Index('ix_products_active_seller', 'seller_id', 'id', postgresql_where=text('is_active')),
     )
+
+
+class ProductStockSlot(Base):
+    __tablename__ = 'product_stock_slots'
+    __table_args__ = (
+        CheckConstraint('stock >= 0', name='check_stock_slot_non_negative'),
+    )
+
+    product_id: Mapped[int] = mapped_column(ForeignKey('products.id', ondelete='CASCADE'), primary_key=True)
+    slot: Mapped[int] = mapped_column(SmallInteger, primary_key=True)
+    stock: Mapped[int] = mapped_column(Integer, nullable=False)
@@ -0,0 +1,25 @@
+from datetime import datetime
+
+from sqlalchemy import DateTime, Float, ForeignKey, Integer, SmallInteger, String
+from sqlalchemy.orm import Mapped, mapped_column
+
+from src.services.database.postgresql import Base
+
+
+class ProductActivity(Base):
+    __tablename__ = 'product_activity'
+
+    product_id: Mapped[int] = mapped_column(ForeignKey('products.id', ondelete='CASCADE'), primary_key=True)
+    bucket: Mapped[datetime] = mapped_column(DateTime(timezone=True), primary_key=True, index=True)
+    views: Mapped[int] = mapped_column(Integer, default=0, server_default='0', nullable=False)
+    sales: Mapped[int] = mapped_column(Integer, default=0, server_default='0', nullable=False)
+
+
+class ProductRanking(Base):
+    __tablename__ = 'product_rankings'
+
+    ranking: Mapped[str] = mapped_column(String(20), primary_key=True)
+    category_id: Mapped[int] = mapped_column(Integer, primary_key=True)
+    rank: Mapped[int] = mapped_column(SmallInteger, primary_key=True)
+    product_id: Mapped[int] = mapped_column(ForeignKey('products.id', ondelete='CASCADE'), nullable=False)
+    score: Mapped[float] = mapped_column(Float, nullable=False)
@@ -0,0 +1,31 @@
+from datetime import datetime
+
+from sqlalchemy import DateTime, ForeignKey, Integer, SmallInteger, String
+from sqlalchemy.orm import Mapped, mapped_column
+
+from src.services.database.postgresql import Base
+
+
+class ProductCoPurchase(Base):
+    __tablename__ = 'product_co_purchases'
+
+    product_id: Mapped[int] = mapped_column(ForeignKey('products.id', ondelete='CASCADE'), primary_key=True)
+    related_id: Mapped[int] = mapped_column(ForeignKey('products.id', ondelete='CASCADE'), primary_key=True)
+    orders: Mapped[int] = mapped_column(Integer, nullable=False)
+
+
+class ProductRecommendation(Base):
+    __tablename__ = 'product_recommendations'
+
+    product_id: Mapped[int] = mapped_column(ForeignKey('products.id', ondelete='CASCADE'), primary_key=True)
+    rank: Mapped[int] = mapped_column(SmallInteger, primary_key=True)
+    related_id: Mapped[int] = mapped_column(ForeignKey('products.id', ondelete='CASCADE'), nullable=False)
+    orders: Mapped[int] = mapped_column(Integer, nullable=False)
+
+
+class OrderWatermark(Base):
+    __tablename__ = 'order_watermarks'
+
+    name: Mapped[str] = mapped_column(String(50), primary_key=True)
+    order_created_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
+    order_id: Mapped[int | None] = mapped_column(Integer, nullable=True)
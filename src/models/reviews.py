@@ -1,7 +1,7 @@
 from datetime import datetime
 from typing import TYPE_CHECKING
 
-from sqlalchemy import Boolean, CheckConstraint, DateTime, ForeignKey, Integer, Text
+from sqlalchemy import Boolean, CheckConstraint, DateTime, ForeignKey, Index, Integer, Text, text
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
 from src.services.database.postgresql import Base
@@ -25,4 +25,5 @@ class Review(Base):
 
     __table_args__ = (
         CheckConstraint("grade >= 1 AND grade <= 5", name="check_grade_range"),
+        Index('ix_reviews_active_product_user', 'product_id', 'user_id', postgresql_where=text('is_active'), postgresql_include=['grade']),
     )
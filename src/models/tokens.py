@@ -0,0 +1,33 @@
+from datetime import datetime
+
+from sqlalchemy import DDL, DateTime, ForeignKey, String, event, func
+from sqlalchemy.orm import Mapped, mapped_column
+
+from src.services.database.postgresql import Base
+
+REVOCATION_CHANNEL = 'revoked_tokens'
+NOTIFY_REVOCATION_FUNCTION = f"""
+CREATE OR REPLACE FUNCTION notify_token_revoked() RETURNS trigger AS $$
+BEGIN
+    PERFORM pg_notify('{REVOCATION_CHANNEL}', NEW.jti || ':' || extract(epoch FROM NEW.expires_at)::bigint);
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql
+"""
+NOTIFY_REVOCATION_TRIGGER = """
+CREATE TRIGGER revoked_tokens_notify AFTER INSERT ON revoked_tokens
+FOR EACH ROW EXECUTE FUNCTION notify_token_revoked()
+"""
+
+
+class RevokedToken(Base):
+    __tablename__ = 'revoked_tokens'
+
+    jti: Mapped[str] = mapped_column(String(32), primary_key=True)
+    user_id: Mapped[int] = mapped_column(ForeignKey('users.id', ondelete='CASCADE'), nullable=False, index=True)
+    expires_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False, index=True)
+    revoked_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+
+event.listen(RevokedToken.__table__, 'after_create', DDL(NOTIFY_REVOCATION_FUNCTION))  # type: ignore[no-untyped-call]
+event.listen(RevokedToken.__table__, 'after_create', DDL(NOTIFY_REVOCATION_TRIGGER))  # type: ignore[no-untyped-call]
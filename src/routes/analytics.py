@@ -0,0 +1,98 @@
+from decimal import Decimal
+from typing import Annotated
+
+from fastapi import APIRouter, Depends, Query, status
+from sqlalchemy import Date, cast, func, select
+
+from src.api.auth import is_authorized
+from src.dependencies import AsyncDatabaseDep
+from src.models import (
+    Product as ProductModel,
+    SellerDailySales as SellerDailySalesModel,
+    SellerProductDailySales as SellerProductDailySalesModel,
+)
+from src.models.users import User as UserModel
+from src.schemas import SalesPoint, SalesReport, SalesReportRequest, TopProduct, TopProducts, TopProductsRequest
+from src.utils.routes import _get_report_period
+
+router = APIRouter(prefix='/analytics', tags=['analytics'])
+
+
+@router.get(
+    path='/sales',
+    response_model=SalesReport,
+    status_code=status.HTTP_200_OK,
+)
+async def get_sales_report(
+    params: Annotated[SalesReportRequest, Query()],
+    database: AsyncDatabaseDep,
+    current_user: UserModel = Depends(is_authorized(permissions=('seller',))),
+) -> SalesReport:
+    """Выручка, проданные единицы и заказы продавца по дням или неделям.
+
+    Отчёт читает дневные агрегаты, которые пополняются после оформления заказов,
+    поэтому стоимость запроса зависит только от длины периода, но не от числа заказов.
+    """
+    date_from, date_to = _get_report_period(params.date_from, params.date_to)
+    day = SellerDailySalesModel.day
+    period = day if params.granularity == 'day' else cast(func.date_trunc('week', day), Date)
+    result = await database.execute(
+        select(
+            period.label('period'),
+            func.sum(SellerDailySalesModel.revenue),
+            func.sum(SellerDailySalesModel.units),
+            func.sum(SellerDailySalesModel.orders),
+        )
+        .where(SellerDailySalesModel.seller_id == current_user.id, day.between(date_from, date_to))
+        .group_by(period)
+        .order_by(period),
+    )
+    items = [SalesPoint(period=row[0], revenue=row[1], units=row[2], orders=row[3]) for row in result.all()]
+    return SalesReport(
+        date_from=date_from,
+        date_to=date_to,
+        granularity=params.granularity,
+        items=items,
+        revenue=sum((item.revenue for item in items), Decimal('0')),
+        units=sum(item.units for item in items),
+        orders=sum(item.orders for item in items),
+    )
+
+
+@router.get(
+    path='/top-products',
+    response_model=TopProducts,
+    status_code=status.HTTP_200_OK,
+)
+async def get_top_products(
+    params: Annotated[TopProductsRequest, Query()],
+    database: AsyncDatabaseDep,
+    current_user: UserModel = Depends(is_authorized(permissions=('seller',))),
+) -> TopProducts:
+    """Самые продаваемые товары продавца за период по выручке или количеству единиц."""
+    date_from, date_to = _get_report_period(params.date_from, params.date_to)
+    totals = (
+        select(
+            SellerProductDailySalesModel.product_id,
+            func.sum(SellerProductDailySalesModel.revenue).label('revenue'),
+            func.sum(SellerProductDailySalesModel.units).label('units'),
+        )
+        .where(
+            SellerProductDailySalesModel.seller_id == current_user.id,
+            SellerProductDailySalesModel.day.between(date_from, date_to),
+        )
+        .group_by(SellerProductDailySalesModel.product_id)
+        .subquery()
+    )
+    sort_column = totals.c.revenue if params.sort == 'revenue' else totals.c.units
+    result = await database.execute(
+        select(totals.c.product_id, ProductModel.name, totals.c.revenue, totals.c.units)
+        .join(ProductModel, ProductModel.id == totals.c.product_id)
+        .order_by(sort_column.desc(), totals.c.product_id)
+        .limit(params.limit),
+    )
+    return TopProducts(
+        date_from=date_from,
+        date_to=date_to,
+        items=[TopProduct(product_id=row[0], name=row[1], revenue=row[2], units=row[3]) for row in result.all()],
+    )
@@ -1,15 +1,33 @@
+from collections.abc import Sequence
 from decimal import Decimal
 
 from fastapi import APIRouter, Depends, HTTPException, Response, status
-from sqlalchemy import delete, select
+from sqlalchemy import delete, func, select
 from sqlalchemy.orm import selectinload
 
 from src.api.auth import is_authorized
-from src.dependencies import AsyncDatabaseDep
+from src.dependencies import AsyncDatabaseDep, SettingsDep
+from src.models import Product as ProductModel, ProductRecommendation as ProductRecommendationModel
 from src.models.cart import CartItem as CartItemModel
 from src.models.users import User as UserModel
-from src.schemas import Cart as CartSchema, CartItem as CartItemSchema, CartItemCreate, CartItemUpdate
-from src.utils.routes import _get_cart_item, _validate_parent_category, _validate_product_by_id
+from src.schemas import (
+    Cart as CartSchema,
+    CartItem as CartItemSchema,
+    CartItemCreate,
+    CartItemUpdate,
+    Product as ProductSchema,
+)
+from src.utils.fieldsets import FieldSet, fieldset_query, sparse_response
+from src.utils.routes import (
+    CART_ITEM_COLUMNS,
+    CART_ITEM_EXPANSIONS,
+    _cart_item_load_options,
+    _cart_schema,
+    _get_cart_item,
+    _get_cart_totals,
+    _reserve_stock,
+    _validate_product_by_id,
+)
 
 router = APIRouter(prefix='/cart', tags=['cart'])
 
@@ -20,12 +38,30 @@ router = APIRouter(prefix='/cart', tags=['cart'])
 )
 async def get_cart(
     database: AsyncDatabaseDep,
+    fieldset: FieldSet | None = Depends(fieldset_query(CART_ITEM_COLUMNS, CART_ITEM_EXPANSIONS)),
     current_user: UserModel = Depends(is_authorized(permissions=('seller', 'buyer'))),
-) -> CartSchema:
-    """Получение данных корзины пользователя."""
+) -> CartSchema | Response:
+    """Получение данных корзины пользователя.
+
+    `fields` и `expand` относятся к позициям корзины; без `expand=product` товары не загружаются,
+    итоги корзины считаются одним агрегирующим запросом.
+    """
+    if fieldset is not None:
+        result = await database.scalars(
+            select(CartItemModel)
+            .options(*_cart_item_load_options(fieldset))
+            .where(CartItemModel.user_id == current_user.id)
+            .order_by(CartItemModel.id),
+        )
+        total_quantity, total_price = await _get_cart_totals(database, current_user.id)
+        return sparse_response(
+            _cart_schema(fieldset),
+            {'user_id': current_user.id, 'items': result.all(), 'total_quantity': total_quantity, 'total_price': total_price},
+        )
+
     result = await database.scalars(
         select(CartItemModel)
-        .options(selectinload(CartItemModel.product))
+        .options(selectinload(CartItemModel.product), selectinload(CartItemModel.reservation))
         .where(CartItemModel.user_id == current_user.id)
         .order_by(CartItemModel.id),
     )
@@ -46,6 +82,37 @@ async def get_cart(
     )
 
 
+@router.get(
+    path='/related',
+    response_model=Sequence[ProductSchema],
+)
+async def get_cart_related_products(
+    database: AsyncDatabaseDep,
+    settings: SettingsDep,
+    current_user: UserModel = Depends(is_authorized(permissions=('seller', 'buyer'))),
+) -> Sequence[ProductModel]:
+    """Рекомендации к корзине: товары, которые чаще всего покупают вместе с её позициями.
+
+    Сохранённые соседи всех позиций суммируются одним запросом по первичному ключу рекомендаций;
+    товары, уже лежащие в корзине, не предлагаются.
+    """
+    cart_products = select(CartItemModel.product_id).where(CartItemModel.user_id == current_user.id)
+    scores = (
+        select(ProductRecommendationModel.related_id, func.sum(ProductRecommendationModel.orders).label('orders'))
+        .where(ProductRecommendationModel.product_id.in_(cart_products), ProductRecommendationModel.related_id.not_in(cart_products))
+        .group_by(ProductRecommendationModel.related_id)
+        .subquery()
+    )
+    result = await database.scalars(
+        select(ProductModel)
+        .join(scores, scores.c.related_id == ProductModel.id)
+        .where(ProductModel.is_active == True)
+        .order_by(scores.c.orders.desc(), ProductModel.id)
+        .limit(settings.api_recommendations_top_k),
+    )
+    return result.all()
+
+
 @router.post(
     path='/items',
     response_model=CartItemSchema,
@@ -54,11 +121,16 @@ async def get_cart(
 async def add_item_to_cart(
     payload: CartItemCreate,
     database: AsyncDatabaseDep,
+    settings: SettingsDep,
     current_user: UserModel = Depends(is_authorized(permissions=('seller', 'buyer'))),
 ) -> CartItemModel | None:
-    """Добавление товара в корзину."""
+    """Добавление товара в корзину.
+
+    При включённом резервировании (`API_STOCK_RESERVATIONS_ENABLED`) всё количество позиции резервируется
+    на `API_STOCK_RESERVATION_TTL_SECONDS` секунд; если доступного остатка не хватает, возвращается 409.
+    Товары со счётчиками остатка (`stock_slots`) не резервируются: их остаток списывается только при оформлении.
+    """
     product = await _validate_product_by_id(payload.product_id, database)
-    await _validate_parent_category(product.category_id, database)
 
     cart_item = await _get_cart_item(database, current_user.id, payload.product_id)
     if cart_item:
@@ -71,6 +143,8 @@ async def add_item_to_cart(
         )
         database.add(cart_item)
 
+    if settings.api_stock_reservations_enabled and not product.stock_slots:
+        await _reserve_stock(database, cart_item, settings.api_stock_reservation_ttl_seconds)
     await database.commit()
     return await _get_cart_item(database, current_user.id, payload.product_id)
 
@@ -84,17 +158,19 @@ async def update_cart_item(
     product_id: int,
     payload: CartItemUpdate,
     database: AsyncDatabaseDep,
+    settings: SettingsDep,
     current_user: UserModel = Depends(is_authorized(permissions=('seller', 'buyer'))),
 ) -> CartItemModel | None:
-    """Обновление количества товаров в корзине."""
+    """Обновление количества товаров в корзине; в режиме резервирования резерв заменяется и продлевается (кроме товаров со счётчиками)."""
     product = await _validate_product_by_id(product_id, database)
-    await _validate_parent_category(product.category_id, database)
 
     cart_item = await _get_cart_item(database, current_user.id, product_id)
     if cart_item is None:
         raise HTTPException(status_code=404, detail='Cart item not found')
 
     cart_item.quantity = payload.quantity
+    if settings.api_stock_reservations_enabled and not product.stock_slots:
+        await _reserve_stock(database, cart_item, settings.api_stock_reservation_ttl_seconds)
     await database.commit()
     return await _get_cart_item(database, current_user.id, product_id)
 
@@ -1,13 +1,18 @@
-from collections.abc import Mapping, Sequence
+from collections.abc import Sequence
 
-from fastapi import APIRouter, Depends, HTTPException, status
-from sqlalchemy import select, update
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from sqlalchemy import select
 
 from src.api.auth import is_authorized
-from src.dependencies import AsyncDatabaseDep
+from src.dependencies import AsyncDatabaseDep, IfMatchDep
 from src.models import Category as CategoryModel, User as UserModel
-from src.schemas import Category as CategorySchema, CategoryCreate
-from src.utils.routes import _build_category_query, _validate_parent_category
+from src.schemas import Category as CategorySchema, CategoryCascade, CategoryCreate
+from src.utils.routes import (
+    _cascade_category_activity,
+    _category_write_error,
+    _update_active_category,
+    _validate_parent_category,
+)
 
 router = APIRouter(prefix='/categories', tags=['categories'])
 
@@ -34,7 +39,7 @@ async def create_category(
     current_user: UserModel = Depends(is_authorized(permissions=('admin',))),
 ) -> CategoryModel:
     """Создаёт новую категорию."""
-    await _validate_parent_category(category, database)
+    await _validate_parent_category(category, database, lock=True)
     new_category = CategoryModel(**category.model_dump())
     database.add(new_category)
     await database.commit()
@@ -50,49 +55,75 @@ async def update_category(
     category_id: int,
     category: CategoryCreate,
     database: AsyncDatabaseDep,
+    version: IfMatchDep,
     current_user: UserModel = Depends(is_authorized(permissions=('admin',))),
 ) -> CategoryModel:
-    """Обновляет категорию по её ID."""
-    sql_query = _build_category_query(category_id)
-    categories = await database.scalars(sql_query)
-    category_to_update: CategoryModel | None = categories.first()
-    if category_to_update is None:
-        raise HTTPException(
-            status_code=404,
-            detail='Category not found',
-        )
-
-    await _validate_parent_category(category, database)
-    values_to_update = category.model_dump(exclude_unset=True)
-    await database.execute(
-        update(CategoryModel)
-        .where(CategoryModel.id == category_id)
-        .values(**values_to_update),
-    )
+    """Обновляет категорию по её ID; версия из `If-Match` и родительская категория проверяются в том же запросе."""
+    updated = await _update_active_category(database, category_id, version, category.model_dump(exclude_unset=True))
+    if updated is None:
+        raise await _category_write_error(database, category_id, version)
     await database.commit()
 
-    return category_to_update
+    return updated
 
 
 @router.delete(
     path='/{category_id}',
+    response_model=CategoryCascade,
     status_code=status.HTTP_200_OK,
 )
 async def delete_category(
     category_id: int,
     database: AsyncDatabaseDep,
+    dry_run: bool = Query(default=False, description='Только посчитать категории и товары, которые будут отключены'),
     current_user: UserModel = Depends(is_authorized(permissions=('admin',))),
-) -> Mapping[str, str]:
-    """Удаляет категорию по её ID."""
-    sql_query = _build_category_query(category_id)
-    categories = await database.scalars(sql_query)
-    category = categories.first()
-    if category is None:
+) -> CategoryCascade:
+    """Отключает категорию вместе со всеми подкатегориями и их товарами одним запросом."""
+    categories, products = await _cascade_category_activity(database, category_id, active=False, dry_run=dry_run)
+    if not categories:
         raise HTTPException(status_code=404, detail='Category not found')
-
-    await database.execute(
-        update(CategoryModel).where(CategoryModel.id == category_id).values(is_active=False),
+    if not dry_run:
+        await database.commit()
+
+    return CategoryCascade(
+        status='success',
+        message='Category marked as inactive',
+        dry_run=dry_run,
+        categories=categories,
+        products=products,
     )
-    await database.commit()
 
-    return {'status': 'success', 'message': 'Category marked as inactive'}
+
+@router.post(
+    path='/{category_id}/restore',
+    response_model=CategoryCascade,
+    status_code=status.HTTP_200_OK,
+)
+async def restore_category(
+    category_id: int,
+    database: AsyncDatabaseDep,
+    dry_run: bool = Query(default=False, description='Только посчитать категории и товары, которые будут восстановлены'),
+    current_user: UserModel = Depends(is_authorized(permissions=('admin',))),
+) -> CategoryCascade:
+    """Восстанавливает отключённую категорию и то, что было отключено вместе с ней.
+
+    Подкатегории и товары, удалённые отдельно до отключения категории, остаются отключены.
+    """
+    categories, products = await _cascade_category_activity(database, category_id, active=True, dry_run=dry_run)
+    if not categories:
+        is_active = await database.scalar(select(CategoryModel.is_active).where(CategoryModel.id == category_id))
+        if is_active is None:
+            raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail='Category not found')
+        if is_active:
+            raise HTTPException(status_code=status.HTTP_409_CONFLICT, detail='Category is already active')
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail='Parent category not found')
+    if not dry_run:
+        await database.commit()
+
+    return CategoryCascade(
+        status='success',
+        message='Category restored',
+        dry_run=dry_run,
+        categories=categories,
+        products=products,
+    )
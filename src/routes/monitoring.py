@@ -0,0 +1,42 @@
+from collections.abc import Mapping
+
+from fastapi import APIRouter, Response, status
+from fastapi.responses import JSONResponse
+
+from src.dependencies import ApplicationHealthDep
+from src.schemas.monitoring import Readiness
+from src.services.metrics.prometheus import render_metrics
+
+router = APIRouter(tags=['monitoring'])
+
+
+@router.get(
+    path='/health',
+    status_code=status.HTTP_200_OK,
+)
+async def health() -> Mapping[str, str]:
+    """Проверка живости процесса без обращения к базе данных."""
+    return {'status': 'alive'}
+
+
+@router.get(
+    path='/ready',
+    response_model=Readiness,
+    responses={status.HTTP_503_SERVICE_UNAVAILABLE: {'model': Readiness}},
+)
+async def ready(application_health: ApplicationHealthDep) -> Readiness | JSONResponse:
+    """Проверка готовности принимать трафик по кешированному результату фоновой проверки базы данных."""
+    readiness = application_health.readiness()
+    if application_health.is_ready:
+        return readiness
+    return JSONResponse(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, content=readiness.model_dump(mode='json'))
+
+
+@router.get(
+    path='/metrics',
+    include_in_schema=False,
+)
+async def metrics() -> Response:
+    """Метрики приложения в текстовом формате Prometheus."""
+    payload, content_type = render_metrics()
+    return Response(content=payload, media_type=content_type)
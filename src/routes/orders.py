@@ -1,16 +1,30 @@
 from decimal import Decimal
+from typing import Annotated
 
-from fastapi import APIRouter, Depends, HTTPException, Query, status
-from sqlalchemy import delete, func, select
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from sqlalchemy import delete, func, select, tuple_
 from sqlalchemy.orm import selectinload
 
 from src.api.auth import is_authorized
-from src.dependencies import AsyncDatabaseDep
+from src.dependencies import AsyncDatabaseDep, SettingsDep
 from src.models.cart import CartItem as CartItemModel
 from src.models.orders import Order as OrderModel, OrderItem as OrderItemModel
 from src.models.users import User as UserModel
-from src.schemas.orders import Order as OrderSchema, OrderList
-from src.utils.routes import _load_order_with_items
+from src.schemas.orders import Order as OrderSchema, OrderList, OrdersRequest
+from src.services.outbox.handlers import ORDER_SALES_TOPIC
+from src.services.outbox.worker import enqueue
+from src.utils.fieldsets import FieldSet, fieldset_query, sparse_response, sparse_schema
+from src.utils.routes import (
+    ORDER_COLUMNS,
+    ORDER_EXPANSIONS,
+    _decode_order_cursor,
+    _encode_order_cursor,
+    _get_available_stock,
+    _load_order_with_items,
+    _order_load_options,
+    _order_schema,
+    _take_slot_stock,
+)
 
 router = APIRouter(prefix='/orders', tags=['orders'])
 
@@ -20,26 +34,43 @@ router = APIRouter(prefix='/orders', tags=['orders'])
     response_model=OrderList,
 )
 async def list_orders(
+    request: Annotated[OrdersRequest, Query()],
     database: AsyncDatabaseDep,
-    page: int = Query(1, ge=1),
-    page_size: int = Query(10, ge=1, le=100),
+    fieldset: FieldSet | None = Depends(fieldset_query(ORDER_COLUMNS, ORDER_EXPANSIONS)),
     current_user: UserModel = Depends(is_authorized(permissions=('buyer',))),
-) -> OrderList:
-    """Возвращает заказы текущего пользователя с простой пагинацией."""
+) -> OrderList | Response:
+    """Возвращает заказы текущего пользователя, начиная с новых.
+
+    Страницы выбираются по курсору (`next_cursor` предыдущей страницы) или по номеру. Запрос по курсору продолжает
+    чтение индекса `(user_id, created_at desc, id desc)` с места остановки, поэтому глубокие страницы
+    не дороже первой. Для списка истории заказов достаточно `fields=id,status,total_amount,created_at`:
+    позиции и товары тогда не загружаются.
+    """
     total = await database.scalar(
-        select(func.count(OrderModel.id)).where(OrderModel.user_id == current_user.id),
-    )
-    result = await database.scalars(
-        select(OrderModel)
-        .options(selectinload(OrderModel.items).selectinload(OrderItemModel.product))
-        .where(OrderModel.user_id == current_user.id)
-        .order_by(OrderModel.created_at.desc())
-        .offset((page - 1) * page_size)
-        .limit(page_size),
+        select(func.count()).select_from(OrderModel).where(OrderModel.user_id == current_user.id),
     )
-    orders = result.all()
-
-    return OrderList(items=orders, total=total or 0, page=page, page_size=page_size)  # type: ignore[arg-type]
+    sql_query = select(OrderModel) \
+        .options(*_order_load_options(fieldset)) \
+        .where(OrderModel.user_id == current_user.id) \
+        .order_by(OrderModel.created_at.desc(), OrderModel.id.desc()) \
+        .limit(request.page_size)
+    if request.cursor is not None:
+        sql_query = sql_query.where(tuple_(OrderModel.created_at, OrderModel.id) < _decode_order_cursor(request.cursor))
+    else:
+        sql_query = sql_query.offset((request.page - 1) * request.page_size)
+    orders = (await database.scalars(sql_query)).all()
+
+    content = {
+        'items': orders,
+        'total': total or 0,
+        'page': request.page,
+        'page_size': request.page_size,
+        'next_cursor': _encode_order_cursor(orders[-1]) if len(orders) == request.page_size else None,
+    }
+    if fieldset is not None:
+        schema = sparse_schema(OrderList, frozenset(OrderList.model_fields), (('items', list[_order_schema(fieldset)]),))  # type: ignore[misc]
+        return sparse_response(schema, content)
+    return OrderList.model_validate(content)
 
 
 @router.get(
@@ -49,12 +80,15 @@ async def list_orders(
 async def get_order(
     order_id: int,
     database: AsyncDatabaseDep,
+    fieldset: FieldSet | None = Depends(fieldset_query(ORDER_COLUMNS, ORDER_EXPANSIONS)),
     current_user: UserModel = Depends(is_authorized(permissions=('buyer',))),
-) -> OrderModel:
+) -> OrderModel | Response:
     """Возвращает детальную информацию по заказу, если он принадлежит пользователю."""
-    order = await _load_order_with_items(database, order_id)
+    order = await _load_order_with_items(database, order_id, fieldset)
     if not order or order.user_id != current_user.id:
         raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail='Order not found')
+    if fieldset is not None:
+        return sparse_response(_order_schema(fieldset), order)
     return order
 
 
@@ -65,21 +99,32 @@ async def get_order(
 )
 async def checkout_order(
     database: AsyncDatabaseDep,
+    settings: SettingsDep,
     current_user: UserModel = Depends(is_authorized(permissions=('buyer',))),
 ) -> OrderModel:
     """Создаёт заказ на основе текущей корзины пользователя. Сохраняет
     позиции заказа, вычитает остатки и очищает корзину.
+
+    При включённом резервировании остаток проверяется за вычетом резервов других пользователей,
+    резервы позиций удаляются вместе с корзиной. Остаток товаров со счётчиками (`stock_slots`)
+    списывается со счётчиков без изменения строки товара; резервы для них не учитываются.
+    Позиции обрабатываются по возрастанию ID товара, чтобы блокировки брались в одном порядке.
     """
     cart_result = await database.scalars(
         select(CartItemModel)
         .options(selectinload(CartItemModel.product))
         .where(CartItemModel.user_id == current_user.id)
-        .order_by(CartItemModel.id),
+        .order_by(CartItemModel.product_id),
     )
     cart_items = cart_result.all()
     if not cart_items:
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail='Cart is empty')
 
+    available_stock = None
+    if settings.api_stock_reservations_enabled:
+        product_ids = [item.product_id for item in cart_items if item.product and not item.product.stock_slots]
+        available_stock = await _get_available_stock(database, product_ids, current_user.id)
+
     order = OrderModel(user_id=current_user.id)
     total_amount = Decimal('0')
 
@@ -90,7 +135,12 @@ async def checkout_order(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail=f'Product {cart_item.product_id} is unavailable',
             )
-        if product.stock < cart_item.quantity:
+        if product.stock_slots:
+            in_stock = await _take_slot_stock(database, product.id, cart_item.quantity)
+        else:
+            stock = available_stock.get(product.id, 0) if available_stock is not None else product.stock
+            in_stock = stock >= cart_item.quantity
+        if not in_stock:
             raise HTTPException(
                 status_code=status.HTTP_400_BAD_REQUEST,
                 detail=f'Not enough stock for product {product.name}',
@@ -112,10 +162,14 @@ async def checkout_order(
             total_price=total_price,
         )
         order.items.append(order_item)
-        product.stock -= cart_item.quantity
+        if not product.stock_slots:
+            product.stock -= cart_item.quantity
+            product.sales_count += cart_item.quantity
 
     order.total_amount = total_amount
     database.add(order)
+    await database.flush()
+    enqueue(database, ORDER_SALES_TOPIC, {'order_id': order.id, 'created_at': order.created_at.isoformat()})
 
     await database.execute(delete(CartItemModel).where(CartItemModel.user_id == current_user.id))
     await database.commit()
@@ -1,14 +1,42 @@
 from collections.abc import Mapping, Sequence
 from typing import Annotated
 
-from fastapi import APIRouter, Depends, HTTPException, Query, status
-from sqlalchemy import desc, func, or_, select, update
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from sqlalchemy import desc, func, select, update
 
 from src.api.auth import is_authorized
-from src.dependencies import AsyncDatabaseDep
-from src.models import Product as ProductModel, User as UserModel
-from src.schemas import Product as ProductSchema, ProductCreate, ProductList, ProductsRequest
-from src.utils.routes import _validate_parent_category, _validate_product_by_id
+from src.dependencies import AsyncDatabaseDep, IfMatchDep, ProductViewsDep, RelatedProductsCacheDep
+from src.models import Product as ProductModel, ProductRecommendation as ProductRecommendationModel, User as UserModel
+from src.schemas import (
+    Product as ProductSchema,
+    ProductBatch,
+    ProductBatchRequest,
+    ProductCreate,
+    ProductFacets,
+    ProductList,
+    ProductRankingRequest,
+    ProductsRequest,
+    ProductStockSlotsUpdate,
+)
+from src.services.rankings.products import BESTSELLERS_RANKING, TRENDING_RANKING
+from src.utils.fieldsets import FieldSet, fieldset_query, sparse_response, sparse_schema
+from src.utils.routes import (
+    PRODUCT_COLUMNS,
+    _build_product_order,
+    _build_search_clauses,
+    _collect_product_facets,
+    _distribute_stock,
+    _etag,
+    _get_active_products_by_ids,
+    _get_ranked_products,
+    _lock_stock_slots,
+    _product_list_schema,
+    _product_load_options,
+    _product_write_error,
+    _update_seller_product,
+    _validate_parent_category,
+    _validate_product_by_id,
+)
 
 router = APIRouter(prefix='/products', tags=['products'])
 
@@ -20,7 +48,8 @@ router = APIRouter(prefix='/products', tags=['products'])
 async def get_all_products(
     request: Annotated[ProductsRequest, Query()],
     database: AsyncDatabaseDep,
-) -> Mapping[str, Sequence[ProductModel] | int]:
+    fieldset: FieldSet | None = Depends(fieldset_query(PRODUCT_COLUMNS)),
+) -> Mapping[str, Sequence[ProductModel] | ProductFacets | int | None] | Response:
     """Возвращает список всех активных товаров."""
     if request.min_price is not None and request.max_price is not None and request.min_price > request.max_price:
         raise HTTPException(
@@ -41,52 +70,106 @@ async def get_all_products(
     if request.seller_id is not None:
         filters.append(ProductModel.seller_id == request.seller_id)
 
-    sql_query = select(func.count()).select_from(ProductModel).where(*filters)
-
     rank_col = None
-    if request.search:
-        search_value = request.search.strip()
-        if search_value:
-            ts_query_en = func.websearch_to_tsquery('english', search_value)
-            ts_query_ru = func.websearch_to_tsquery('russian', search_value)
-            ts_match_any = or_(
-                ProductModel.tsv.op('@@')(ts_query_en),
-                ProductModel.tsv.op('@@')(ts_query_ru),
-            )
-            filters.append(ts_match_any)
-            rank_col = func.greatest(
-                func.ts_rank_cd(ProductModel.tsv, ts_query_en),
-                func.ts_rank_cd(ProductModel.tsv, ts_query_ru),
-            ).label('rank')
-            sql_query = select(func.count()).select_from(ProductModel).where(*filters)
-
-    total = await database.scalar(sql_query) or 0
-
-    if rank_col is not None:
-        products_query = select(ProductModel, rank_col) \
-            .where(*filters) \
-            .order_by(desc(rank_col), ProductModel.id) \
-            .offset((request.page - 1) * request.page_size) \
-            .limit(request.page_size)
-
-        rows = (await database.execute(products_query)).all()
-        items: Sequence[ProductModel] = [row[0] for row in rows]
+    search_value = (request.search or '').strip()
+    if search_value:
+        search_match, rank_col = _build_search_clauses(search_value)
+        filters.append(search_match)
+
+    facets = None
+    if request.facets:
+        facets, total = await _collect_product_facets(filters, request.facets, database)
+    else:
+        sql_query = select(func.count()).select_from(ProductModel).where(*filters)
+        total = await database.scalar(sql_query) or 0
 
+    if request.sort is not None:
+        order_by = _build_product_order(request.sort)
+    elif rank_col is not None:
+        order_by = [desc(rank_col), ProductModel.id.asc()]
     else:
-        products_query = select(ProductModel) \
-            .where(*filters) \
-            .order_by(ProductModel.id) \
-            .offset((request.page - 1) * request.page_size) \
-            .limit(request.page_size)
+        order_by = [ProductModel.id.asc()]
 
-        items = (await database.scalars(products_query)).all()
+    products_query = select(ProductModel) \
+        .options(*_product_load_options(fieldset)) \
+        .where(*filters) \
+        .order_by(*order_by) \
+        .offset((request.page - 1) * request.page_size) \
+        .limit(request.page_size)
+    items = (await database.scalars(products_query)).all()
 
-    return {
+    content: Mapping[str, Sequence[ProductModel] | ProductFacets | int | None] = {
         'items': items,
         'total': total,
         'page': request.page,
         'page_size': request.page_size,
+        'facets': facets,
     }
+    return content if fieldset is None else sparse_response(_product_list_schema(ProductList, fieldset), content)
+
+
+@router.get(
+    path='/batch',
+    response_model=ProductBatch,
+    status_code=status.HTTP_200_OK,
+)
+async def get_products_batch(
+    request: Annotated[ProductBatchRequest, Query()],
+    database: AsyncDatabaseDep,
+    fieldset: FieldSet | None = Depends(fieldset_query(PRODUCT_COLUMNS)),
+) -> Mapping[str, Sequence[ProductModel] | Sequence[int]] | Response:
+    """Возвращает несколько товаров по списку ID в порядке запроса."""
+    items, missing = await _get_active_products_by_ids(request.ids, database, fieldset)
+    if fieldset is not None:
+        return sparse_response(_product_list_schema(ProductBatch, fieldset), {'items': items, 'missing': missing})
+    return {'items': items, 'missing': missing}
+
+
+@router.post(
+    path='/batch',
+    response_model=ProductBatch,
+    status_code=status.HTTP_200_OK,
+)
+async def post_products_batch(
+    request: ProductBatchRequest,
+    database: AsyncDatabaseDep,
+    fieldset: FieldSet | None = Depends(fieldset_query(PRODUCT_COLUMNS)),
+) -> Mapping[str, Sequence[ProductModel] | Sequence[int]] | Response:
+    """Возвращает несколько товаров по длинному списку ID, переданному в теле запроса."""
+    items, missing = await _get_active_products_by_ids(request.ids, database, fieldset)
+    if fieldset is not None:
+        return sparse_response(_product_list_schema(ProductBatch, fieldset), {'items': items, 'missing': missing})
+    return {'items': items, 'missing': missing}
+
+
+@router.get(
+    path='/trending',
+    response_model=Sequence[ProductSchema],
+    status_code=status.HTTP_200_OK,
+)
+async def get_trending_products(
+    request: Annotated[ProductRankingRequest, Query()],
+    database: AsyncDatabaseDep,
+) -> Sequence[ProductModel]:
+    """Товары в тренде: просмотры и продажи последних часов, недавние весят больше.
+
+    Рейтинг предрассчитывается фоновым пересчётом по часовым счётчикам активности и читается
+    по первичному ключу, поэтому запрос не агрегирует заказы и просмотры.
+    """
+    return await _get_ranked_products(TRENDING_RANKING, request, database)
+
+
+@router.get(
+    path='/bestsellers',
+    response_model=Sequence[ProductSchema],
+    status_code=status.HTTP_200_OK,
+)
+async def get_bestseller_products(
+    request: Annotated[ProductRankingRequest, Query()],
+    database: AsyncDatabaseDep,
+) -> Sequence[ProductModel]:
+    """Хиты продаж: товары с наибольшим числом проданных единиц за последние дни (из предрассчитанного рейтинга)."""
+    return await _get_ranked_products(BESTSELLERS_RANKING, request, database)
 
 
 @router.get(
@@ -94,14 +177,58 @@ async def get_all_products(
     response_model=ProductSchema,
     status_code=status.HTTP_200_OK,
 )
-async def get_product(product_id: int, database: AsyncDatabaseDep) -> ProductModel:
-    """Возвращает детальную информацию о товаре по его ID."""
+async def get_product(
+    product_id: int,
+    database: AsyncDatabaseDep,
+    views: ProductViewsDep,
+    response: Response,
+    fieldset: FieldSet | None = Depends(fieldset_query(PRODUCT_COLUMNS)),
+) -> ProductModel | Response:
+    """Возвращает детальную информацию о товаре по его ID; заголовок `ETag` содержит версию товара для `If-Match`.
+
+    Просмотр учитывается в рейтинге трендов, кроме запросов прогрева при запуске.
+    """
     product = await _validate_product_by_id(product_id, database)
-    await _validate_parent_category(product.category_id, database)
-
+    if views is not None:
+        views.record(product.id)
+
+    if fieldset is not None:
+        sparse = sparse_response(sparse_schema(ProductSchema, fieldset.columns), product)
+        sparse.headers['ETag'] = _etag(product.version)
+        return sparse
+    response.headers['ETag'] = _etag(product.version)
     return product
 
 
+@router.get(
+    path='/{product_id}/related',
+    response_model=Sequence[ProductSchema],
+    status_code=status.HTTP_200_OK,
+)
+async def get_related_products(
+    product_id: int,
+    database: AsyncDatabaseDep,
+    cache: RelatedProductsCacheDep,
+) -> Sequence[ProductSchema]:
+    """Товары, которые чаще всего покупают вместе с указанным, по убыванию числа совместных заказов.
+
+    Рекомендации предрассчитываются фоновым пересчётом по новым заказам и читаются одним запросом
+    по первичному ключу `(product_id, rank)`, результат кешируется в процессе. Для неизвестного
+    товара и товара без совместных покупок возвращается пустой список.
+    """
+    related = cache.get(product_id)
+    if related is None:
+        result = await database.scalars(
+            select(ProductModel)
+            .join(ProductRecommendationModel, ProductRecommendationModel.related_id == ProductModel.id)
+            .where(ProductRecommendationModel.product_id == product_id, ProductModel.is_active == True)
+            .order_by(ProductRecommendationModel.rank),
+        )
+        related = [ProductSchema.model_validate(product) for product in result.all()]
+        cache.put(product_id, related)
+    return related
+
+
 @router.get(
     path='/category/{category_id}',
     response_model=Sequence[ProductSchema],
@@ -133,7 +260,7 @@ async def create_product(
     current_user: UserModel = Depends(is_authorized(permissions=('seller',))),
 ) -> ProductModel:
     """Создаёт новый товар."""
-    await _validate_parent_category(product.category_id, database)
+    await _validate_parent_category(product.category_id, database, lock=True)
     new_product = ProductModel(**product.model_dump(), seller_id=current_user.id)
     database.add(new_product)
     await database.commit()
@@ -151,22 +278,59 @@ async def update_product(
     product_id: int,
     product: ProductCreate,
     database: AsyncDatabaseDep,
+    version: IfMatchDep,
     current_user: UserModel = Depends(is_authorized(permissions=('seller',))),
 ) -> ProductModel:
-    """Обновляет товар по его ID."""
-    product_to_update = await _validate_product_by_id(product_id, database)
-    await _validate_parent_category(product.category_id, database)
+    """Обновляет товар по его ID.
+
+    Наличие товара, владелец, категория и версия из `If-Match` проверяются в одном запросе `UPDATE`;
+    если версия изменилась после чтения товара клиентом, возвращается 412.
+    """
+    updated = await _update_seller_product(database, product_id, current_user.id, version, product.model_dump())
+    if updated is None:
+        raise await _product_write_error(database, product_id, current_user.id, version, 'update')
+    if updated.stock_slots:
+        await _lock_stock_slots(database, product_id)
+        await _distribute_stock(database, product_id, updated.stock_slots, product.stock)
+    await database.commit()
 
+    return updated
+
+
+@router.put(
+    path='/{product_id}/stock-slots',
+    response_model=ProductSchema,
+    status_code=status.HTTP_200_OK,
+)
+async def update_product_stock_slots(
+    product_id: int,
+    payload: ProductStockSlotsUpdate,
+    database: AsyncDatabaseDep,
+    current_user: UserModel = Depends(is_authorized(permissions=('seller',))),
+) -> ProductModel:
+    """Включает, изменяет или отключает учёт остатка товара по счётчикам.
+
+    Для товаров с тысячами заказов в секунду: остаток делится поровну между `slots` счётчиками,
+    и заказы списывают его с разных строк, не блокируя строку товара. Поле `stock` товара
+    обновляется суммой счётчиков после обработки заказов. При отключении остаток счётчиков
+    возвращается в `stock`.
+    """
+    product_to_update = await _validate_product_by_id(product_id, database)
     if product_to_update.seller_id != current_user.id:
         raise HTTPException(
             status_code=status.HTTP_403_FORBIDDEN,
             detail='You can only update your own products',
         )
 
+    await database.execute(
+        select(ProductModel).where(ProductModel.id == product_id).with_for_update().execution_options(populate_existing=True),
+    )
+    stock = await _lock_stock_slots(database, product_id) if product_to_update.stock_slots else product_to_update.stock
+    await _distribute_stock(database, product_id, payload.slots, stock)
     await database.execute(
         update(ProductModel)
         .where(ProductModel.id == product_id)
-        .values(**product.model_dump()),
+        .values(stock=stock, stock_slots=payload.slots, version=ProductModel.version + 1),
     )
     await database.commit()
     await database.refresh(product_to_update)
@@ -181,20 +345,13 @@ async def update_product(
 async def delete_product(
     product_id: int,
     database: AsyncDatabaseDep,
+    version: IfMatchDep,
     current_user: UserModel = Depends(is_authorized(permissions=('seller',))),
 ) -> Mapping[str, str]:
-    """Удаляет товар по его ID."""
-    product_to_delete = await _validate_product_by_id(product_id, database)
-    if product_to_delete.seller_id != current_user.id:
-        raise HTTPException(
-            status_code=status.HTTP_403_FORBIDDEN,
-            detail='You can only delete your own products',
-        )
-
-    await database.execute(
-        update(ProductModel).where(ProductModel.id == product_id).values(is_active=False),
-    )
+    """Удаляет товар по его ID; владелец и версия из `If-Match` проверяются в том же запросе."""
+    deleted = await _update_seller_product(database, product_id, current_user.id, version, {'is_active': False})
+    if deleted is None:
+        raise await _product_write_error(database, product_id, current_user.id, version, 'delete')
     await database.commit()
-    await database.refresh(product_to_delete)
 
     return {'status': 'success', 'message': f'Product with id [{product_id}] marked as inactive'}
@@ -8,7 +8,9 @@ from src.dependencies import AsyncDatabaseDep
 from src.models import Review as ReviewModel, User as UserModel
 from src.routes.products import router as products_router
 from src.schemas import Review as ReviewSchema, ReviewCreate
-from src.utils.routes import _update_product_rating, _validate_parent_category, _validate_product_by_id
+from src.services.outbox.handlers import PRODUCT_RATING_TOPIC
+from src.services.outbox.worker import enqueue
+from src.utils.routes import _validate_product_by_id
 
 router = APIRouter(prefix='/reviews', tags=['reviews'])
 
@@ -32,8 +34,7 @@ async def get_all_reviews(database: AsyncDatabaseDep) -> Sequence[ReviewModel]:
 )
 async def get_reviews_by_product_id(product_id: int, database: AsyncDatabaseDep) -> Sequence[ReviewModel]:
     """Возвращает список всех отзывов о товаре по его ID."""
-    product = await _validate_product_by_id(product_id, database)
-    await _validate_parent_category(product.category_id, database)
+    await _validate_product_by_id(product_id, database)
 
     sql_query = select(ReviewModel).where(
         ReviewModel.product_id == product_id,
@@ -54,8 +55,7 @@ async def create_review(
     current_user: UserModel = Depends(is_authorized(permissions=('buyer',))),
 ) -> ReviewModel:
     """Создаёт новый отзыв о товаре."""
-    product = await _validate_product_by_id(review.product_id, database)
-    await _validate_parent_category(product.category_id, database)
+    await _validate_product_by_id(review.product_id, database)
 
     sql_query = select(ReviewModel).where(
         ReviewModel.user_id == current_user.id,
@@ -71,9 +71,8 @@ async def create_review(
 
     new_review = ReviewModel(**review.model_dump(), user_id=current_user.id)
     database.add(new_review)
+    enqueue(database, PRODUCT_RATING_TOPIC, {'product_id': review.product_id})
     await database.commit()
-    await database.refresh(new_review)
-    await _update_product_rating(product_id=review.product_id, database=database)
 
     return new_review
 
@@ -105,8 +104,7 @@ async def delete_review(
     await database.execute(
         update(ReviewModel).where(ReviewModel.id == review_id).values(is_active=False),
     )
+    enqueue(database, PRODUCT_RATING_TOPIC, {'product_id': review_to_delete.product_id})
     await database.commit()
-    await database.refresh(review_to_delete)
-    await _update_product_rating(product_id=review_to_delete.product_id, database=database)
 
     return {'status': 'success', 'message': f'Review with ID [{review_id}] is deleted'}
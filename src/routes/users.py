@@ -4,10 +4,10 @@ from fastapi import APIRouter, HTTPException, status
 from sqlalchemy import select
 
 from src.api.auth import create_token, hash_password, verify_password
-from src.dependencies import AsyncDatabaseDep, OAuth2PasswordRequestFormDep, SettingsDep
+from src.dependencies import AsyncDatabaseDep, OAuth2PasswordRequestFormDep, RevokedTokensDep, SettingsDep
 from src.models.users import User as UserModel
 from src.schemas.users import RefreshTokenRequest, User as UserSchema, UserCreate
-from src.utils.routes import CredentialsException, _validate_jwt_payload
+from src.utils.routes import CredentialsException, _decode_refresh_token, _revoke_refresh_token
 
 router = APIRouter(prefix='/users', tags=['users'])
 
@@ -62,17 +62,19 @@ async def update_refresh_token(
     body: RefreshTokenRequest,
     database: AsyncDatabaseDep,
     settings: SettingsDep,
+    revoked_tokens: RevokedTokensDep,
 ) -> Mapping[str, str]:
-    """Обновляет refresh-токен, принимая старый refresh-токен в теле запроса."""
-    user = await _validate_jwt_payload(
+    """Выдаёт новый refresh-токен в обмен на старый; старый токен отзывается."""
+    payload = _decode_refresh_token(
         token=body.refresh_token,
         secret_key=settings.api_secret_key,
         algorithm=settings.api_jwt_encode_algorithm,
-        database=database,
-        type_check=True,
+        revoked_tokens=revoked_tokens,
     )
+    if not await _revoke_refresh_token(payload, database, revoked_tokens):
+        raise CredentialsException(detail='Could not validate token: it has been revoked or the user is inactive')
     new_refresh_token = create_token(
-        data={'sub': user.email, 'role': user.role, 'id': user.id},
+        data={'sub': payload['sub'], 'role': payload['role'], 'id': payload['id']},
         access=False,
     )
 
@@ -84,18 +86,36 @@ async def update_access_token(
     body: RefreshTokenRequest,
     database: AsyncDatabaseDep,
     settings: SettingsDep,
+    revoked_tokens: RevokedTokensDep,
 ) -> Mapping[str, str]:
-    """Обновляет access-токен, принимая старый refresh-токен в теле запроса."""
-    user = await _validate_jwt_payload(
+    """Выдаёт новый access-токен и новый refresh-токен в обмен на старый refresh-токен; старый отзывается."""
+    payload = _decode_refresh_token(
         token=body.refresh_token,
         secret_key=settings.api_secret_key,
         algorithm=settings.api_jwt_encode_algorithm,
-        database=database,
-        type_check=True,
-    )
-    new_access_token = create_token(
-        data={'sub': user.email, 'role': user.role, 'id': user.id},
-        access=True,
+        revoked_tokens=revoked_tokens,
     )
+    if not await _revoke_refresh_token(payload, database, revoked_tokens):
+        raise CredentialsException(detail='Could not validate token: it has been revoked or the user is inactive')
+    data = {'sub': payload['sub'], 'role': payload['role'], 'id': payload['id']}
+    new_access_token = create_token(data=data, access=True)
+    new_refresh_token = create_token(data=data, access=False)
 
-    return {'access_token': new_access_token, 'token_type': 'bearer'}
+    return {'access_token': new_access_token, 'refresh_token': new_refresh_token, 'token_type': 'bearer'}
+
+
+@router.post(path='/logout', status_code=status.HTTP_204_NO_CONTENT)
+async def logout(
+    body: RefreshTokenRequest,
+    database: AsyncDatabaseDep,
+    settings: SettingsDep,
+    revoked_tokens: RevokedTokensDep,
+) -> None:
+    """Отзывает refresh-токен; выданные по нему access-токены действуют до истечения срока."""
+    payload = _decode_refresh_token(
+        token=body.refresh_token,
+        secret_key=settings.api_secret_key,
+        algorithm=settings.api_jwt_encode_algorithm,
+        revoked_tokens=revoked_tokens,
+    )
+    await _revoke_refresh_token(payload, database, revoked_tokens, active_user_only=False)
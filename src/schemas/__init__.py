@@ -1,7 +1,27 @@
+from src.schemas.analytics import (
+    SalesPoint,
+    SalesReport,
+    SalesReportRequest,
+    TopProduct,
+    TopProducts,
+    TopProductsRequest,
+)
 from src.schemas.cart import Cart, CartItem, CartItemCreate, CartItemUpdate
-from src.schemas.categories import Category, CategoryCreate
-from src.schemas.orders import Order, OrderItem, OrderList
-from src.schemas.products import Product, ProductCreate, ProductList, ProductsRequest
+from src.schemas.categories import Category, CategoryCascade, CategoryCreate
+from src.schemas.orders import Order, OrderItem, OrderList, OrdersRequest
+from src.schemas.products import (
+    FacetCount,
+    PriceFacetCount,
+    Product,
+    ProductBatch,
+    ProductBatchRequest,
+    ProductCreate,
+    ProductFacets,
+    ProductList,
+    ProductRankingRequest,
+    ProductsRequest,
+    ProductStockSlotsUpdate,
+)
 from src.schemas.reviews import Review, ReviewCreate
 from src.schemas.users import User, UserCreate
 
@@ -11,16 +31,31 @@ __all__ = [
     'CartItemCreate',
     'CartItemUpdate',
     'Category',
+    'CategoryCascade',
     'CategoryCreate',
+    'FacetCount',
     'Order',
     'OrderItem',
     'OrderList',
+    'OrdersRequest',
+    'PriceFacetCount',
     'Product',
+    'ProductBatch',
+    'ProductBatchRequest',
     'ProductCreate',
+    'ProductFacets',
     'ProductList',
+    'ProductRankingRequest',
+    'ProductStockSlotsUpdate',
     'ProductsRequest',
     'Review',
     'ReviewCreate',
+    'SalesPoint',
+    'SalesReport',
+    'SalesReportRequest',
+    'TopProduct',
+    'TopProducts',
+    'TopProductsRequest',
     'User',
     'UserCreate',
 ]
@@ -0,0 +1,63 @@
+from datetime import date
+from decimal import Decimal
+from typing import Literal
+
+from pydantic import BaseModel, Field
+
+SalesGranularity = Literal['day', 'week']
+TopProductsSort = Literal['revenue', 'units']
+
+
+class SalesReportRequest(BaseModel):
+    """Запрос отчёта о продажах продавца за период."""
+
+    date_from: date | None = Field(None, description='Первый день периода (UTC); по умолчанию 29 дней до `date_to`')
+    date_to: date | None = Field(None, description='Последний день периода включительно (UTC); по умолчанию сегодня')
+    granularity: SalesGranularity = Field('day', description='Группировка по дням или по неделям (с понедельника)')
+
+
+class TopProductsRequest(BaseModel):
+    """Запрос самых продаваемых товаров продавца за период."""
+
+    date_from: date | None = Field(None, description='Первый день периода (UTC); по умолчанию 29 дней до `date_to`')
+    date_to: date | None = Field(None, description='Последний день периода включительно (UTC); по умолчанию сегодня')
+    sort: TopProductsSort = Field('revenue', description='Сортировка по выручке или по количеству проданных единиц')
+    limit: int = Field(10, ge=1, le=100, description='Количество товаров')
+
+
+class SalesPoint(BaseModel):
+    """Продажи за один день или одну неделю; периоды без продаж не возвращаются."""
+
+    period: date = Field(description='Первый день периода')
+    revenue: Decimal = Field(description='Выручка')
+    units: int = Field(description='Количество проданных единиц')
+    orders: int = Field(description='Количество заказов с товарами продавца')
+
+
+class SalesReport(BaseModel):
+    """Продажи продавца за период с итогами."""
+
+    date_from: date = Field(description='Первый день периода')
+    date_to: date = Field(description='Последний день периода включительно')
+    granularity: SalesGranularity = Field(description='Группировка периодов')
+    items: list[SalesPoint] = Field(description='Продажи по периодам в хронологическом порядке')
+    revenue: Decimal = Field(description='Выручка за весь период')
+    units: int = Field(description='Количество проданных единиц за весь период')
+    orders: int = Field(description='Количество заказов за весь период')
+
+
+class TopProduct(BaseModel):
+    """Продажи одного товара за период."""
+
+    product_id: int = Field(description='ID товара')
+    name: str = Field(description='Название товара')
+    revenue: Decimal = Field(description='Выручка')
+    units: int = Field(description='Количество проданных единиц')
+
+
+class TopProducts(BaseModel):
+    """Самые продаваемые товары продавца за период."""
+
+    date_from: date = Field(description='Первый день периода')
+    date_to: date = Field(description='Последний день периода включительно')
+    items: list[TopProduct] = Field(description='Товары в порядке убывания выручки или количества')
@@ -1,3 +1,4 @@
+from datetime import datetime
 from decimal import Decimal
 
 from pydantic import BaseModel, ConfigDict, Field
@@ -26,7 +27,9 @@ class CartItem(BaseModel):
     """Товар в корзине с данными продукта."""
 
     id: int = Field(description='ID позиции корзины')
+    product_id: int = Field(description='ID товара')
     quantity: int = Field(ge=1, description='Количество товара')
+    reserved_until: datetime | None = Field(None, description='Срок резерва товара; null — товар не зарезервирован')
     product: Product = Field(description='Информация о товаре')
 
     model_config = ConfigDict(from_attributes=True)
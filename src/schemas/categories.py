@@ -11,6 +11,7 @@ class Category(BaseModel):
         default=None,
         description='ID родительской категории, если есть',
     )
+    version: int = Field(default=1, description='Версия категории для заголовка `If-Match`; увеличивается при каждом изменении')
     model_config = ConfigDict(from_attributes=True)
 
 
@@ -26,3 +27,13 @@ class CategoryCreate(BaseModel):
         default=None,
         description='ID родительской категории, если есть',
     )
+
+
+class CategoryCascade(BaseModel):
+    """Модель для ответа на отключение или восстановление категории вместе с поддеревом."""
+
+    status: str = Field(description='Результат операции')
+    message: str = Field(description='Описание результата')
+    dry_run: bool = Field(description='Пробный запуск: изменения не сохранены, возвращены только количества')
+    categories: int = Field(description='Количество затронутых категорий, включая указанную')
+    products: int = Field(description='Количество затронутых товаров поддерева')
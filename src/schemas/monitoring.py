@@ -0,0 +1,24 @@
+from datetime import datetime
+
+from pydantic import BaseModel, Field
+
+
+class DatabaseProbe(BaseModel):
+    """Результат фоновой проверки базы данных."""
+
+    healthy: bool = Field(description='Успешно ли выполнен проверочный запрос')
+    checked_at: datetime = Field(description='Время проверки')
+    latency_ms: float = Field(ge=0, description='Длительность проверочного запроса, мс')
+    pool_size: int = Field(ge=0, description='Размер пула соединений')
+    pool_checked_out: int = Field(ge=0, description='Количество выданных соединений')
+    pool_overflow: int = Field(ge=0, description='Количество соединений сверх размера пула')
+    error: str | None = Field(default=None, description='Текст ошибки, если проверка не удалась')
+
+
+class Readiness(BaseModel):
+    """Ответ проверки готовности приложения принимать трафик."""
+
+    status: str = Field(description='ready, starting, warming_up, draining или unavailable')
+    in_flight: int = Field(ge=0, description='Количество запросов в обработке')
+    database: DatabaseProbe | None = Field(default=None, description='Последняя проверка базы данных')
+    startup_ms: dict[str, float] = Field(default_factory=dict, description='Длительность этапов запуска, мс')
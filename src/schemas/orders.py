@@ -40,5 +40,14 @@ class OrderList(BaseModel):
     total: int = Field(ge=0, description='Общее количество заказов')
     page: int = Field(ge=1, description='Текущая страница')
     page_size: int = Field(ge=1, description='Размер страницы')
+    next_cursor: str | None = Field(None, description='Значение `cursor` для следующей страницы или null, если страница последняя')
 
     model_config = ConfigDict(from_attributes=True)
+
+
+class OrdersRequest(BaseModel):
+    """Параметры пагинации списка заказов: по номеру страницы или по курсору."""
+
+    page: int = Field(1, ge=1, description='Номер страницы; не используется, если передан `cursor`')
+    page_size: int = Field(10, ge=1, le=100, description='Размер страницы')
+    cursor: str | None = Field(None, min_length=1, description='Значение `next_cursor` предыдущей страницы')
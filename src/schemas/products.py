@@ -1,7 +1,11 @@
 from decimal import Decimal
+from typing import Literal
 
 from pydantic import BaseModel, ConfigDict, Field
 
+ProductFacetName = Literal['category', 'price', 'in_stock', 'seller']
+ProductSort = Literal['price_asc', 'price_desc', 'rating', 'created_at', 'popularity']
+
 
 class Product(BaseModel):
     """Модель для ответа с данными товара. Используется в GET-запросах."""
@@ -25,6 +29,8 @@ class Product(BaseModel):
     category_id: int = Field(description='ID категории')
     rating: float = Field(description='Рейтинг товара')
     is_active: bool = Field(description='Активность товара')
+    stock_slots: int = Field(default=0, description='Число счётчиков остатка для распродаж; 0 — обычный учёт остатка')
+    version: int = Field(default=1, description='Версия товара для заголовка `If-Match`; увеличивается при каждом изменении продавцом')
     model_config = ConfigDict(from_attributes=True)
 
 
@@ -58,6 +64,40 @@ class ProductCreate(BaseModel):
     category_id: int = Field(description='ID категории, к которой относится товар')
 
 
+class ProductStockSlotsUpdate(BaseModel):
+    """Модель для включения и отключения учёта остатка товара по счётчикам."""
+
+    slots: int = Field(
+        ge=0,
+        le=64,
+        description='Число счётчиков остатка (0 — обычный учёт). Заказы товара списывают остаток с разных счётчиков параллельно',
+    )
+
+
+class FacetCount(BaseModel):
+    """Количество товаров для одного значения фасета."""
+
+    value: int | bool = Field(description='Значение фасета (ID категории, ID продавца или признак наличия)')
+    count: int = Field(ge=0, description='Количество товаров с этим значением')
+
+
+class PriceFacetCount(BaseModel):
+    """Количество товаров в ценовом диапазоне."""
+
+    min_price: Decimal | None = Field(default=None, description='Нижняя граница диапазона (включительно)')
+    max_price: Decimal | None = Field(default=None, description='Верхняя граница диапазона (не включительно)')
+    count: int = Field(ge=0, description='Количество товаров в диапазоне')
+
+
+class ProductFacets(BaseModel):
+    """Фасеты по отфильтрованному набору товаров."""
+
+    category: list[FacetCount] | None = Field(default=None, description='Количество товаров по категориям')
+    price: list[PriceFacetCount] | None = Field(default=None, description='Количество товаров по ценовым диапазонам')
+    in_stock: list[FacetCount] | None = Field(default=None, description='Количество товаров в наличии и без остатка')
+    seller: list[FacetCount] | None = Field(default=None, description='Количество товаров по продавцам')
+
+
 class ProductList(BaseModel):
     """Список пагинации для товаров."""
 
@@ -65,9 +105,30 @@ class ProductList(BaseModel):
     total: int = Field(ge=0, description='Общее количество товаров')
     page: int = Field(ge=1, description='Номер текущей страницы')
     page_size: int = Field(ge=1, description='Количество элементов на странице')
+    facets: ProductFacets | None = Field(default=None, description='Фасеты, если они были запрошены')
     model_config = ConfigDict(from_attributes=True)
 
 
+class ProductBatchRequest(BaseModel):
+    """Запрос на получение нескольких товаров по списку ID."""
+
+    ids: list[int] = Field(min_length=1, max_length=500, description='ID товаров в нужном порядке (до 500)')
+
+
+class ProductRankingRequest(BaseModel):
+    """Запрос рейтинга товаров (тренды или бестселлеры) по категории."""
+
+    category_id: int | None = Field(default=None, description='ID категории: рейтинг по всем её подкатегориям; без него — по всему каталогу')
+    limit: int = Field(default=20, ge=1, le=100, description='Количество товаров (не больше размера сохранённого рейтинга)')
+
+
+class ProductBatch(BaseModel):
+    """Товары, найденные по списку ID, в порядке запроса."""
+
+    items: list[Product] = Field(description='Найденные активные товары в порядке запроса')
+    missing: list[int] = Field(description='ID товаров, которые не найдены, неактивны или находятся в неактивной категории')
+
+
 class ProductsRequest(BaseModel):
     """Запрос для формирования пагинации по товарам."""
 
@@ -79,3 +140,8 @@ class ProductsRequest(BaseModel):
     max_price: float | None = Field(None, ge=0, description='Максимальная цена товара')
     in_stock: bool | None = Field(None, description='true — только товары в наличии, false — только без остатка')
     seller_id: int | None = Field(None, description='ID продавца для фильтрации')
+    sort: ProductSort | None = Field(
+        None,
+        description='Порядок сортировки: по цене, рейтингу, новизне или популярности. По умолчанию — по ID или по релевантности поиска',
+    )
+    facets: list[ProductFacetName] | None = Field(None, description='Фасеты, которые нужно посчитать по отфильтрованным товарам')
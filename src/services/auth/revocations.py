@@ -0,0 +1,90 @@
+import asyncio
+import time
+from logging import Logger
+
+import asyncpg
+
+from src.models.tokens import REVOCATION_CHANNEL
+
+LOAD_REVOKED_QUERY = 'SELECT jti, extract(epoch FROM expires_at)::float8 FROM revoked_tokens WHERE expires_at > now()'
+DELETE_EXPIRED_QUERY = 'DELETE FROM revoked_tokens WHERE expires_at <= now()'
+
+
+class RevokedTokens:
+    """Копия таблицы `revoked_tokens` в памяти воркера.
+
+    Изменения приходят через LISTEN/NOTIFY на отдельном соединении вне пула; после каждого
+    (пере)подключения таблица перечитывается целиком, чтобы не потерять отзывы, сделанные
+    во время обрыва. Проверка токена не обращается к базе данных. Множество служит только
+    быстрым путём отказа: повторное использование токена всё равно отклоняется уникальным
+    ключом таблицы при ротации.
+    """
+
+    def __init__(self, dsn: str, logger: Logger, reconnect_delay: float = 1.0, prune_interval: float = 60.0) -> None:
+        self._dsn = dsn
+        self._logger = logger
+        self._reconnect_delay = reconnect_delay
+        self._prune_interval = prune_interval
+        self._expires_at: dict[str, float] = {}
+        self._connection: asyncpg.Connection | None = None
+        self._disconnected = asyncio.Event()
+
+    def __contains__(self, jti: str) -> bool:
+        expires_at = self._expires_at.get(jti)
+        return expires_at is not None and expires_at > time.time()
+
+    def __len__(self) -> int:
+        return len(self._expires_at)
+
+    def add(self, jti: str, expires_at: float) -> None:
+        """Учёт отзыва токена до истечения его срока."""
+        self._expires_at[jti] = expires_at
+
+    def prune(self) -> None:
+        """Удаление истёкших токенов: они отклоняются уже при проверке подписи."""
+        now = time.time()
+        self._expires_at = {jti: expires_at for jti, expires_at in self._expires_at.items() if expires_at > now}
+
+    def _on_notification(self, _connection: object, _pid: int, _channel: str, payload: object) -> None:
+        jti, _, expires_at = str(payload).partition(':')
+        self.add(jti, float(expires_at))
+
+    def _on_termination(self, _connection: object) -> None:
+        self._disconnected.set()
+
+    async def start(self) -> None:
+        """Подписка на уведомления, очистка истёкших записей и загрузка таблицы."""
+        self._disconnected.clear()
+        connection = await asyncpg.connect(self._dsn)
+        connection.add_termination_listener(self._on_termination)
+        await connection.add_listener(REVOCATION_CHANNEL, self._on_notification)
+        await connection.execute(DELETE_EXPIRED_QUERY)
+        rows = await connection.fetch(LOAD_REVOKED_QUERY)
+        self._expires_at = dict(rows)
+        self._connection = connection
+        self._logger.info(f'Loaded {len(rows)} revoked tokens')
+
+    async def run(self) -> None:
+        """Фоновое обслуживание: периодическая очистка и переподключение после обрыва."""
+        while True:
+            try:
+                async with asyncio.timeout(self._prune_interval):
+                    await self._disconnected.wait()
+            except TimeoutError:
+                self.prune()
+                continue
+
+            self._logger.warning('Revoked tokens listener disconnected, reconnecting')
+            while True:
+                await asyncio.sleep(self._reconnect_delay)
+                try:
+                    await self.start()
+                    break
+                except (OSError, asyncpg.PostgresError) as exc:
+                    self._logger.warning(f'Revoked tokens listener reconnect failed: {type(exc).__name__}: {exc}')
+
+    async def close(self) -> None:
+        """Закрытие соединения подписки."""
+        if self._connection is not None:
+            self._connection.remove_termination_listener(self._on_termination)
+            await self._connection.close()
@@ -0,0 +1,76 @@
+import hashlib
+import time
+from collections import OrderedDict
+from typing import Any
+
+import jwt
+from starlette.types import Scope
+
+from src.config import get_settings
+from src.services.metrics.prometheus import record_cache_access
+
+
+class DecodedTokenCache:
+    """LRU-кеш проверенных claims JWT.
+
+    Клиенты многократно используют один access-токен, поэтому подпись проверяется при первом
+    обращении, затем claims хранятся до истечения `exp`. Ключ — хеш токена, чтобы в памяти
+    не лежали сами токены. Смена секрета или алгоритма очищает кеш.
+    """
+
+    def __init__(self, max_size: int) -> None:
+        self._max_size = max_size
+        self._entries: OrderedDict[bytes, tuple[dict[str, Any], float]] = OrderedDict()
+        self._key_fingerprint = b''
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def clear(self) -> None:
+        """Удаление всех записей."""
+        self._entries.clear()
+
+    def decode(self, token: str, secret_key: str, algorithm: str) -> dict[str, Any]:
+        """Claims токена из кеша или после проверки подписи; исключения те же, что и в `jwt.decode`."""
+        if self._max_size <= 0:
+            return jwt.decode(token, secret_key, algorithms=[algorithm])
+
+        key_fingerprint = hashlib.blake2b(f'{algorithm}:{secret_key}'.encode(), digest_size=16).digest()
+        if key_fingerprint != self._key_fingerprint:
+            self.clear()
+            self._key_fingerprint = key_fingerprint
+
+        digest = hashlib.blake2b(token.encode(), digest_size=16).digest()
+        entry = self._entries.get(digest)
+        if entry is not None:
+            claims, expires_at = entry
+            if time.time() < expires_at:
+                self._entries.move_to_end(digest)
+                record_cache_access('jwt', hit=True)
+                return claims
+            del self._entries[digest]
+            msg = 'Signature has expired'
+            raise jwt.ExpiredSignatureError(msg)
+
+        record_cache_access('jwt', hit=False)
+        claims = jwt.decode(token, secret_key, algorithms=[algorithm])
+        exp = claims.get('exp')
+        if isinstance(exp, int | float):
+            self._entries[digest] = (claims, float(exp))
+            if len(self._entries) > self._max_size:
+                self._entries.popitem(last=False)
+        return claims
+
+
+decoded_tokens = DecodedTokenCache(max_size=get_settings().api_jwt_cache_size)
+
+
+def scope_user_id(scope: Scope, secret_key: str, algorithm: str) -> int | None:
+    """ID пользователя из проверенного bearer-токена запроса ASGI; None — токена нет или он недействителен."""
+    for name, value in scope['headers']:
+        if name == b'authorization' and value[:7].lower() == b'bearer ':
+            try:
+                return int(decoded_tokens.decode(value[7:].decode(), secret_key, algorithm)['id'])
+            except (jwt.PyJWTError, UnicodeDecodeError, KeyError, TypeError, ValueError):
+                return None
+    return None
@@ -0,0 +1,55 @@
+import asyncio
+from logging import Logger
+
+from sqlalchemy import delete, func, select
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from src.config import Settings
+from src.models import StockReservation as StockReservationModel
+from src.services.metrics.prometheus import EXPIRED_STOCK_RESERVATIONS
+
+
+class StockReservationSweeper:
+    """Фоновое удаление истёкших резервов остатков пакетами.
+
+    Истёкший резерв уже не уменьшает доступный остаток, поэтому очистка лишь не даёт таблице
+    расти. Пакет выбирается с `FOR UPDATE SKIP LOCKED`: воркеры разных процессов удаляют
+    разные строки и не ждут резервов, которые продлеваются в этот момент.
+    """
+
+    def __init__(self, session_factory: async_sessionmaker[AsyncSession], logger: Logger, settings: Settings) -> None:
+        self._session_factory = session_factory
+        self._logger = logger
+        self._batch_size = settings.api_stock_reservation_sweep_batch_size
+        self._interval = settings.api_stock_reservation_sweep_interval_seconds
+
+    async def sweep_batch(self) -> int:
+        """Удаление одного пакета истёкших резервов; возвращает количество удалённых."""
+        expired = (
+            select(StockReservationModel.cart_item_id)
+            .where(StockReservationModel.expires_at <= func.now())
+            .limit(self._batch_size)
+            .with_for_update(skip_locked=True)
+        )
+        async with self._session_factory() as session:
+            result = await session.scalars(
+                delete(StockReservationModel)
+                .where(StockReservationModel.cart_item_id.in_(expired.scalar_subquery()))
+                .returning(StockReservationModel.cart_item_id),
+            )
+            deleted = len(result.all())
+            await session.commit()
+        EXPIRED_STOCK_RESERVATIONS.inc(deleted)
+        return deleted
+
+    async def run(self) -> None:
+        """Цикл очистки: полные пакеты удаляются подряд, иначе пауза `interval`."""
+        while True:
+            try:
+                deleted = await self.sweep_batch()
+            except (SQLAlchemyError, OSError) as exc:
+                self._logger.warning(f'Stock reservations sweep failed: {type(exc).__name__}: {exc}')
+                deleted = 0
+            if deleted < self._batch_size:
+                await asyncio.sleep(self._interval)
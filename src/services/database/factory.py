@@ -2,10 +2,12 @@ from logging import Logger
 
 from src.config import Settings
 from src.services.database.postgresql import PostgreSQLDatabase
+from src.services.metrics.prometheus import TimedAsyncAdaptedQueuePool, instrument_engine
 
 
 async def make_database(settings: Settings, logger: Logger) -> PostgreSQLDatabase:
     """Инициализация и настройка подключения к базе данных."""
-    database = PostgreSQLDatabase(settings=settings, logger=logger)
+    database = PostgreSQLDatabase(settings=settings, logger=logger, pool_class=TimedAsyncAdaptedQueuePool)
     await database.startup()
+    instrument_engine(database.engine)
     return database
@@ -0,0 +1,40 @@
+import asyncio
+from logging import Logger
+
+from sqlalchemy import text
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+ORDER_PARTITIONS_CHECK_INTERVAL_SECONDS = 6 * 60 * 60
+CREATE_ORDER_PARTITIONS = text("SELECT create_order_partitions(now(), now() + make_interval(months => :months_ahead))")
+
+
+class OrderPartitions:
+    """Создание месячных секций заказов заранее.
+
+    Секции создаются от текущего месяца на `months_ahead` месяцев вперёд при запуске
+    и затем периодически; функция в базе данных берёт advisory-блокировку и пропускает
+    существующие секции, поэтому несколько воркеров не мешают друг другу.
+    """
+
+    def __init__(self, engine: AsyncEngine, logger: Logger, months_ahead: int) -> None:
+        self._engine = engine
+        self._logger = logger
+        self._months_ahead = months_ahead
+
+    async def ensure(self) -> int:
+        """Создание недостающих секций; возвращает количество созданных таблиц."""
+        async with self._engine.begin() as connection:
+            created = await connection.scalar(CREATE_ORDER_PARTITIONS, {'months_ahead': self._months_ahead})
+        if created:
+            self._logger.info(f'Created {created} order partitions')
+        return created or 0
+
+    async def run(self) -> None:
+        """Периодическая проверка секций."""
+        while True:
+            await asyncio.sleep(ORDER_PARTITIONS_CHECK_INTERVAL_SECONDS)
+            try:
+                await self.ensure()
+            except (SQLAlchemyError, OSError) as exc:
+                self._logger.warning(f'Order partitions check failed: {type(exc).__name__}: {exc}')
@@ -3,6 +3,7 @@ from logging import Logger, getLogger
 from sqlalchemy import text
 from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.orm import DeclarativeBase
+from sqlalchemy.pool import AsyncAdaptedQueuePool, Pool
 
 from src.config import Settings
 
@@ -14,7 +15,7 @@ class Base(DeclarativeBase):
 class PostgreSQLDatabase:
     """Реализация базы данных PostgreSQL."""
 
-    def __init__(self, settings: Settings, logger: Logger | None = None) -> None:
+    def __init__(self, settings: Settings, logger: Logger | None = None, pool_class: type[Pool] | None = None) -> None:
         self._db = settings.postgres_db
         self._user = settings.postgres_user
         self._password = settings.postgres_password
@@ -22,7 +23,10 @@ class PostgreSQLDatabase:
         self._port = settings.postgres_port
 
         self._echo_sql = settings.postgres_echo_sql
+        self._pool_size = settings.postgres_pool_size
+        self._max_overflow = settings.postgres_max_overflow
         self._logger = logger or getLogger(__name__)
+        self._pool_class = pool_class
         self._engine: AsyncEngine | None = None
         self.session_factory: async_sessionmaker[AsyncSession] | None = None
 
@@ -31,6 +35,12 @@ class PostgreSQLDatabase:
         """Формирует асинхронный URL для подключения к PostgreSQL."""
         return f'postgresql+asyncpg://{self._user}:{self._password}@{self._host}:{self._port}/{self._db}'
 
+    @property
+    def engine(self) -> AsyncEngine:
+        """Асинхронный движок SQLAlchemy, доступный после startup."""
+        assert self._engine is not None, 'Database engine is not initialized'
+        return self._engine
+
     async def startup(self) -> None:
         """Инициализация соединения с базой данных."""
         try:
@@ -40,6 +50,9 @@ class PostgreSQLDatabase:
                 self.database_url,
                 echo=self._echo_sql,
                 pool_pre_ping=True,
+                pool_size=self._pool_size,
+                max_overflow=self._max_overflow,
+                poolclass=self._pool_class or AsyncAdaptedQueuePool,
             )
             self.session_factory = async_sessionmaker(
                 bind=self._engine,
@@ -0,0 +1,141 @@
+import asyncio
+import time
+from datetime import UTC, datetime
+from logging import Logger
+
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.pool import QueuePool
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from src.schemas.monitoring import DatabaseProbe, Readiness
+
+
+class ApplicationHealth:
+    """Состояние готовности приложения и кешированный результат проверки базы данных.
+
+    Проверка базы данных выполняется в фоне с заданным интервалом, поэтому запросы
+    к `/ready` не создают нагрузку на пул соединений. Счётчик запросов в обработке
+    используется для плавной остановки: после снятия готовности приложение ждёт
+    завершения уже принятых запросов.
+    """
+
+    def __init__(
+        self,
+        engine: AsyncEngine,
+        logger: Logger,
+        probe_interval: float,
+        probe_timeout: float,
+        startup_phases: dict[str, float] | None = None,
+    ) -> None:
+        self._engine = engine
+        self._logger = logger
+        self._probe_interval = probe_interval
+        self._probe_timeout = probe_timeout
+        self._status = 'starting'
+        self._in_flight = 0
+        self._drained = asyncio.Event()
+        self._drained.set()
+        self._last_probe: DatabaseProbe | None = None
+        self._last_probe_at = 0.0
+        self._startup_phases = startup_phases if startup_phases is not None else {}
+
+    @property
+    def is_ready(self) -> bool:
+        """Готово ли приложение принимать новый трафик."""
+        probe_is_fresh = time.monotonic() - self._last_probe_at <= self._probe_interval * 3
+        return self._status == 'ready' and self._last_probe is not None and self._last_probe.healthy and probe_is_fresh
+
+    def readiness(self) -> Readiness:
+        """Текущее состояние готовности для ответа `/ready`."""
+        status = self._status
+        if status == 'ready' and not self.is_ready:
+            status = 'unavailable'
+        return Readiness(
+            status=status,
+            in_flight=self._in_flight,
+            database=self._last_probe,
+            startup_ms=self._startup_phases,
+        )
+
+    def mark_warming_up(self) -> None:
+        """Прогрев перед включением готовности."""
+        self._status = 'warming_up'
+
+    def mark_ready(self) -> None:
+        """Включение готовности после завершения запуска."""
+        self._status = 'ready'
+
+    def mark_draining(self) -> None:
+        """Снятие готовности перед остановкой."""
+        self._status = 'draining'
+
+    def request_started(self) -> None:
+        """Учёт начала обработки запроса."""
+        self._in_flight += 1
+        self._drained.clear()
+
+    def request_finished(self) -> None:
+        """Учёт завершения обработки запроса."""
+        self._in_flight -= 1
+        if self._in_flight == 0:
+            self._drained.set()
+
+    async def wait_drained(self, timeout: float) -> bool:
+        """Ожидание завершения запросов в обработке. Возвращает False, если истёк таймаут."""
+        try:
+            await asyncio.wait_for(self._drained.wait(), timeout=timeout)
+        except TimeoutError:
+            return False
+        return True
+
+    async def probe_database(self) -> DatabaseProbe:
+        """Проверочный запрос к базе данных и снимок состояния пула."""
+        started = time.perf_counter()
+        error = None
+        try:
+            async with asyncio.timeout(self._probe_timeout), self._engine.connect() as connection:
+                await connection.execute(text('SELECT 1'))
+        except Exception as exc:
+            error = f'{type(exc).__name__}: {exc}'
+
+        pool = self._engine.sync_engine.pool
+        probe = DatabaseProbe(
+            healthy=error is None,
+            checked_at=datetime.now(UTC),
+            latency_ms=(time.perf_counter() - started) * 1000,
+            pool_size=pool.size() if isinstance(pool, QueuePool) else 0,
+            pool_checked_out=pool.checkedout() if isinstance(pool, QueuePool) else 0,
+            pool_overflow=max(pool.overflow(), 0) if isinstance(pool, QueuePool) else 0,
+            error=error,
+        )
+        if self._last_probe is not None and self._last_probe.healthy and not probe.healthy:
+            self._logger.warning(f'Database probe failed: {error}')
+        self._last_probe = probe
+        self._last_probe_at = time.monotonic()
+        return probe
+
+    async def run_probes(self) -> None:
+        """Периодическая фоновая проверка базы данных."""
+        while True:
+            await asyncio.sleep(self._probe_interval)
+            await self.probe_database()
+
+
+class InFlightRequestsMiddleware:
+    """ASGI-middleware для учёта HTTP-запросов в обработке при плавной остановке."""
+
+    def __init__(self, app: ASGIApp) -> None:
+        self.app = app
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        health: ApplicationHealth | None = getattr(scope['app'].state, 'health', None)
+        if scope['type'] != 'http' or health is None:
+            await self.app(scope, receive, send)
+            return
+
+        health.request_started()
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            health.request_finished()
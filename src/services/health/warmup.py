@@ -0,0 +1,146 @@
+import asyncio
+import time
+from collections.abc import Generator
+from contextlib import contextmanager, suppress
+from logging import Logger
+from typing import get_args
+from urllib.parse import quote
+
+from fastapi import FastAPI
+from sqlalchemy import select
+from starlette.types import Message
+
+from src.config import Settings
+from src.models import Product as ProductModel
+from src.schemas.products import ProductFacetName
+from src.services.database.postgresql import PostgreSQLDatabase
+from src.services.limits.admission import INTERNAL_CLIENT
+from src.services.metrics.prometheus import STARTUP_PHASE_DURATION
+from src.utils.routes import PRODUCT_SORT_COLUMNS
+
+WARMUP_SEARCHES = ('warmup', 'прогрев', 'warmup прогрев')
+
+
+class StartupTimings:
+    """Замер длительности этапов запуска приложения."""
+
+    def __init__(self, logger: Logger) -> None:
+        self._logger = logger
+        self.phases: dict[str, float] = {}
+
+    @contextmanager
+    def phase(self, name: str) -> Generator[None]:
+        """Замер одного этапа; результат пишется в журнал, метрики и `/ready`."""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - started
+            self.phases[name] = round(elapsed * 1000, 1)
+            STARTUP_PHASE_DURATION.labels(name).set(elapsed)
+            self._logger.info(f'Startup phase {name} took {elapsed * 1000:.1f} ms')
+
+
+def _warmup_paths(product_id: int) -> list[str]:
+    """Горячие маршруты каталога: сортировки, поиск по каждому языку, фасеты, карточка и пакетная выборка."""
+    paths = ['/categories/', '/products/']
+    paths.extend(f'/products/?sort={sort}' for sort in PRODUCT_SORT_COLUMNS)
+    paths.extend(f'/products/?search={search}' for search in WARMUP_SEARCHES)
+    paths.append('/products/?' + '&'.join(f'facets={facet}' for facet in get_args(ProductFacetName)))
+    paths.extend([
+        f'/products/{product_id}',
+        f'/products/{product_id}/reviews/',
+        f'/products/batch?ids={product_id}',
+    ])
+    return paths
+
+
+async def open_pool_connections(database: PostgreSQLDatabase, count: int) -> None:
+    """Одновременное открытие `count` соединений, чтобы пул был заполнен до первого запроса."""
+    connections = await asyncio.gather(*(database.engine.connect() for _ in range(count)))
+    for connection in connections:
+        await connection.close()
+
+
+async def _call_app(app: FastAPI, path: str) -> None:
+    """GET-запрос к приложению напрямую через ASGI, без HTTP-клиента и сети; ответ отбрасывается.
+
+    Запрос помечается клиентом `INTERNAL_CLIENT`, поэтому не проходит контроль допуска и не учитывается
+    в просмотрах товаров. Ошибка приложения не прерывает прогрев остальных маршрутов.
+    """
+    route, _, query = path.partition('?')
+    scope = {
+        'type': 'http',
+        'asgi': {'version': '3.0'},
+        'http_version': '1.1',
+        'method': 'GET',
+        'scheme': 'http',
+        'path': route,
+        'raw_path': quote(route).encode(),
+        'root_path': '',
+        'query_string': quote(query, safe='=&').encode(),
+        'headers': [(b'host', b'warmup')],
+        'client': INTERNAL_CLIENT,
+        'server': ('warmup', 80),
+    }
+    request_sent = False
+    response_done = asyncio.Event()
+
+    async def receive() -> Message:
+        nonlocal request_sent
+        if not request_sent:
+            request_sent = True
+            return {'type': 'http.request', 'body': b'', 'more_body': False}
+        await response_done.wait()
+        return {'type': 'http.disconnect'}
+
+    async def send(message: Message) -> None:  # ruff: ignore[unused-async]  # ASGI ожидает корутину
+        if message['type'] == 'http.response.body' and not message.get('more_body', False):
+            response_done.set()
+
+    with suppress(Exception):
+        await app(scope, receive, send)
+
+
+async def warm_up_requests(app: FastAPI, database: PostgreSQLDatabase, concurrency: int) -> int:
+    """Выполнение горячих запросов через само приложение.
+
+    Каждый маршрут вызывается `concurrency` раз одновременно, поэтому запросы получают разные
+    соединения пула: SQLAlchemy кеширует компиляцию выражений, asyncpg же подготавливает
+    выражения и загружает кодеки типов на каждом соединении. Заодно прогреваются валидация
+    параметров и сериализация ответов. Возвращает количество выполненных запросов.
+    """
+    assert database.session_factory is not None
+    async with database.session_factory() as session:
+        product_id = await session.scalar(select(ProductModel.id).where(ProductModel.is_active).limit(1))
+
+    paths = _warmup_paths(product_id or 0)
+    for path in paths:
+        await asyncio.gather(*(_call_app(app, path) for _ in range(concurrency)))
+    return len(paths) * concurrency
+
+
+async def warm_up(
+    app: FastAPI,
+    database: PostgreSQLDatabase,
+    timings: StartupTimings,
+    logger: Logger,
+    settings: Settings,
+) -> None:
+    """Прогрев пула соединений, горячих запросов и схемы OpenAPI перед включением готовности.
+
+    Если прогрев не укладывается в отведённое время, приложение всё равно становится готовым;
+    оставшаяся часть прогрева происходит на реальных запросах.
+    """
+    pool_size, timeout = settings.postgres_pool_size, settings.api_warmup_timeout_seconds
+    try:
+        async with asyncio.timeout(timeout):
+            with timings.phase('warmup_pool'):
+                await open_pool_connections(database, pool_size)
+            with timings.phase('warmup_requests'):
+                await warm_up_requests(app, database, pool_size)
+    except TimeoutError:
+        logger.warning(f'Warm-up did not finish in {timeout:.0f} s, continuing startup')
+
+    with timings.phase('warmup_openapi'):
+        app.openapi()
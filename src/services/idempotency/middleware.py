@@ -0,0 +1,153 @@
+import asyncio
+import hashlib
+import time
+from datetime import datetime
+
+from fastapi import status
+from fastapi.responses import JSONResponse, Response
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+from src.config import Settings
+from src.services.auth.tokens import scope_user_id
+from src.services.idempotency.store import IdempotencyStore, StoredResponse
+from src.services.limits.buckets import retry_after_header
+from src.services.metrics.prometheus import IDEMPOTENT_REQUESTS
+
+IDEMPOTENCY_HEADER = b'idempotency-key'
+REPLAYED_HEADER = b'idempotent-replayed'
+MAX_KEY_LENGTH = 255
+WAIT_POLL_INTERVAL_SECONDS = 0.1
+
+
+async def _read_body(receive: Receive) -> bytes:
+    """Тело запроса целиком."""
+    chunks = []
+    while True:
+        message = await receive()
+        chunks.append(message.get('body', b''))
+        if not message.get('more_body', False):
+            return b''.join(chunks)
+
+
+def _fingerprint(scope: Scope, body: bytes) -> str:
+    """Отпечаток запроса: повтор с тем же ключом должен совпадать с первым запросом."""
+    digest = hashlib.sha256()
+    for part in (scope['method'].encode(), scope['path'].encode(), scope['query_string'], body):
+        digest.update(len(part).to_bytes(8, 'big'))
+        digest.update(part)
+    return digest.hexdigest()
+
+
+def _replay(response: StoredResponse) -> Response:
+    """Ответ из сохранённого результата с пометкой о повторе."""
+    replayed = Response(content=response.body, status_code=response.status_code)
+    replayed.raw_headers = [(name.encode('latin-1'), value.encode('latin-1')) for name, value in response.headers]
+    replayed.raw_headers.append((REPLAYED_HEADER, b'true'))
+    return replayed
+
+
+class IdempotencyMiddleware:
+    """ASGI-middleware повторяемых POST-запросов с заголовком `Idempotency-Key`.
+
+    Ответ на первый запрос пользователя с ключом сохраняется, повтор с тем же ключом получает
+    его без повторного выполнения (с заголовком `Idempotent-Replayed: true`). Повтор, пришедший
+    во время выполнения первого запроса, ждёт его ответа до `API_IDEMPOTENCY_LOCK_SECONDS` секунд,
+    затем получает 409. Ключ с другим телом или адресом запроса — 422. Ответы 5xx не сохраняются:
+    такой запрос можно повторить с тем же ключом. Запросы без ключа или без действительного
+    токена обрабатываются как обычно.
+    """
+
+    def __init__(self, app: ASGIApp, settings: Settings) -> None:
+        self.app = app
+        self._secret_key = settings.api_secret_key
+        self._algorithm = settings.api_jwt_encode_algorithm
+        self._wait_timeout = settings.api_idempotency_lock_seconds
+
+    async def _acquire(self, store: IdempotencyStore, user_id: int, key: str, fingerprint: str) -> datetime | Response:
+        """Занятие ключа (токен занятия) или ответ без выполнения запроса: повтор, несовпадение или таймаут ожидания."""
+        deadline = time.monotonic() + self._wait_timeout
+        while (claimed_at := await store.claim(user_id, key, fingerprint)) is None:
+            state = await store.get(user_id, key)
+            if state is None:
+                continue
+            if state.fingerprint != fingerprint:
+                IDEMPOTENT_REQUESTS.labels('mismatch').inc()
+                return JSONResponse(
+                    status_code=status.HTTP_422_UNPROCESSABLE_CONTENT,
+                    content={'detail': 'Idempotency-Key was already used for a different request'},
+                )
+            if state.response is not None:
+                IDEMPOTENT_REQUESTS.labels('replayed').inc()
+                return _replay(state.response)
+            if time.monotonic() >= deadline:
+                IDEMPOTENT_REQUESTS.labels('in_progress').inc()
+                return JSONResponse(
+                    status_code=status.HTTP_409_CONFLICT,
+                    content={'detail': 'A request with this Idempotency-Key is still in progress'},
+                    headers={'Retry-After': retry_after_header(WAIT_POLL_INTERVAL_SECONDS)},
+                )
+            await asyncio.sleep(WAIT_POLL_INTERVAL_SECONDS)
+        return claimed_at
+
+    async def _execute(self, scope: Scope, body: bytes, receive: Receive, send: Send) -> StoredResponse:
+        """Выполнение запроса с передачей ответа клиенту и его сохранением."""
+        body_sent = False
+        status_code = status.HTTP_500_INTERNAL_SERVER_ERROR
+        headers: list[list[str]] = []
+        chunks: list[bytes] = []
+
+        async def replay_receive() -> Message:
+            nonlocal body_sent
+            if body_sent:
+                return await receive()
+            body_sent = True
+            return {'type': 'http.request', 'body': body, 'more_body': False}
+
+        async def capture_send(message: Message) -> None:
+            nonlocal status_code
+            if message['type'] == 'http.response.start':
+                status_code = message['status']
+                headers.extend([name.decode('latin-1'), value.decode('latin-1')] for name, value in message.get('headers', []))
+            elif message['type'] == 'http.response.body':
+                chunks.append(message.get('body', b''))
+            await send(message)
+
+        await self.app(scope, replay_receive, capture_send)
+        return StoredResponse(status_code, headers, b''.join(chunks))
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        raw_key = None
+        if scope['type'] == 'http' and scope['method'] == 'POST':
+            raw_key = next((value for name, value in scope['headers'] if name == IDEMPOTENCY_HEADER), None)
+        user_id = scope_user_id(scope, self._secret_key, self._algorithm) if raw_key is not None else None
+        if raw_key is None or user_id is None:
+            await self.app(scope, receive, send)
+            return
+
+        if not raw_key or len(raw_key) > MAX_KEY_LENGTH:
+            response = JSONResponse(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                content={'detail': f'Idempotency-Key must be 1 to {MAX_KEY_LENGTH} characters long'},
+            )
+            await response(scope, receive, send)
+            return
+
+        key = raw_key.decode('latin-1')
+        body = await _read_body(receive)
+        store: IdempotencyStore = scope['app'].state.idempotency
+        acquired = await self._acquire(store, user_id, key, _fingerprint(scope, body))
+        if isinstance(acquired, Response):
+            await acquired(scope, receive, send)
+            return
+        claimed_at = acquired
+
+        try:
+            stored = await self._execute(scope, body, receive, send)
+        except Exception:
+            await store.release(user_id, key, claimed_at)
+            raise
+        IDEMPOTENT_REQUESTS.labels('executed').inc()
+        if stored.status_code >= status.HTTP_500_INTERNAL_SERVER_ERROR:
+            await store.release(user_id, key, claimed_at)
+        else:
+            await store.complete(user_id, key, claimed_at, stored)
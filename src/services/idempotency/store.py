@@ -0,0 +1,153 @@
+import asyncio
+from dataclasses import dataclass
+from datetime import datetime, timedelta
+from logging import Logger
+
+from sqlalchemy import delete, func, select, tuple_, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncEngine
+
+from src.config import Settings
+from src.models import IdempotencyKey as IdempotencyKeyModel
+
+CLEANUP_INTERVAL_SECONDS = 10 * 60
+CLEANUP_BATCH_SIZE = 1000
+
+
+@dataclass(frozen=True)
+class StoredResponse:
+    """Сохранённый ответ на запрос с ключом идемпотентности."""
+
+    status_code: int
+    headers: list[list[str]]
+    body: bytes
+
+
+@dataclass(frozen=True)
+class KeyState:
+    """Состояние ключа, занятого другим запросом: отпечаток запроса и ответ (None — запрос ещё выполняется)."""
+
+    fingerprint: str
+    response: StoredResponse | None
+
+
+class IdempotencyStore:
+    """Хранение ответов на запросы с ключом идемпотентности в таблице `idempotency_keys`.
+
+    Первый запрос занимает ключ строкой без ответа на `lock_seconds` секунд; после выполнения
+    в строку записывается ответ, и она хранится `ttl_seconds` секунд. Истёкшую строку, в том числе
+    брошенную упавшим процессом, следующий запрос занимает заново. Время занятия (`created_at`)
+    служит токеном владельца: ответ сохраняет и ключ освобождает только запрос, который занял
+    строку последним, поэтому запрос, переживший свою блокировку, не затрёт занятие повтора.
+    """
+
+    def __init__(self, engine: AsyncEngine, logger: Logger, settings: Settings) -> None:
+        self._engine = engine
+        self._logger = logger
+        self._ttl = timedelta(seconds=settings.api_idempotency_ttl_seconds)
+        self._lock = timedelta(seconds=settings.api_idempotency_lock_seconds)
+
+    async def claim(self, user_id: int, key: str, fingerprint: str) -> datetime | None:
+        """Попытка занять ключ для выполнения запроса; возвращает токен занятия, None — ключ занят действующей строкой."""
+        statement = insert(IdempotencyKeyModel).values(
+            user_id=user_id,
+            key=key,
+            fingerprint=fingerprint,
+            expires_at=func.now() + self._lock,
+        )
+        statement = statement.on_conflict_do_update(
+            index_elements=['user_id', 'key'],
+            set_={
+                'fingerprint': statement.excluded.fingerprint,
+                'status_code': None,
+                'headers': None,
+                'body': None,
+                'created_at': func.now(),
+                'expires_at': statement.excluded.expires_at,
+            },
+            where=IdempotencyKeyModel.expires_at <= func.now(),
+        )
+        async with self._engine.begin() as connection:
+            result = await connection.execute(statement.returning(IdempotencyKeyModel.created_at))
+            return result.scalar_one_or_none()
+
+    async def get(self, user_id: int, key: str) -> KeyState | None:
+        """Действующее состояние ключа; None — строки нет или она истекла."""
+        async with self._engine.connect() as connection:
+            result = await connection.execute(
+                select(
+                    IdempotencyKeyModel.fingerprint,
+                    IdempotencyKeyModel.status_code,
+                    IdempotencyKeyModel.headers,
+                    IdempotencyKeyModel.body,
+                )
+                .where(
+                    IdempotencyKeyModel.user_id == user_id,
+                    IdempotencyKeyModel.key == key,
+                    IdempotencyKeyModel.expires_at > func.now(),
+                ),
+            )
+            row = result.first()
+        if row is None:
+            return None
+        fingerprint, status_code, headers, body = row
+        response = StoredResponse(status_code, headers or [], body or b'') if status_code is not None else None
+        return KeyState(fingerprint, response)
+
+    async def complete(self, user_id: int, key: str, claimed_at: datetime, response: StoredResponse) -> None:
+        """Сохранение ответа на `ttl_seconds` секунд, если ключ всё ещё занят этим запросом."""
+        async with self._engine.begin() as connection:
+            await connection.execute(
+                update(IdempotencyKeyModel)
+                .where(
+                    IdempotencyKeyModel.user_id == user_id,
+                    IdempotencyKeyModel.key == key,
+                    IdempotencyKeyModel.created_at == claimed_at,
+                    IdempotencyKeyModel.status_code.is_(None),
+                )
+                .values(
+                    status_code=response.status_code,
+                    headers=response.headers,
+                    body=response.body,
+                    expires_at=func.now() + self._ttl,
+                ),
+            )
+
+    async def release(self, user_id: int, key: str, claimed_at: datetime) -> None:
+        """Освобождение ключа без ответа, чтобы повтор запроса выполнился заново, если ключ всё ещё занят этим запросом."""
+        async with self._engine.begin() as connection:
+            await connection.execute(
+                delete(IdempotencyKeyModel).where(
+                    IdempotencyKeyModel.user_id == user_id,
+                    IdempotencyKeyModel.key == key,
+                    IdempotencyKeyModel.created_at == claimed_at,
+                    IdempotencyKeyModel.status_code.is_(None),
+                ),
+            )
+
+    async def delete_expired(self) -> int:
+        """Удаление истёкших ключей пакетами; возвращает количество удалённых."""
+        deleted = 0
+        while True:
+            expired = (
+                select(IdempotencyKeyModel.user_id, IdempotencyKeyModel.key)
+                .where(IdempotencyKeyModel.expires_at <= func.now())
+                .limit(CLEANUP_BATCH_SIZE)
+            )
+            async with self._engine.begin() as connection:
+                result = await connection.execute(
+                    delete(IdempotencyKeyModel).where(tuple_(IdempotencyKeyModel.user_id, IdempotencyKeyModel.key).in_(expired)),
+                )
+            deleted += result.rowcount
+            if result.rowcount < CLEANUP_BATCH_SIZE:
+                return deleted
+
+    async def run(self) -> None:
+        """Периодическое удаление истёкших ключей."""
+        while True:
+            await asyncio.sleep(CLEANUP_INTERVAL_SECONDS)
+            try:
+                await self.delete_expired()
+            except (SQLAlchemyError, OSError) as exc:
+                self._logger.warning(f'Idempotency keys cleanup failed: {type(exc).__name__}: {exc}')
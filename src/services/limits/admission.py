@@ -0,0 +1,170 @@
+from collections import Counter
+from dataclasses import dataclass
+from typing import Literal
+from urllib.parse import parse_qs
+
+from fastapi import status
+from fastapi.responses import JSONResponse
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+from src.config import Settings
+from src.services.auth.tokens import scope_user_id
+from src.services.limits.buckets import MemoryTokenBuckets, SharedTokenBuckets, TokenBuckets, retry_after_header
+from src.services.metrics.prometheus import ADMISSION_REJECTIONS
+
+EXEMPT_PATHS = frozenset({'/health', '/ready', '/metrics'})
+# адрес клиента для запросов прогрева, выполняемых через ASGI без сети; сетевой клиент не может иметь такой адрес
+INTERNAL_CLIENT = ('internal', 0)
+OVERLOAD_RETRY_AFTER_SECONDS = 1.0
+
+
+def is_internal_request(scope: Scope) -> bool:
+    """Запрос прогрева, выполненный через ASGI без сети."""
+    return tuple(scope.get('client') or ()) == INTERNAL_CLIENT
+
+
+@dataclass(frozen=True)
+class AdmissionRule:
+    """Ограничение частоты и числа одновременных запросов для группы запросов.
+
+    Корзина токенов вмещает `per_minute` запросов и пополняется с той же скоростью в минуту.
+    Ключ корзины: `client` — пользователь из JWT (без токена — IP-адрес); `ip` — IP-адрес;
+    `route` — одна корзина на правило для всех клиентов. `max_concurrency` ограничивает
+    одновременные запросы в пределах воркера.
+    """
+
+    name: str
+    key: Literal['client', 'ip', 'route']
+    per_minute: int
+    method: str | None = None
+    path: str | None = None
+    query_param: str | None = None
+    max_concurrency: int = 0
+
+    def matches(self, method: str, path: str, query: dict[str, list[str]]) -> bool:
+        """Относится ли запрос к правилу."""
+        return (
+            (self.method is None or self.method == method)
+            and (self.path is None or self.path == path)
+            and (self.query_param is None or any(query.get(self.query_param, [])))
+        )
+
+
+def admission_rules(settings: Settings) -> list[AdmissionRule]:
+    """Правила по умолчанию: подбор паролей, поиск и общий лимит на клиента."""
+    return [
+        AdmissionRule(
+            name='login',
+            key='ip',
+            per_minute=settings.api_rate_limit_login_per_minute,
+            method='POST',
+            path='/users/token',
+            max_concurrency=settings.api_login_max_concurrency,
+        ),
+        AdmissionRule(
+            name='search',
+            key='client',
+            per_minute=settings.api_rate_limit_search_per_minute,
+            method='GET',
+            path='/products/',
+            query_param='search',
+        ),
+        AdmissionRule(name='default', key='client', per_minute=settings.api_rate_limit_requests_per_minute),
+    ]
+
+
+def make_token_buckets(settings: Settings) -> TokenBuckets:
+    """Корзины в памяти воркера или, если задан `API_RATE_LIMIT_DIR`, общие для воркеров хоста."""
+    if settings.api_rate_limit_dir:
+        return SharedTokenBuckets(settings.api_rate_limit_dir)
+    return MemoryTokenBuckets()
+
+
+class AdmissionControlMiddleware:
+    """ASGI-middleware ограничения частоты запросов и защиты от перегрузки.
+
+    Когда число запросов в обработке достигает `max_in_flight`, новые запросы сразу получают 503
+    с `Retry-After` вместо ожидания соединения из исчерпанного пула. По умолчанию лимит — размер пула
+    с переполнением, умноженный на `max_in_flight_per_connection`: соединение занято только частью
+    времени запроса, ответы из кеша и 304 его не занимают вовсе. Под gunicorn пул воркера урезается
+    до его доли общего бюджета соединений, и лимит, равный пулу, отклонял бы запросы при свободной базе. Превышение частоты возвращает 429, превышение
+    одновременных запросов правила — 503. Проверки готовности, метрики и прогрев не ограничиваются.
+    """
+
+    def __init__(self, app: ASGIApp, settings: Settings) -> None:
+        self.app = app
+        self._enabled = settings.api_rate_limit_enabled
+        self._rules = admission_rules(settings)
+        self._buckets = make_token_buckets(settings)
+        pool_capacity = settings.postgres_pool_size + settings.postgres_max_overflow
+        self._max_in_flight = settings.api_max_in_flight or pool_capacity * settings.api_max_in_flight_per_connection
+        self._secret_key = settings.api_secret_key
+        self._algorithm = settings.api_jwt_encode_algorithm
+        self._in_flight = 0
+        self._active: Counter[str] = Counter()
+
+    def _client_key(self, scope: Scope) -> str:
+        """Пользователь из проверенного JWT или IP-адрес клиента."""
+        user_id = scope_user_id(scope, self._secret_key, self._algorithm)
+        return f'user:{user_id}' if user_id is not None else self._ip_key(scope)
+
+    @staticmethod
+    def _ip_key(scope: Scope) -> str:
+        client = scope.get('client')
+        return f'ip:{client[0] if client else "unknown"}'
+
+    def _bucket_key(self, rule: AdmissionRule, scope: Scope) -> str:
+        if rule.key == 'route':
+            return rule.name
+        if rule.key == 'ip':
+            return f'{rule.name}:{self._ip_key(scope)}'
+        return f'{rule.name}:{self._client_key(scope)}'
+
+    @staticmethod
+    def _rejection(status_code: int, detail: str, retry_after: float) -> JSONResponse:
+        return JSONResponse(
+            status_code=status_code,
+            content={'detail': detail},
+            headers={'Retry-After': retry_after_header(retry_after)},
+        )
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if (
+            scope['type'] != 'http'
+            or not self._enabled
+            or scope['path'] in EXEMPT_PATHS
+            or is_internal_request(scope)
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        if self._in_flight >= self._max_in_flight:
+            ADMISSION_REJECTIONS.labels('global', 'overload').inc()
+            response = self._rejection(status.HTTP_503_SERVICE_UNAVAILABLE, 'Server is overloaded, retry later', OVERLOAD_RETRY_AFTER_SECONDS)
+            await response(scope, receive, send)
+            return
+
+        query = parse_qs(scope['query_string'].decode('latin-1'))
+        rules = [rule for rule in self._rules if rule.matches(scope['method'], scope['path'], query)]
+        for rule in rules:
+            if rule.max_concurrency and self._active[rule.name] >= rule.max_concurrency:
+                ADMISSION_REJECTIONS.labels(rule.name, 'concurrency').inc()
+                detail = 'Too many concurrent requests, retry later'
+                response = self._rejection(status.HTTP_503_SERVICE_UNAVAILABLE, detail, OVERLOAD_RETRY_AFTER_SECONDS)
+                await response(scope, receive, send)
+                return
+            if rule.per_minute:
+                retry_after = self._buckets.take(self._bucket_key(rule, scope), rule.per_minute / 60, rule.per_minute)
+                if retry_after:
+                    ADMISSION_REJECTIONS.labels(rule.name, 'rate').inc()
+                    response = self._rejection(status.HTTP_429_TOO_MANY_REQUESTS, 'Too many requests', retry_after)
+                    await response(scope, receive, send)
+                    return
+
+        self._in_flight += 1
+        self._active.update(rule.name for rule in rules)
+        try:
+            await self.app(scope, receive, send)
+        finally:
+            self._in_flight -= 1
+            self._active.subtract(rule.name for rule in rules)
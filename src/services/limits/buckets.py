@@ -0,0 +1,92 @@
+import fcntl
+import hashlib
+import math
+import mmap
+import os
+import struct
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Protocol
+
+SHARED_BUCKETS_FILE = 'buckets.bin'
+SLOT = struct.Struct('=Qdd')
+
+
+class TokenBuckets(Protocol):
+    """Хранилище корзин токенов."""
+
+    def take(self, key: str, rate: float, capacity: float) -> float:
+        """Списание одного токена; возвращает 0, если запрос разрешён, иначе время ожидания в секундах."""
+
+
+def _refill(tokens: float, updated_at: float, now: float, rate: float, capacity: float) -> tuple[float, float]:
+    """Пополнение корзины и попытка списать токен: остаток токенов и время ожидания."""
+    tokens = min(capacity, tokens + max(now - updated_at, 0.0) * rate)
+    if tokens >= 1:
+        return tokens - 1, 0.0
+    return tokens, (1 - tokens) / rate
+
+
+class MemoryTokenBuckets:
+    """Корзины в памяти воркера; при превышении `max_keys` вытесняются давно не использованные ключи."""
+
+    def __init__(self, max_keys: int = 100_000) -> None:
+        self._max_keys = max_keys
+        self._buckets: OrderedDict[str, tuple[float, float]] = OrderedDict()
+
+    def take(self, key: str, rate: float, capacity: float) -> float:
+        """Списание одного токена; возвращает 0, если запрос разрешён, иначе время ожидания в секундах."""
+        now = time.monotonic()
+        tokens, updated_at = self._buckets.get(key, (capacity, now))
+        tokens, retry_after = _refill(tokens, updated_at, now, rate, capacity)
+        self._buckets[key] = (tokens, now)
+        self._buckets.move_to_end(key)
+        if len(self._buckets) > self._max_keys:
+            self._buckets.popitem(last=False)
+        return retry_after
+
+
+class SharedTokenBuckets:
+    """Корзины в файле, отображённом в память и общем для воркеров одного хоста.
+
+    Ключ хешируется в одну из `slots` ячеек (хеш ключа, токены, время обновления); ячейка
+    блокируется на время списания через `lockf`. Если ячейка занята другим ключом,
+    корзина вытесняется и начинается заново, поэтому коллизии ослабляют ограничение, но не
+    приводят к ложным отказам.
+    """
+
+    def __init__(self, directory: str, slots: int = 65536) -> None:
+        self._slots = slots
+        path = Path(directory).joinpath(SHARED_BUCKETS_FILE)
+        self._fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o600)
+        size = slots * SLOT.size
+        if os.fstat(self._fd).st_size < size:
+            os.ftruncate(self._fd, size)
+        self._map = mmap.mmap(self._fd, size)
+
+    def take(self, key: str, rate: float, capacity: float) -> float:
+        """Списание одного токена; возвращает 0, если запрос разрешён, иначе время ожидания в секундах."""
+        key_hash = int.from_bytes(hashlib.blake2b(key.encode(), digest_size=8).digest())
+        offset = key_hash % self._slots * SLOT.size
+        now = time.time()
+        fcntl.lockf(self._fd, fcntl.LOCK_EX, SLOT.size, offset)
+        try:
+            stored_hash, tokens, updated_at = SLOT.unpack_from(self._map, offset)
+            if stored_hash != key_hash:
+                tokens, updated_at = capacity, now
+            tokens, retry_after = _refill(tokens, updated_at, now, rate, capacity)
+            SLOT.pack_into(self._map, offset, key_hash, tokens, now)
+        finally:
+            fcntl.lockf(self._fd, fcntl.LOCK_UN, SLOT.size, offset)
+        return retry_after
+
+    def close(self) -> None:
+        """Закрытие отображения и файла."""
+        self._map.close()
+        os.close(self._fd)
+
+
+def retry_after_header(seconds: float) -> str:
+    """Значение заголовка Retry-After: целое число секунд, не меньше одной."""
+    return str(max(1, math.ceil(seconds)))
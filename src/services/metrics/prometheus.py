@@ -0,0 +1,247 @@
+import asyncio
+import os
+import re
+import time
+from collections import OrderedDict
+from functools import lru_cache
+from typing import Any
+
+from prometheus_client import (
+    CONTENT_TYPE_LATEST,
+    REGISTRY,
+    CollectorRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    generate_latest,
+    multiprocess,
+)
+from sqlalchemy import event
+from sqlalchemy.engine import Connection
+from sqlalchemy.ext.asyncio import AsyncEngine
+from sqlalchemy.pool import AsyncAdaptedQueuePool, ConnectionPoolEntry
+from starlette.routing import Match, Route
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+STATEMENT_PATTERN = re.compile(r'^\s*(\w+)(?:.*?\b(?:FROM|INTO|UPDATE)\s+"?(\w+)"?)?', flags=re.IGNORECASE | re.DOTALL)
+UNMATCHED_ROUTE = '<unmatched>'
+
+HTTP_REQUEST_DURATION = Histogram(
+    'http_request_duration_seconds',
+    'Длительность обработки HTTP-запросов',
+    ['method', 'route', 'status'],
+    buckets=LATENCY_BUCKETS,
+)
+HTTP_REQUESTS_IN_FLIGHT = Gauge(
+    'http_requests_in_flight',
+    'Количество HTTP-запросов в обработке',
+    ['method', 'route'],
+    multiprocess_mode='livesum',
+)
+DB_STATEMENT_DURATION = Histogram(
+    'db_statement_duration_seconds',
+    'Длительность выполнения SQL-выражений',
+    ['operation', 'table'],
+    buckets=LATENCY_BUCKETS,
+)
+DB_POOL_CHECKED_OUT = Gauge(
+    'db_pool_checked_out_connections',
+    'Количество соединений, выданных из пула',
+    multiprocess_mode='livesum',
+)
+DB_POOL_OVERFLOW = Gauge(
+    'db_pool_overflow_connections',
+    'Количество соединений сверх размера пула',
+    multiprocess_mode='livesum',
+)
+DB_POOL_WAIT = Histogram(
+    'db_pool_wait_seconds',
+    'Время ожидания свободного соединения в пуле',
+    buckets=LATENCY_BUCKETS,
+)
+CACHE_REQUESTS = Counter(
+    'cache_requests_total',
+    'Обращения к кешам приложения',
+    ['cache', 'result'],
+)
+ADMISSION_REJECTIONS = Counter(
+    'admission_rejected_requests_total',
+    'Запросы, отклонённые ограничением частоты или сбросом нагрузки',
+    ['rule', 'reason'],
+)
+OUTBOX_EVENTS = Counter(
+    'outbox_events_total',
+    'События outbox, обработанные фоновым воркером',
+    ['topic', 'result'],
+)
+OUTBOX_EVENT_DELAY = Histogram(
+    'outbox_event_delay_seconds',
+    'Время от записи события outbox до его обработки',
+    ['topic'],
+    buckets=LATENCY_BUCKETS,
+)
+EXPIRED_STOCK_RESERVATIONS = Counter(
+    'stock_reservations_expired_total',
+    'Истёкшие резервы остатков, удалённые фоновой очисткой',
+)
+IDEMPOTENT_REQUESTS = Counter(
+    'idempotent_requests_total',
+    'Запросы с заголовком Idempotency-Key по результату обработки',
+    ['result'],
+)
+RECOMMENDATION_ORDERS = Counter(
+    'recommendation_orders_processed_total',
+    'Заказы, учтённые в рекомендациях «часто покупают вместе»',
+)
+STARTUP_PHASE_DURATION = Gauge(
+    'startup_phase_duration_seconds',
+    'Длительность этапов запуска приложения',
+    ['phase'],
+)
+EVENT_LOOP_LAG = Histogram(
+    'event_loop_lag_seconds',
+    'Задержка срабатывания таймеров цикла событий',
+    buckets=LATENCY_BUCKETS,
+)
+
+
+def record_cache_access(cache: str, hit: bool) -> None:
+    """Учёт попадания или промаха кеша для расчёта доли попаданий."""
+    CACHE_REQUESTS.labels(cache, 'hit' if hit else 'miss').inc()
+
+
+def render_metrics() -> tuple[bytes, str]:
+    """Формирование ответа в текстовом формате Prometheus.
+
+    Если задан `PROMETHEUS_MULTIPROC_DIR`, метрики собираются из файлов всех воркеров.
+    """
+    if 'PROMETHEUS_MULTIPROC_DIR' in os.environ:
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)  # type: ignore[no-untyped-call]
+        return generate_latest(registry), CONTENT_TYPE_LATEST
+    return generate_latest(REGISTRY), CONTENT_TYPE_LATEST
+
+
+def mark_process_dead() -> None:
+    """Удаление live-метрик завершившегося воркера в многопроцессном режиме."""
+    if 'PROMETHEUS_MULTIPROC_DIR' in os.environ:
+        multiprocess.mark_process_dead(os.getpid())  # type: ignore[no-untyped-call]
+
+
+class TimedAsyncAdaptedQueuePool(AsyncAdaptedQueuePool):
+    """Пул соединений, который измеряет время ожидания свободного соединения."""
+
+    def _do_get(self) -> ConnectionPoolEntry:
+        started = time.perf_counter()
+        try:
+            return super()._do_get()
+        finally:
+            DB_POOL_WAIT.observe(time.perf_counter() - started)
+
+
+@lru_cache(maxsize=2048)
+def _statement_labels(statement: str) -> tuple[str, str]:
+    """Метки операции и основной таблицы SQL-выражения."""
+    match = STATEMENT_PATTERN.match(statement)
+    if match is None:
+        return 'OTHER', ''
+    return match.group(1).upper(), (match.group(2) or '').lower()
+
+
+def instrument_engine(engine: AsyncEngine) -> None:
+    """Подключение обработчиков событий SQLAlchemy для метрик пула и выражений."""
+    sync_engine = engine.sync_engine
+    pool = sync_engine.pool
+
+    def _update_pool_gauges(returning: int = 0) -> None:
+        if isinstance(pool, AsyncAdaptedQueuePool):
+            DB_POOL_CHECKED_OUT.set(max(pool.checkedout() - returning, 0))
+            DB_POOL_OVERFLOW.set(max(pool.overflow(), 0))
+
+    def _on_checkout(*_: Any) -> None:
+        _update_pool_gauges()
+
+    def _on_checkin(*_: Any) -> None:
+        # событие checkin срабатывает до возврата соединения в очередь пула
+        _update_pool_gauges(returning=1)
+
+    def _before_cursor_execute(conn: Connection, *_: Any) -> None:
+        # выражения на одном соединении не вкладываются: время начала выражения, завершившегося ошибкой,
+        # перезаписывается следующим выражением, поэтому стек не нужен
+        conn.info['statement_started'] = time.perf_counter()
+
+    def _after_cursor_execute(conn: Connection, cursor: Any, statement: str, *_: Any) -> None:
+        started = conn.info.pop('statement_started', None)
+        if started is not None:
+            DB_STATEMENT_DURATION.labels(*_statement_labels(statement)).observe(time.perf_counter() - started)
+
+    event.listen(pool, 'checkout', _on_checkout)
+    event.listen(pool, 'checkin', _on_checkin)
+    event.listen(sync_engine, 'before_cursor_execute', _before_cursor_execute)
+    event.listen(sync_engine, 'after_cursor_execute', _after_cursor_execute)
+
+
+async def monitor_event_loop_lag(interval: float = 0.5) -> None:
+    """Периодический замер задержки цикла событий относительно ожидаемого времени пробуждения."""
+    loop = asyncio.get_running_loop()
+    while True:
+        expected = loop.time() + interval
+        await asyncio.sleep(interval)
+        EVENT_LOOP_LAG.observe(max(loop.time() - expected, 0.0))
+
+
+class PrometheusMiddleware:
+    """ASGI-middleware для учёта длительности и числа одновременных HTTP-запросов по маршрутам.
+
+    Шаблон маршрута определяется один раз для пары (метод, путь) и кешируется,
+    чтобы метки не зависели от значений параметров пути.
+    """
+
+    def __init__(self, app: ASGIApp, route_cache_size: int = 4096) -> None:
+        self.app = app
+        self._route_cache: OrderedDict[tuple[str, str], str] = OrderedDict()
+        self._route_cache_size = route_cache_size
+
+    def _resolve_route(self, scope: Scope) -> str:
+        key = (scope['method'], scope['path'])
+        route_path = self._route_cache.get(key)
+        if route_path is not None:
+            self._route_cache.move_to_end(key)
+            return route_path
+
+        route_path = UNMATCHED_ROUTE
+        for route in scope['app'].router.routes:
+            match, _ = route.matches(scope)
+            if match == Match.FULL and isinstance(route, Route):
+                route_path = route.path
+                break
+
+        self._route_cache[key] = route_path
+        if len(self._route_cache) > self._route_cache_size:
+            self._route_cache.popitem(last=False)
+        return route_path
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+
+        method = scope['method']
+        route_path = self._resolve_route(scope)
+        status_code = 500
+
+        async def send_wrapper(message: Message) -> None:
+            nonlocal status_code
+            if message['type'] == 'http.response.start':
+                status_code = message['status']
+            await send(message)
+
+        in_flight = HTTP_REQUESTS_IN_FLIGHT.labels(method, route_path)
+        in_flight.inc()
+        started = time.perf_counter()
+        try:
+            await self.app(scope, receive, send_wrapper)
+        finally:
+            HTTP_REQUEST_DURATION.labels(method, route_path, str(status_code)).observe(time.perf_counter() - started)
+            in_flight.dec()
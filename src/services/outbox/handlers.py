@@ -0,0 +1,151 @@
+from collections.abc import Sequence
+from datetime import datetime
+from typing import Any
+
+from sqlalchemy import Date, cast, func, select, tuple_, update
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from src.models import (
+    OrderItem as OrderItemModel,
+    Product as ProductModel,
+    ProductActivity as ProductActivityModel,
+    ProductStockSlot as ProductStockSlotModel,
+    Review as ReviewModel,
+    SellerDailySales as SellerDailySalesModel,
+    SellerProductDailySales as SellerProductDailySalesModel,
+)
+from src.services.outbox.worker import OutboxHandler
+
+PRODUCT_RATING_TOPIC = 'product_rating'
+ORDER_SALES_TOPIC = 'order_sales'
+
+
+async def _update_product_ratings(session: AsyncSession, product_ids: Sequence[int]) -> None:
+    """Пересчёт рейтинга товаров по активным отзывам одним запросом (без commit)."""
+    average_grade = (
+        select(func.coalesce(func.avg(ReviewModel.grade), 0.0))
+        .where(ReviewModel.product_id == ProductModel.id, ReviewModel.is_active)
+        .scalar_subquery()
+    )
+    await session.execute(update(ProductModel).where(ProductModel.id.in_(product_ids)).values(rating=average_grade))
+
+
+async def _update_seller_sales(session: AsyncSession, order_keys: Sequence[tuple[int, datetime]]) -> None:
+    """Добавление продаж заказов в дневные агрегаты продавцов (без commit).
+
+    Заказы задаются парами (ID, время создания), чтобы чтение позиций затрагивало только их секции.
+    День продажи — дата создания заказа по UTC.
+    """
+    lines = (
+        select(
+            ProductModel.seller_id,
+            OrderItemModel.product_id,
+            OrderItemModel.order_id,
+            OrderItemModel.quantity,
+            OrderItemModel.total_price,
+            cast(func.timezone('UTC', OrderItemModel.order_created_at), Date).label('day'),
+        )
+        .join(ProductModel, ProductModel.id == OrderItemModel.product_id)
+        .where(tuple_(OrderItemModel.order_id, OrderItemModel.order_created_at).in_(order_keys))
+        .cte('order_lines')
+    )
+
+    # сортировка по ключу конфликта задаёт единый порядок блокировок строк агрегатов при записи из нескольких воркеров
+    product_sales = insert(SellerProductDailySalesModel).from_select(
+        ['seller_id', 'day', 'product_id', 'revenue', 'units'],
+        select(lines.c.seller_id, lines.c.day, lines.c.product_id, func.sum(lines.c.total_price), func.sum(lines.c.quantity))
+        .group_by(lines.c.seller_id, lines.c.day, lines.c.product_id)
+        .order_by(lines.c.seller_id, lines.c.day, lines.c.product_id),
+    )
+    await session.execute(product_sales.on_conflict_do_update(
+        index_elements=['seller_id', 'day', 'product_id'],
+        set_={
+            'revenue': SellerProductDailySalesModel.revenue + product_sales.excluded.revenue,
+            'units': SellerProductDailySalesModel.units + product_sales.excluded.units,
+        },
+    ))
+
+    seller_sales = insert(SellerDailySalesModel).from_select(
+        ['seller_id', 'day', 'revenue', 'units', 'orders'],
+        select(
+            lines.c.seller_id,
+            lines.c.day,
+            func.sum(lines.c.total_price),
+            func.sum(lines.c.quantity),
+            func.count(lines.c.order_id.distinct()),
+        )
+        .group_by(lines.c.seller_id, lines.c.day)
+        .order_by(lines.c.seller_id, lines.c.day),
+    )
+    await session.execute(seller_sales.on_conflict_do_update(
+        index_elements=['seller_id', 'day'],
+        set_={
+            'revenue': SellerDailySalesModel.revenue + seller_sales.excluded.revenue,
+            'units': SellerDailySalesModel.units + seller_sales.excluded.units,
+            'orders': SellerDailySalesModel.orders + seller_sales.excluded.orders,
+        },
+    ))
+
+
+async def _update_slotted_products(session: AsyncSession, order_keys: Sequence[tuple[int, datetime]]) -> None:
+    """Учёт продаж товаров со счётчиками остатка одним обновлением на пакет заказов (без commit).
+
+    Оформление заказа не изменяет строку такого товара, поэтому здесь увеличивается число продаж
+    и остаток товара заменяется суммой его счётчиков.
+    """
+    sold = (
+        select(OrderItemModel.product_id, func.sum(OrderItemModel.quantity).label('quantity'))
+        .where(tuple_(OrderItemModel.order_id, OrderItemModel.order_created_at).in_(order_keys))
+        .group_by(OrderItemModel.product_id)
+        .subquery()
+    )
+    slots_stock = (
+        select(func.coalesce(func.sum(ProductStockSlotModel.stock), 0))
+        .where(ProductStockSlotModel.product_id == ProductModel.id)
+        .scalar_subquery()
+    )
+    await session.execute(
+        update(ProductModel)
+        .where(ProductModel.id == sold.c.product_id, ProductModel.stock_slots > 0)
+        .values(sales_count=ProductModel.sales_count + sold.c.quantity, stock=slots_stock)
+        .execution_options(synchronize_session=False),
+    )
+
+
+async def _update_product_activity(session: AsyncSession, order_keys: Sequence[tuple[int, datetime]]) -> None:
+    """Учёт продаж пакета заказов в часовых интервалах активности товаров одним запросом (без commit)."""
+    bucket = func.date_trunc('hour', OrderItemModel.order_created_at, 'UTC')
+    sold = (
+        select(OrderItemModel.product_id, bucket, func.sum(OrderItemModel.quantity))
+        .where(tuple_(OrderItemModel.order_id, OrderItemModel.order_created_at).in_(order_keys))
+        .group_by(OrderItemModel.product_id, bucket)
+        # единый порядок блокировок интервалов, как и при записи просмотров
+        .order_by(OrderItemModel.product_id, bucket)
+    )
+    statement = insert(ProductActivityModel).from_select(['product_id', 'bucket', 'sales'], sold)
+    await session.execute(
+        statement.on_conflict_do_update(
+            index_elements=['product_id', 'bucket'],
+            set_={'sales': ProductActivityModel.sales + statement.excluded.sales},
+        ),
+    )
+
+
+async def update_product_ratings(session: AsyncSession, payloads: list[dict[str, Any]]) -> None:
+    """Пересчёт рейтинга всех товаров пакета одним запросом."""
+    await _update_product_ratings(session, sorted({payload['product_id'] for payload in payloads}))
+
+
+async def record_order_sales(session: AsyncSession, payloads: list[dict[str, Any]]) -> None:
+    """Учёт продаж оформленных заказов в агрегатах аналитики продавцов, товарах со счётчиками остатка и активности товаров."""
+    order_keys = sorted({(payload['order_id'], datetime.fromisoformat(payload['created_at'])) for payload in payloads})
+    await _update_seller_sales(session, order_keys)
+    await _update_slotted_products(session, order_keys)
+    await _update_product_activity(session, order_keys)
+
+
+OUTBOX_HANDLERS: dict[str, OutboxHandler] = {
+    PRODUCT_RATING_TOPIC: update_product_ratings,
+    ORDER_SALES_TOPIC: record_order_sales,
+}
@@ -0,0 +1,132 @@
+import asyncio
+import time
+from collections import defaultdict
+from collections.abc import Awaitable, Callable, Mapping
+from datetime import UTC, datetime, timedelta
+from logging import Logger
+from typing import Any
+
+from sqlalchemy import delete, func, select
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from src.config import Settings
+from src.models import OutboxEvent as OutboxEventModel
+from src.services.metrics.prometheus import OUTBOX_EVENT_DELAY, OUTBOX_EVENTS
+
+OutboxHandler = Callable[[AsyncSession, list[dict[str, Any]]], Awaitable[None]]
+RETRY_DELAY_SECONDS = 1.0
+MAX_RETRY_DELAY_SECONDS = 300.0
+
+
+def enqueue(database: AsyncSession, topic: str, payload: dict[str, Any]) -> None:
+    """Добавление события в outbox в текущей транзакции: оно будет обработано только после её commit."""
+    database.add(OutboxEventModel(topic=topic, payload=payload))
+
+
+class OutboxWorker:
+    """Фоновая обработка событий outbox пакетами.
+
+    Пакет выбирается с `FOR UPDATE SKIP LOCKED`, поэтому воркеры всех процессов разбирают очередь
+    параллельно, не мешая друг другу. События одной темы передаются обработчику одним списком
+    в отдельной точке сохранения: ошибка обработчика откатывает только его изменения, после чего
+    события темы обрабатываются по одному, и с экспоненциально растущей задержкой откладываются
+    лишь те, на которых ошибка повторилась. После `API_OUTBOX_MAX_ATTEMPTS`
+    неудачных попыток событие остаётся в таблице с последней ошибкой и больше не выбирается.
+    """
+
+    def __init__(
+        self,
+        session_factory: async_sessionmaker[AsyncSession],
+        handlers: Mapping[str, OutboxHandler],
+        logger: Logger,
+        settings: Settings,
+    ) -> None:
+        self._session_factory = session_factory
+        self._handlers = handlers
+        self._logger = logger
+        self._batch_size = settings.api_outbox_batch_size
+        self._poll_interval = settings.api_outbox_poll_interval_seconds
+        self._max_attempts = settings.api_outbox_max_attempts
+
+    async def _run_handler(self, session: AsyncSession, topic: str, events: list[OutboxEventModel]) -> str | None:
+        """Вызов обработчика темы в отдельной точке сохранения; возвращает текст ошибки или None."""
+        try:
+            async with session.begin_nested():
+                await self._handlers[topic](session, [event.payload for event in events])
+        except Exception as exc:
+            self._logger.exception(f'Outbox handler for topic {topic} failed on {len(events)} events')
+            return f'{type(exc).__name__}: {exc}'
+        return None
+
+    async def _handle_topic(self, session: AsyncSession, topic: str, events: list[OutboxEventModel]) -> dict[int, str]:
+        """Обработка событий одной темы; возвращает ошибки неудачных событий по их ID.
+
+        Сначала все события темы передаются обработчику одним списком; если он завершается ошибкой,
+        события обрабатываются по одному, чтобы отложить только те, на которых ошибка повторяется.
+        """
+        if topic not in self._handlers:
+            return dict.fromkeys((event.id for event in events), f'No handler for topic {topic}')
+        error = await self._run_handler(session, topic, events)
+        if error is None:
+            return {}
+        if len(events) == 1:
+            return {events[0].id: error}
+        errors: dict[int, str] = {}
+        for event in events:
+            error = await self._run_handler(session, topic, [event])
+            if error is not None:
+                errors[event.id] = error
+        return errors
+
+    async def process_batch(self) -> int:
+        """Обработка одного пакета событий; возвращает количество выбранных событий."""
+        async with self._session_factory() as session:
+            result = await session.scalars(
+                select(OutboxEventModel)
+                .where(OutboxEventModel.available_at <= func.now(), OutboxEventModel.attempts < self._max_attempts)
+                .order_by(OutboxEventModel.available_at, OutboxEventModel.id)
+                .limit(self._batch_size)
+                .with_for_update(skip_locked=True),
+            )
+            events = result.all()
+            if not events:
+                return 0
+
+            by_topic: defaultdict[str, list[OutboxEventModel]] = defaultdict(list)
+            for event in events:
+                by_topic[event.topic].append(event)
+
+            done_ids: list[int] = []
+            now = datetime.now(UTC)
+            for topic, topic_events in by_topic.items():
+                errors = await self._handle_topic(session, topic, topic_events)
+                OUTBOX_EVENTS.labels(topic, 'failed').inc(len(errors))
+                OUTBOX_EVENTS.labels(topic, 'processed').inc(len(topic_events) - len(errors))
+                for event in topic_events:
+                    error = errors.get(event.id)
+                    if error is None:
+                        done_ids.append(event.id)
+                        OUTBOX_EVENT_DELAY.labels(topic).observe((now - event.created_at).total_seconds())
+                        continue
+                    event.attempts += 1
+                    event.last_error = error
+                    delay = min(RETRY_DELAY_SECONDS * 2 ** (event.attempts - 1), MAX_RETRY_DELAY_SECONDS)
+                    event.available_at = now + timedelta(seconds=delay)
+
+            if done_ids:
+                await session.execute(delete(OutboxEventModel).where(OutboxEventModel.id.in_(done_ids)))
+            await session.commit()
+            return len(events)
+
+    async def run(self) -> None:
+        """Цикл обработки: полные пакеты разбираются подряд, иначе пауза `poll_interval`."""
+        while True:
+            started = time.monotonic()
+            try:
+                processed = await self.process_batch()
+            except (SQLAlchemyError, OSError) as exc:
+                self._logger.warning(f'Outbox batch failed: {type(exc).__name__}: {exc}')
+                processed = 0
+            if processed < self._batch_size:
+                await asyncio.sleep(max(self._poll_interval - (time.monotonic() - started), 0.0))
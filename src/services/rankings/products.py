@@ -0,0 +1,196 @@
+import asyncio
+from collections import Counter
+from datetime import UTC, datetime, timedelta
+from logging import Logger
+
+from sqlalchemy import Float, Select, cast, delete, func, literal, select, text, union_all
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+from sqlalchemy.orm import aliased
+
+from src.config import Settings
+from src.models import (
+    Category as CategoryModel,
+    Product as ProductModel,
+    ProductActivity as ProductActivityModel,
+    ProductRanking as ProductRankingModel,
+)
+
+TRENDING_RANKING = 'trending'
+BESTSELLERS_RANKING = 'bestsellers'
+# рейтинг по всему каталогу хранится под этим ID категории
+ALL_CATEGORIES = 0
+# продажа весит в тренде как несколько просмотров карточки
+TRENDING_SALE_WEIGHT = 10
+RANKINGS_LOCK = text("SELECT pg_try_advisory_xact_lock(hashtext('product_rankings'))")
+
+
+def activity_bucket(moment: datetime) -> datetime:
+    """Часовой интервал, в который попадает событие."""
+    return moment.astimezone(UTC).replace(minute=0, second=0, microsecond=0)
+
+
+class ProductViewCounter:
+    """Счётчик просмотров карточек товаров в памяти процесса.
+
+    Просмотр лишь увеличивает счётчик в словаре; накопленное за `interval` секунд записывается
+    в часовые интервалы `product_activity` одним `INSERT ... ON CONFLICT`, поэтому число запросов
+    к базе данных не зависит от числа просмотров. Просмотры, не записанные из-за ошибки, возвращаются в счётчик.
+    """
+
+    def __init__(self, session_factory: async_sessionmaker[AsyncSession], logger: Logger, settings: Settings) -> None:
+        self._session_factory = session_factory
+        self._logger = logger
+        self._interval = settings.api_product_views_flush_interval_seconds
+        self._pending: Counter[tuple[int, datetime]] = Counter()
+
+    def record(self, product_id: int) -> None:
+        """Учёт просмотра карточки товара в текущем часовом интервале."""
+        self._pending[product_id, activity_bucket(datetime.now(UTC))] += 1
+
+    async def flush(self) -> int:
+        """Запись накопленных просмотров; возвращает количество записанных интервалов."""
+        if not self._pending:
+            return 0
+        pending, self._pending = self._pending, Counter()
+        # сортировка задаёт единый порядок блокировок строк при записи из нескольких воркеров
+        rows = [{'product_id': product_id, 'bucket': bucket, 'views': views} for (product_id, bucket), views in sorted(pending.items())]
+        statement = insert(ProductActivityModel).values(rows)
+        statement = statement.on_conflict_do_update(
+            index_elements=['product_id', 'bucket'],
+            set_={'views': ProductActivityModel.views + statement.excluded.views},
+        )
+        try:
+            async with self._session_factory() as session:
+                await session.execute(statement)
+                await session.commit()
+        except BaseException:
+            self._pending.update(pending)
+            raise
+        return len(rows)
+
+    async def _flush_logged(self) -> None:
+        """Запись накопленных просмотров с логированием ошибки вместо её проброса."""
+        try:
+            await self.flush()
+        except (SQLAlchemyError, OSError) as exc:
+            self._logger.warning(f'Product views flush failed: {type(exc).__name__}: {exc}')
+
+    async def run(self) -> None:
+        """Цикл периодической записи просмотров."""
+        while True:
+            await asyncio.sleep(self._interval)
+            await self._flush_logged()
+
+    async def close(self) -> None:
+        """Запись оставшихся просмотров при остановке приложения."""
+        await self._flush_logged()
+
+
+class ProductRankings:
+    """Фоновый пересчёт рейтингов «в тренде» и «хиты продаж» по счётчикам активности товаров.
+
+    Для каждого рейтинга сохраняется `top_n` активных товаров по каждой категории (вместе с товарами
+    её подкатегорий) и по всему каталогу, поэтому маршруты читают готовый список по первичному ключу.
+    Хиты продаж — сумма продаж за `bestsellers_days` дней; тренд — просмотры и взвешенные продажи
+    за `trending_window_hours` часов, вклад интервала которых убывает вдвое каждые `half_life_hours` часов.
+    Пересчёт выполняется одной транзакцией под advisory-блокировкой: из нескольких воркеров
+    его выполняет один, читатели до commit видят прежние рейтинги.
+    """
+
+    def __init__(self, session_factory: async_sessionmaker[AsyncSession], logger: Logger, settings: Settings) -> None:
+        self._session_factory = session_factory
+        self._logger = logger
+        self._interval = settings.api_rankings_refresh_interval_seconds
+        self._top_n = settings.api_rankings_top_n
+        self._bestsellers_period = timedelta(days=settings.api_bestsellers_days)
+        self._trending_window = timedelta(hours=settings.api_trending_window_hours)
+        self._half_life_hours = settings.api_trending_half_life_hours
+
+    def _bestseller_scores(self) -> Select[tuple[int, float]]:
+        """Продажи товаров за период хитов продаж."""
+        sales = func.sum(ProductActivityModel.sales)
+        return (
+            select(ProductActivityModel.product_id, cast(sales, Float).label('score'))
+            .where(ProductActivityModel.bucket >= func.now() - self._bestsellers_period)
+            .group_by(ProductActivityModel.product_id)
+            .having(sales > 0)
+        )
+
+    def _trending_scores(self) -> Select[tuple[int, float]]:
+        """Активность товаров за окно тренда с экспоненциальным затуханием по возрасту интервала."""
+        age_hours = func.extract('epoch', func.now() - ProductActivityModel.bucket) / 3600
+        decay = func.power(0.5, age_hours / self._half_life_hours)
+        score = func.sum((ProductActivityModel.views + TRENDING_SALE_WEIGHT * ProductActivityModel.sales) * decay)
+        return (
+            select(ProductActivityModel.product_id, cast(score, Float).label('score'))
+            .where(ProductActivityModel.bucket >= func.now() - self._trending_window)
+            .group_by(ProductActivityModel.product_id)
+            .having(score > 0)
+        )
+
+    async def _replace_ranking(self, session: AsyncSession, ranking: str, scores: Select[tuple[int, float]]) -> None:
+        """Замена сохранённого рейтинга на `top_n` товаров с наибольшей оценкой по каждой категории."""
+        # категория и все её предки: товар попадает в рейтинги каждой из них
+        ancestors = select(CategoryModel.id.label('category_id'), CategoryModel.id.label('ancestor_id')).cte('ancestors', recursive=True)
+        parent = aliased(CategoryModel)
+        ancestors = ancestors.union(
+            select(ancestors.c.category_id, parent.parent_id)
+            .join(parent, parent.id == ancestors.c.ancestor_id)
+            .where(parent.parent_id.is_not(None)),
+        )
+        scored = scores.subquery('scores')
+        product_scores = (
+            select(scored.c.product_id, scored.c.score, ProductModel.category_id)
+            .join(ProductModel, ProductModel.id == scored.c.product_id)
+            .where(ProductModel.is_active)
+            .cte('product_scores')
+        )
+        members = union_all(
+            select(ancestors.c.ancestor_id.label('category_id'), product_scores.c.product_id, product_scores.c.score).join(
+                ancestors,
+                ancestors.c.category_id == product_scores.c.category_id,
+            ),
+            select(literal(ALL_CATEGORIES).label('category_id'), product_scores.c.product_id, product_scores.c.score),
+        ).subquery('members')
+        ranked = select(
+            members.c.category_id,
+            func.row_number().over(
+                partition_by=members.c.category_id,
+                order_by=(members.c.score.desc(), members.c.product_id),
+            ).label('rank'),
+            members.c.product_id,
+            members.c.score,
+        ).subquery('ranked')
+
+        await session.execute(delete(ProductRankingModel).where(ProductRankingModel.ranking == ranking))
+        await session.execute(
+            insert(ProductRankingModel).from_select(
+                ['ranking', 'category_id', 'rank', 'product_id', 'score'],
+                select(literal(ranking), ranked.c.category_id, ranked.c.rank, ranked.c.product_id, ranked.c.score).where(
+                    ranked.c.rank <= self._top_n,
+                ),
+            ),
+        )
+
+    async def refresh(self) -> bool:
+        """Пересчёт обоих рейтингов и удаление интервалов старше обоих окон; False — пересчёт уже идёт в другом воркере."""
+        async with self._session_factory() as session:
+            if not await session.scalar(RANKINGS_LOCK):
+                return False
+            await self._replace_ranking(session, BESTSELLERS_RANKING, self._bestseller_scores())
+            await self._replace_ranking(session, TRENDING_RANKING, self._trending_scores())
+            retention = max(self._bestsellers_period, self._trending_window)
+            await session.execute(delete(ProductActivityModel).where(ProductActivityModel.bucket < func.now() - retention))
+            await session.commit()
+        return True
+
+    async def run(self) -> None:
+        """Цикл пересчёта рейтингов раз в `interval` секунд."""
+        while True:
+            try:
+                await self.refresh()
+            except (SQLAlchemyError, OSError) as exc:
+                self._logger.warning(f'Product rankings refresh failed: {type(exc).__name__}: {exc}')
+            await asyncio.sleep(self._interval)
@@ -0,0 +1,170 @@
+import asyncio
+import time
+from collections import OrderedDict
+from collections.abc import Sequence
+from datetime import datetime, timedelta
+from logging import Logger
+
+from sqlalchemy import ARRAY, Integer, any_, bindparam, delete, func, select, tuple_
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.exc import SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from src.config import Settings
+from src.models import (
+    Order as OrderModel,
+    OrderItem as OrderItemModel,
+    OrderWatermark as OrderWatermarkModel,
+    ProductCoPurchase as ProductCoPurchaseModel,
+    ProductRecommendation as ProductRecommendationModel,
+)
+from src.schemas import Product as ProductSchema
+from src.services.metrics.prometheus import RECOMMENDATION_ORDERS, record_cache_access
+
+WATERMARK_NAME = 'co_purchases'
+# время заказа — начало транзакции оформления, поэтому заказ может стать видимым позже более нового;
+# заказы моложе этого отставания ждут следующего прохода, чтобы водяной знак их не перескочил
+WATERMARK_LAG = timedelta(minutes=5)
+
+
+class CoPurchaseRecommender:
+    """Инкрементальный пересчёт рекомендаций «часто покупают вместе» по новым заказам.
+
+    Разреженная матрица совместных покупок хранится в `product_co_purchases`: строка — пара товаров
+    и число заказов, где они встретились вместе. Проход берёт до `batch_size` заказов новее водяного
+    знака, добавляет их пары одним `INSERT ... ON CONFLICT` и пересобирает `top_k` соседей только
+    для затронутых товаров. Строка водяного знака блокируется `FOR UPDATE SKIP LOCKED`, поэтому
+    из нескольких воркеров пересчёт в каждый момент выполняет один.
+    """
+
+    def __init__(self, session_factory: async_sessionmaker[AsyncSession], logger: Logger, settings: Settings) -> None:
+        self._session_factory = session_factory
+        self._logger = logger
+        self._batch_size = settings.api_recommendations_batch_size
+        self._top_k = settings.api_recommendations_top_k
+        self._interval = settings.api_recommendations_interval_seconds
+
+    @staticmethod
+    async def _add_co_purchases(session: AsyncSession, order_keys: Sequence[tuple[int, datetime]]) -> list[int]:
+        """Добавление пар товаров из заказов в матрицу; возвращает ID товаров с изменившимися соседями."""
+        items = (
+            select(OrderItemModel.order_id, OrderItemModel.product_id)
+            .where(tuple_(OrderItemModel.order_id, OrderItemModel.order_created_at).in_(order_keys))
+            .distinct()
+            .cte('batch_items')
+        )
+        related = items.alias('related_items')
+        pairs = (
+            select(items.c.product_id, related.c.product_id, func.count())
+            .join(related, (related.c.order_id == items.c.order_id) & (related.c.product_id != items.c.product_id))
+            .group_by(items.c.product_id, related.c.product_id)
+        )
+        statement = insert(ProductCoPurchaseModel).from_select(['product_id', 'related_id', 'orders'], pairs)
+        statement = statement.on_conflict_do_update(
+            index_elements=['product_id', 'related_id'],
+            set_={'orders': ProductCoPurchaseModel.orders + statement.excluded.orders},
+        )
+        result = await session.scalars(statement.returning(ProductCoPurchaseModel.product_id))
+        return sorted(set(result.all()))
+
+    async def _rebuild_top_k(self, session: AsyncSession, product_ids: list[int]) -> None:
+        """Замена сохранённых соседей товаров на `top_k` пар с наибольшим числом совместных заказов."""
+        products = any_(bindparam('product_ids', product_ids, type_=ARRAY(Integer)))
+        await session.execute(delete(ProductRecommendationModel).where(ProductRecommendationModel.product_id == products))
+        ranked = (
+            select(
+                ProductCoPurchaseModel.product_id,
+                func.row_number().over(
+                    partition_by=ProductCoPurchaseModel.product_id,
+                    order_by=(ProductCoPurchaseModel.orders.desc(), ProductCoPurchaseModel.related_id),
+                ).label('rank'),
+                ProductCoPurchaseModel.related_id,
+                ProductCoPurchaseModel.orders,
+            )
+            .where(ProductCoPurchaseModel.product_id == products)
+            .subquery()
+        )
+        await session.execute(
+            insert(ProductRecommendationModel).from_select(
+                ['product_id', 'rank', 'related_id', 'orders'],
+                select(ranked).where(ranked.c.rank <= self._top_k),
+            ),
+        )
+
+    async def process_batch(self) -> int:
+        """Учёт одного пакета заказов новее водяного знака; возвращает количество учтённых заказов."""
+        async with self._session_factory() as session:
+            await session.execute(insert(OrderWatermarkModel).values(name=WATERMARK_NAME).on_conflict_do_nothing())
+            watermark = await session.scalar(
+                select(OrderWatermarkModel).where(OrderWatermarkModel.name == WATERMARK_NAME).with_for_update(skip_locked=True),
+            )
+            if watermark is None:
+                # водяной знак заблокирован пересчётом в другом воркере
+                return 0
+            orders_query = (
+                select(OrderModel.id, OrderModel.created_at)
+                .where(OrderModel.created_at < func.now() - WATERMARK_LAG)
+                .order_by(OrderModel.created_at, OrderModel.id)
+                .limit(self._batch_size)
+            )
+            if watermark.order_created_at is not None:
+                # отдельное условие по ключу секционирования отсекает секции старше водяного знака,
+                # сравнение пар читает индекс `(created_at, id)` с позиции водяного знака
+                orders_query = orders_query.where(
+                    OrderModel.created_at >= watermark.order_created_at,
+                    tuple_(OrderModel.created_at, OrderModel.id) > tuple_(watermark.order_created_at, watermark.order_id),
+                )
+            order_keys = [(order_id, created_at) for order_id, created_at in (await session.execute(orders_query)).all()]
+            if not order_keys:
+                return 0
+
+            product_ids = await self._add_co_purchases(session, order_keys)
+            if product_ids:
+                await self._rebuild_top_k(session, product_ids)
+            watermark.order_id, watermark.order_created_at = order_keys[-1]
+            await session.commit()
+        RECOMMENDATION_ORDERS.inc(len(order_keys))
+        return len(order_keys)
+
+    async def run(self) -> None:
+        """Цикл пересчёта: полные пакеты обрабатываются подряд, иначе пауза `interval`."""
+        while True:
+            try:
+                processed = await self.process_batch()
+            except (SQLAlchemyError, OSError) as exc:
+                self._logger.warning(f'Recommendations update failed: {type(exc).__name__}: {exc}')
+                processed = 0
+            if processed < self._batch_size:
+                await asyncio.sleep(self._interval)
+
+
+class RelatedProductsCache:
+    """LRU-кеш рекомендаций товаров в памяти процесса.
+
+    Рекомендации меняются только при пересчёте, поэтому запись хранится `ttl` секунд:
+    устаревание ограничено этим сроком, при этом повторные запросы карточки не обращаются к базе данных.
+    """
+
+    def __init__(self, max_size: int, ttl: float) -> None:
+        self._max_size = max_size
+        self._ttl = ttl
+        self._entries: OrderedDict[int, tuple[list[ProductSchema], float]] = OrderedDict()
+
+    def get(self, product_id: int) -> list[ProductSchema] | None:
+        """Рекомендации товара из кеша; None — записи нет или она устарела."""
+        entry = self._entries.get(product_id)
+        if entry is not None and time.monotonic() < entry[1]:
+            self._entries.move_to_end(product_id)
+            record_cache_access('related_products', hit=True)
+            return entry[0]
+        record_cache_access('related_products', hit=False)
+        return None
+
+    def put(self, product_id: int, products: list[ProductSchema]) -> None:
+        """Сохранение рекомендаций товара с вытеснением самой давно запрошенной записи."""
+        if self._max_size <= 0:
+            return
+        self._entries[product_id] = (products, time.monotonic() + self._ttl)
+        self._entries.move_to_end(product_id)
+        if len(self._entries) > self._max_size:
+            self._entries.popitem(last=False)
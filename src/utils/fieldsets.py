@@ -0,0 +1,89 @@
+from collections.abc import Callable, Sequence
+from dataclasses import dataclass
+from functools import cache
+from typing import Any
+
+from fastapi import HTTPException, Query, Response, status
+from pydantic import BaseModel, ConfigDict, create_model
+
+FIELDS_DESCRIPTION = 'Поля ответа через запятую; по умолчанию все поля'
+EXPAND_DESCRIPTION = (
+    'Вложенные объекты через запятую. Если передан только `fields`, вложенные объекты не загружаются; '
+    'без обоих параметров возвращается полный ответ'
+)
+
+
+@dataclass(frozen=True)
+class FieldSet:
+    """Запрошенные поля ответа и вложенные объекты."""
+
+    columns: frozenset[str]
+    expand: frozenset[str]
+
+
+def _split_names(value: str, allowed: Sequence[str], parameter: str) -> frozenset[str]:
+    """Разбор списка имён через запятую с проверкой допустимых значений."""
+    names = frozenset(name.strip() for name in value.split(',') if name.strip())
+    unknown = names.difference(allowed)
+    if unknown:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f'Unknown {parameter}: {", ".join(sorted(unknown))}. Allowed: {", ".join(allowed)}',
+        )
+    return names
+
+
+def parse_fieldset(
+    fields: str | None,
+    expand: str | None,
+    columns: Sequence[str],
+    expansions: Sequence[str] = (),
+) -> FieldSet | None:
+    """Разбор параметров `fields` и `expand`; None — параметры не переданы и нужен полный ответ.
+
+    Вложенный путь (`items.product`) включает и все родительские (`items`).
+    """
+    if fields is None and expand is None:
+        return None
+    selected = _split_names(fields, columns, 'fields') if fields is not None else frozenset(columns)
+    if not selected:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail='At least one field must be requested')
+    expanded = _split_names(expand, expansions, 'expand') if expand is not None else frozenset()
+    parents = {path.rsplit('.', 1)[0] for path in expanded if '.' in path}
+    return FieldSet(columns=selected, expand=expanded | parents)
+
+
+def fieldset_query(columns: Sequence[str], expansions: Sequence[str] = ()) -> Callable[..., FieldSet | None]:
+    """Зависимость с параметрами запроса `fields` и `expand` (`expand` — только для ресурсов, имеющих вложенные объекты)."""
+    if not expansions:
+        def columns_dependency(fields: str | None = Query(None, description=FIELDS_DESCRIPTION)) -> FieldSet | None:
+            return parse_fieldset(fields, None, columns)
+        return columns_dependency
+
+    def dependency(
+        fields: str | None = Query(None, description=FIELDS_DESCRIPTION),
+        expand: str | None = Query(None, description=f'{EXPAND_DESCRIPTION}. Допустимые значения: {", ".join(expansions)}'),
+    ) -> FieldSet | None:
+        return parse_fieldset(fields, expand, columns, expansions)
+    return dependency
+
+
+@cache
+def sparse_schema(schema: type[BaseModel], fields: frozenset[str], nested: tuple[tuple[str, Any], ...] = ()) -> type[BaseModel]:
+    """Схема ответа только с полями `fields`; `nested` заменяет типы вложенных полей сокращёнными схемами.
+
+    Схема читает из объекта только свои поля, поэтому не обращается к колонкам и связям,
+    которые не были загружены из базы данных.
+    """
+    annotations = dict(nested)
+    definitions: dict[str, Any] = {
+        name: (annotations.get(name, info.annotation), info)
+        for name, info in schema.model_fields.items()
+        if name in fields
+    }
+    return create_model(f'{schema.__name__}Fields', __config__=ConfigDict(from_attributes=True), **definitions)
+
+
+def sparse_response(schema: type[BaseModel], content: Any) -> Response:
+    """Сериализация ответа по сокращённой схеме в обход `response_model` маршрута."""
+    return Response(content=schema.model_validate(content).model_dump_json(), media_type='application/json')
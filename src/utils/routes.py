@@ -1,8 +1,33 @@
+import re
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from collections.abc import Mapping, Sequence
+from datetime import UTC, date, datetime, timedelta
+from decimal import Decimal
+from typing import Any
+
 import jwt
 from fastapi import HTTPException, status
-from sqlalchemy import select
-from sqlalchemy.orm import selectinload
+from pydantic import BaseModel
+from sqlalchemy import (
+    ARRAY,
+    CTE,
+    ColumnElement,
+    DateTime,
+    Integer,
+    UnaryExpression,
+    any_,
+    bindparam,
+    delete,
+    literal,
+    or_,
+    select,
+    tuple_,
+    update,
+)
+from sqlalchemy.dialects.postgresql import array, insert
+from sqlalchemy.orm import InstrumentedAttribute, aliased, load_only, selectinload
 from sqlalchemy.sql import Select, func
+from sqlalchemy.sql.base import ExecutableOption
 
 from src.dependencies import AsyncDatabaseDep
 from src.models import (
@@ -11,10 +36,50 @@ from src.models import (
     Order as OrderModel,
     OrderItem as OrderItemModel,
     Product as ProductModel,
-    Review as ReviewModel,
+    ProductRanking as ProductRankingModel,
+    ProductStockSlot as ProductStockSlotModel,
+    RevokedToken as RevokedTokenModel,
+    StockReservation as StockReservationModel,
     User as UserModel,
 )
-from src.schemas import CategoryCreate
+from src.schemas import (
+    Cart as CartSchema,
+    CartItem as CartItemSchema,
+    CategoryCreate,
+    FacetCount,
+    Order as OrderSchema,
+    OrderItem as OrderItemSchema,
+    PriceFacetCount,
+    Product as ProductSchema,
+    ProductFacets,
+    ProductRankingRequest,
+)
+from src.schemas.products import ProductFacetName, ProductSort
+from src.services.auth.revocations import RevokedTokens
+from src.services.auth.tokens import decoded_tokens
+from src.services.rankings.products import ALL_CATEGORIES
+from src.utils.fieldsets import FieldSet, sparse_schema
+
+SEARCH_VECTORS = {
+    'english': ProductModel.tsv_en,
+    'russian': ProductModel.tsv_ru,
+}
+CYRILLIC_PATTERN = re.compile(r'[\u0400-\u04ff]')
+LATIN_PATTERN = re.compile(r'[a-z]', flags=re.IGNORECASE)
+PRODUCT_SORT_COLUMNS: dict[ProductSort, tuple[InstrumentedAttribute[Any], bool]] = {
+    'price_asc': (ProductModel.price, False),
+    'price_desc': (ProductModel.price, True),
+    'rating': (ProductModel.rating, True),
+    'created_at': (ProductModel.created_at, True),
+    'popularity': (ProductModel.sales_count, True),
+}
+PRODUCT_COLUMNS = tuple(ProductSchema.model_fields)
+CART_ITEM_COLUMNS = tuple(name for name in CartItemSchema.model_fields if name != 'product')
+CART_ITEM_EXPANSIONS = ('product',)
+ORDER_COLUMNS = tuple(name for name in OrderSchema.model_fields if name != 'items')
+ORDER_EXPANSIONS = ('items', 'items.product')
+ANALYTICS_DEFAULT_DAYS = 30
+PRICE_FACET_BOUNDS = tuple(Decimal(bound) for bound in ('500', '1000', '2500', '5000', '10000', '25000', '50000'))
 
 
 def _build_category_query(category: CategoryCreate | int) -> Select[tuple[CategoryModel]]:
@@ -26,12 +91,18 @@ def _build_category_query(category: CategoryCreate | int) -> Select[tuple[Catego
     )
 
 
-async def _validate_parent_category(category: CategoryCreate | int, database: AsyncDatabaseDep) -> None:
-    """Проверяется наличие родительской категории."""
+async def _validate_parent_category(category: CategoryCreate | int, database: AsyncDatabaseDep, lock: bool = False) -> None:
+    """Проверяется наличие родительской категории.
+
+    Если передан `lock`, строка категории блокируется `FOR SHARE` до конца транзакции: создаваемая запись
+    не окажется активной в категории, которую параллельно отключает каскад.
+    """
     if isinstance(category, CategoryCreate) and category.parent_id is None:
         return
 
     sql_query = _build_category_query(category)
+    if lock:
+        sql_query = sql_query.with_for_update(read=True)
     categories = await database.scalars(sql_query)
     parent_category = categories.first()
     if parent_category is None:
@@ -51,26 +122,421 @@ async def _validate_product_by_id(product_id: int, database: AsyncDatabaseDep) -
     return product_item
 
 
-async def _update_product_rating(product_id: int, database: AsyncDatabaseDep) -> None:
-    """Пересчёт рейтинга товара при добавлении отзыва."""
+def _etag(version: int) -> str:
+    """Значение заголовка `ETag` для версии записи."""
+    return f'"{version}"'
+
+
+async def _update_seller_product(
+    database: AsyncDatabaseDep,
+    product_id: int,
+    seller_id: int,
+    version: int | None,
+    values: Mapping[str, Any],
+) -> ProductModel | None:
+    """Изменение активного товара продавца одним `UPDATE ... RETURNING` с увеличением версии (без commit).
+
+    Тем же запросом проверяются владелец, версия из `If-Match` и активность новой категории;
+    None — условие не выполнено, причину определяет `_product_write_error`. Новая категория блокируется
+    `FOR SHARE` до конца транзакции, поэтому перенос товара не разминётся с каскадным отключением категории.
+    """
+    conditions = [ProductModel.id == product_id, ProductModel.is_active == True, ProductModel.seller_id == seller_id]
+    if version is not None:
+        conditions.append(ProductModel.version == version)
+    if 'category_id' in values:
+        conditions.append(
+            select(CategoryModel.id)
+            .where(CategoryModel.id == values['category_id'], CategoryModel.is_active == True)
+            .with_for_update(read=True)
+            .exists(),
+        )
+    result = await database.scalars(
+        update(ProductModel)
+        .where(*conditions)
+        .values(**values, version=ProductModel.version + 1)
+        .returning(ProductModel)
+        .execution_options(populate_existing=True),
+    )
+    return result.first()
+
+
+async def _product_write_error(
+    database: AsyncDatabaseDep,
+    product_id: int,
+    seller_id: int,
+    version: int | None,
+    action: str,
+) -> HTTPException:
+    """Ошибка неудавшегося изменения товара: 404, 403, 412 или 400 (категория не найдена)."""
     result = await database.execute(
-        select(func.avg(ReviewModel.grade)).where(
-            ReviewModel.product_id == product_id,
-            ReviewModel.is_active == True,
-        ),
+        select(ProductModel.seller_id, ProductModel.version).where(ProductModel.id == product_id, ProductModel.is_active == True),
+    )
+    row = result.first()
+    if row is None:
+        return HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail='Product not found')
+    if row.seller_id != seller_id:
+        return HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail=f'You can only {action} your own products')
+    if version is not None and row.version != version:
+        return HTTPException(
+            status_code=status.HTTP_412_PRECONDITION_FAILED,
+            detail=f'Product was modified: current version is {row.version}',
+        )
+    return HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail='Parent category not found')
+
+
+async def _update_active_category(
+    database: AsyncDatabaseDep,
+    category_id: int,
+    version: int | None,
+    values: Mapping[str, Any],
+) -> CategoryModel | None:
+    """Изменение активной категории одним `UPDATE ... RETURNING` с увеличением версии (без commit).
+
+    Тем же запросом проверяются версия из `If-Match` и активность родительской категории;
+    None — условие не выполнено, причину определяет `_category_write_error`. Родительская категория
+    блокируется `FOR SHARE` до конца транзакции, как и в `_update_seller_product`.
+    """
+    conditions = [CategoryModel.id == category_id, CategoryModel.is_active == True]
+    if version is not None:
+        conditions.append(CategoryModel.version == version)
+    if values.get('parent_id') is not None:
+        parent = aliased(CategoryModel)
+        conditions.append(
+            select(parent.id).where(parent.id == values['parent_id'], parent.is_active == True).with_for_update(read=True).exists(),
+        )
+    result = await database.scalars(
+        update(CategoryModel)
+        .where(*conditions)
+        .values(**values, version=CategoryModel.version + 1)
+        .returning(CategoryModel)
+        .execution_options(populate_existing=True),
+    )
+    return result.first()
+
+
+async def _category_write_error(database: AsyncDatabaseDep, category_id: int, version: int | None) -> HTTPException:
+    """Ошибка неудавшегося изменения категории: 404, 412 или 400 (родительская категория не найдена)."""
+    current_version = await database.scalar(
+        select(CategoryModel.version).where(CategoryModel.id == category_id, CategoryModel.is_active == True),
+    )
+    if current_version is None:
+        return HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail='Category not found')
+    if version is not None and current_version != version:
+        return HTTPException(
+            status_code=status.HTTP_412_PRECONDITION_FAILED,
+            detail=f'Category was modified: current version is {current_version}',
+        )
+    return HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail='Parent category not found')
+
+
+def _category_subtree(category_id: int, active: bool) -> CTE:
+    """Рекурсивный CTE с ID категорий поддерева, активность которых меняется на `active`.
+
+    Отключение обходит активных потомков. Восстановление обходит только потомков, отключённых вместе
+    с предком, поэтому отдельно удалённые подкатегории остаются отключены; корень восстанавливается,
+    только если его родитель активен. `UNION` вместо `UNION ALL` завершает обход и при цикле в дереве.
+    """
+    root = select(CategoryModel.id).where(CategoryModel.id == category_id, CategoryModel.is_active == (not active))
+    children = select(CategoryModel.id).where(CategoryModel.is_active == (not active))
+    if active:
+        parent = aliased(CategoryModel)
+        active_parent = select(parent.id).where(parent.id == CategoryModel.parent_id, parent.is_active == True).exists()
+        root = root.where(or_(CategoryModel.parent_id.is_(None), active_parent))
+        children = children.where(CategoryModel.deactivated_by_cascade == True)
+    subtree = root.cte('category_subtree', recursive=True)
+    return subtree.union(children.where(CategoryModel.parent_id == subtree.c.id))
+
+
+async def _lock_category_subtree(database: AsyncDatabaseDep, category_id: int, active: bool) -> None:
+    """Блокировка категорий поддерева `FOR UPDATE` до конца транзакции.
+
+    Запись, которая переносит товар или категорию в категорию поддерева, держит её `FOR SHARE`, поэтому
+    блокировка дожидается её commit, и следующий запрос со свежим снимком видит перенос. Поддерево
+    перечитывается, пока не перестанет расти: так блокируются и категории, перенесённые в него во время ожидания.
+    """
+    locked: set[int] = set()
+    while True:
+        result = await database.scalars(
+            select(CategoryModel.id)
+            .where(CategoryModel.id.in_(select(_category_subtree(category_id, active).c.id)))
+            .order_by(CategoryModel.id)
+            .with_for_update(of=CategoryModel),
+        )
+        subtree_ids = set(result.all())
+        if subtree_ids <= locked:
+            return
+        locked |= subtree_ids
+
+
+async def _cascade_category_activity(database: AsyncDatabaseDep, category_id: int, active: bool, dry_run: bool) -> tuple[int, int]:
+    """Отключение или восстановление категории с поддеревом и его товарами одним запросом (без commit).
+
+    Категории и товары меняются в CTE одного `UPDATE`-запроса, поэтому чтение видит либо всё поддерево
+    отключённым, либо ни одной его строки. Товары и подкатегории, отключённые каскадом, помечаются
+    `deactivated_by_cascade` — восстановление возвращает только их. Перед изменением поддерево блокируется
+    `_lock_category_subtree`, чтобы снимок запроса включал все параллельные переносы в него. При `dry_run`
+    только считает строки. Возвращает количество категорий (0 — корень не найден или не подходит) и товаров.
+    """
+    subtree_ids = select(_category_subtree(category_id, active).c.id)
+    product_filters = [ProductModel.category_id.in_(subtree_ids), ProductModel.is_active == (not active)]
+    if active:
+        product_filters.append(ProductModel.deactivated_by_cascade == True)
+
+    if dry_run:
+        categories = select(func.count()).select_from(subtree_ids.subquery())
+        products = select(func.count()).select_from(ProductModel).where(*product_filters)
+    else:
+        await _lock_category_subtree(database, category_id, active)
+        updated_categories = (
+            update(CategoryModel)
+            .where(CategoryModel.id.in_(subtree_ids))
+            .values(
+                is_active=active,
+                deactivated_by_cascade=False if active else CategoryModel.id != category_id,
+                version=CategoryModel.version + 1,
+            )
+            .returning(CategoryModel.id)
+            .cte('updated_categories')
+        )
+        updated_products = (
+            update(ProductModel)
+            .where(*product_filters)
+            .values(is_active=active, deactivated_by_cascade=not active, version=ProductModel.version + 1)
+            .returning(ProductModel.id)
+            .cte('updated_products')
+        )
+        categories = select(func.count()).select_from(updated_categories)
+        products = select(func.count()).select_from(updated_products)
+    result = await database.execute(select(categories.scalar_subquery(), products.scalar_subquery()))
+    category_count, product_count = result.one()
+    return category_count, product_count
+
+
+def _build_product_order(sort: ProductSort) -> list[UnaryExpression[Any]]:
+    """Формирование порядка сортировки товаров с добором по ID в том же направлении.
+
+    Одинаковое направление ключа и ID позволяет обслуживать сортировку частичными
+    индексами `(..., ключ, id) WHERE is_active` как прямым, так и обратным сканированием
+    и продолжать выдачу по ключу `(значение, id)`.
+    """
+    column, descending = PRODUCT_SORT_COLUMNS[sort]
+    if descending:
+        return [column.desc(), ProductModel.id.desc()]
+    return [column.asc(), ProductModel.id.asc()]
+
+
+def _detect_search_languages(search_value: str) -> tuple[str, ...]:
+    """Определение языковых конфигураций полнотекстового поиска по алфавиту запроса.
+
+    Запрос только на кириллице ищется по русскому вектору, только на латинице — по английскому.
+    Смешанные запросы и запросы без букв (артикулы, цифры) ищутся по обоим векторам.
+    """
+    has_cyrillic = CYRILLIC_PATTERN.search(search_value) is not None
+    has_latin = LATIN_PATTERN.search(search_value) is not None
+    if has_cyrillic and not has_latin:
+        return ('russian',)
+    if has_latin and not has_cyrillic:
+        return ('english',)
+    return tuple(SEARCH_VECTORS)
+
+
+def _build_search_clauses(
+    search_value: str,
+    languages: Sequence[str] | None = None,
+) -> tuple[ColumnElement[bool], ColumnElement[float]]:
+    """Формирование условия совпадения и ранга для полнотекстового поиска по товарам."""
+    matches: list[ColumnElement[bool]] = []
+    ranks: list[ColumnElement[float]] = []
+    for language in languages or _detect_search_languages(search_value):
+        ts_query = func.websearch_to_tsquery(language, search_value)
+        matches.append(SEARCH_VECTORS[language].op('@@')(ts_query))
+        ranks.append(func.ts_rank_cd(SEARCH_VECTORS[language], ts_query))
+
+    if len(matches) == 1:
+        return matches[0], ranks[0]
+    return or_(*matches), func.greatest(*ranks)
+
+
+async def _collect_product_facets(
+    filters: Sequence[ColumnElement[bool]],
+    facets: Sequence[ProductFacetName],
+    database: AsyncDatabaseDep,
+) -> tuple[ProductFacets, int]:
+    """Подсчёт фасетов и общего количества товаров за один проход по отфильтрованному набору.
+
+    Запрошенные фасеты считаются одним запросом с GROUPING SETS поверх CTE с фильтрами,
+    поэтому полнотекстовое совпадение вычисляется один раз. Каждый фасет разбивает набор
+    целиком, так что общее количество равно сумме по любому из них.
+    """
+    filtered_products = select(
+        ProductModel.category_id.label('category'),
+        ProductModel.seller_id.label('seller'),
+        (ProductModel.stock > 0).label('in_stock'),
+        func.width_bucket(ProductModel.price, array(PRICE_FACET_BOUNDS)).label('price'),
+    ).where(*filters).cte('filtered_products')
+
+    columns = [filtered_products.c[name] for name in dict.fromkeys(facets)]
+    sql_query = select(
+        *columns,
+        *(func.grouping(column).label(f'{column.name}_grouping') for column in columns),
+        func.count().label('count'),
+    ).group_by(func.grouping_sets(*(tuple_(column) for column in columns)))
+    rows = (await database.execute(sql_query)).mappings().all()
+
+    counts: dict[str, list[tuple[int | bool, int]]] = {column.name: [] for column in columns}
+    for row in rows:
+        facet_name = next(name for name in counts if row[f'{name}_grouping'] == 0)
+        counts[facet_name].append((row[facet_name], row['count']))
+
+    result = ProductFacets()
+    for facet_name, values in counts.items():
+        values.sort(key=lambda item: (-item[1], item[0]))
+        if facet_name == 'price':
+            result.price = [
+                PriceFacetCount(
+                    min_price=PRICE_FACET_BOUNDS[bucket - 1] if bucket > 0 else None,
+                    max_price=PRICE_FACET_BOUNDS[bucket] if bucket < len(PRICE_FACET_BOUNDS) else None,
+                    count=count,
+                )
+                for bucket, count in sorted(values)
+            ]
+        else:
+            setattr(result, facet_name, [FacetCount(value=value, count=count) for value, count in values])
+
+    total = sum(count for _, count in next(iter(counts.values())))
+    return result, total
+
+
+async def _get_active_products_by_ids(
+    product_ids: Sequence[int],
+    database: AsyncDatabaseDep,
+    fieldset: FieldSet | None = None,
+) -> tuple[list[ProductModel], list[int]]:
+    """Получение активных товаров по списку ID одним запросом.
+
+    Возвращает найденные товары в порядке запроса (без повторов) и ID, которые не найдены.
+    """
+    unique_ids = list(dict.fromkeys(product_ids))
+    sql_query = (
+        select(ProductModel)
+        .options(*_product_load_options(fieldset))
+        .where(
+            ProductModel.id == any_(bindparam('product_ids', unique_ids, type_=ARRAY(Integer))),
+            ProductModel.is_active == True,
+        )
+    )
+    products = {product.id: product for product in (await database.scalars(sql_query)).all()}
+    found = [products[product_id] for product_id in unique_ids if product_id in products]
+    missing = [product_id for product_id in unique_ids if product_id not in products]
+    return found, missing
+
+
+async def _get_ranked_products(ranking: str, request: ProductRankingRequest, database: AsyncDatabaseDep) -> Sequence[ProductModel]:
+    """Активные товары предрассчитанного рейтинга категории (или всего каталога) в порядке мест."""
+    sql_query = (
+        select(ProductModel)
+        .join(ProductRankingModel, ProductRankingModel.product_id == ProductModel.id)
+        .where(
+            ProductRankingModel.ranking == ranking,
+            ProductRankingModel.category_id == (request.category_id or ALL_CATEGORIES),
+            ProductModel.is_active == True,
+        )
+        .order_by(ProductRankingModel.rank)
+        .limit(request.limit)
+    )
+    return (await database.scalars(sql_query)).all()
+
+
+async def _lock_stock_slots(database: AsyncDatabaseDep, product_id: int) -> int:
+    """Блокировка всех счётчиков остатка товара до конца транзакции; возвращает их сумму."""
+    result = await database.scalars(
+        select(ProductStockSlotModel.stock)
+        .where(ProductStockSlotModel.product_id == product_id)
+        .order_by(ProductStockSlotModel.slot)
+        .with_for_update(),
+    )
+    return sum(result.all())
+
+
+async def _distribute_stock(database: AsyncDatabaseDep, product_id: int, slots: int, stock: int) -> None:
+    """Раскладка остатка товара поровну по `slots` счётчикам (без commit); 0 — счётчики удаляются.
+
+    Прежние счётчики должны быть заблокированы `_lock_stock_slots`.
+    """
+    await database.execute(delete(ProductStockSlotModel).where(ProductStockSlotModel.product_id == product_id))
+    if slots:
+        base, extra = divmod(stock, slots)
+        await database.execute(
+            insert(ProductStockSlotModel),
+            [{'product_id': product_id, 'slot': slot, 'stock': base + (slot < extra)} for slot in range(slots)],
+        )
+
+
+async def _take_slot_stock(database: AsyncDatabaseDep, product_id: int, quantity: int) -> bool:
+    """Списание количества со счётчиков остатка товара (без commit); False — остатка не хватает.
+
+    Обычно списание — один UPDATE случайного незаблокированного счётчика с достаточным остатком
+    (`SKIP LOCKED`), поэтому параллельные заказы одного товара не ждут друг друга. Если такого
+    счётчика нет, блокируются все счётчики товара и количество списывается с нескольких.
+    """
+    free_slot = (
+        select(ProductStockSlotModel.slot)
+        .where(ProductStockSlotModel.product_id == product_id, ProductStockSlotModel.stock >= quantity)
+        .order_by(func.random())
+        .limit(1)
+        .with_for_update(skip_locked=True)
+        .scalar_subquery()
+    )
+    taken = await database.scalar(
+        update(ProductStockSlotModel)
+        .where(ProductStockSlotModel.product_id == product_id, ProductStockSlotModel.slot == free_slot)
+        .values(stock=ProductStockSlotModel.stock - quantity)
+        .returning(ProductStockSlotModel.slot)
+        .execution_options(synchronize_session=False),
+    )
+    if taken is not None:
+        return True
+
+    result = await database.execute(
+        select(ProductStockSlotModel.slot, ProductStockSlotModel.stock)
+        .where(ProductStockSlotModel.product_id == product_id)
+        .order_by(ProductStockSlotModel.slot)
+        .with_for_update(),
     )
-    avg_rating = result.scalar() or 0.0
-    product = await database.get(ProductModel, product_id)
-    if product is not None:
-        product.rating = avg_rating
-        await database.commit()
+    slots = sorted(result.tuples(), key=lambda row: row[1], reverse=True)
+    if sum(stock for _, stock in slots) < quantity:
+        return False
+    for slot, stock in slots:
+        take = min(stock, quantity)
+        await database.execute(
+            update(ProductStockSlotModel)
+            .where(ProductStockSlotModel.product_id == product_id, ProductStockSlotModel.slot == slot)
+            .values(stock=ProductStockSlotModel.stock - take)
+            .execution_options(synchronize_session=False),
+        )
+        quantity -= take
+        if not quantity:
+            break
+    return True
+
+
+def _get_report_period(date_from: date | None, date_to: date | None) -> tuple[date, date]:
+    """Границы периода отчёта: по умолчанию последние `ANALYTICS_DEFAULT_DAYS` дней по UTC."""
+    date_to = date_to or datetime.now(UTC).date()
+    date_from = date_from or date_to - timedelta(days=ANALYTICS_DEFAULT_DAYS - 1)
+    if date_from > date_to:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail='"date_from" cannot be later than "date_to"',
+        )
+    return date_from, date_to
 
 
 async def _get_cart_item(database: AsyncDatabaseDep, user_id: int, product_id: int) -> CartItemModel | None:
     """Поиск товара в корзине текущего пользователя по product_id."""
     result = await database.scalars(
         select(CartItemModel)
-        .options(selectinload(CartItemModel.product))
+        .options(selectinload(CartItemModel.product), selectinload(CartItemModel.reservation))
         .where(
             CartItemModel.user_id == user_id,
             CartItemModel.product_id == product_id,
@@ -79,13 +545,156 @@ async def _get_cart_item(database: AsyncDatabaseDep, user_id: int, product_id: i
     return result.first()
 
 
-async def _load_order_with_items(database: AsyncDatabaseDep, order_id: int) -> OrderModel | None:
-    """Загрузка заказа с товарами."""
+async def _get_available_stock(database: AsyncDatabaseDep, product_ids: Sequence[int], user_id: int) -> dict[int, int]:
+    """Доступный пользователю остаток товаров: остаток за вычетом действующих резервов других пользователей.
+
+    Строки товаров блокируются до конца транзакции (в порядке ID, чтобы избежать взаимоблокировок)
+    и перечитываются в уже загруженные объекты, поэтому резервирование и списание остатков
+    одного товара выполняются последовательно.
+    """
+    products = await database.scalars(
+        select(ProductModel)
+        .where(ProductModel.id.in_(product_ids))
+        .order_by(ProductModel.id)
+        .with_for_update(of=ProductModel)
+        .execution_options(populate_existing=True),
+    )
+    available = {product.id: product.stock for product in products}
+    # резервы читаются отдельным запросом уже после блокировки, чтобы видеть резервы транзакций, завершившихся за время ожидания
+    reserved = await database.execute(
+        select(StockReservationModel.product_id, func.sum(StockReservationModel.quantity))
+        .where(
+            StockReservationModel.product_id.in_(available),
+            StockReservationModel.expires_at > func.now(),
+            StockReservationModel.user_id != user_id,
+        )
+        .group_by(StockReservationModel.product_id),
+    )
+    for product_id, quantity in reserved.tuples():
+        available[product_id] -= quantity
+    return available
+
+
+async def _reserve_stock(database: AsyncDatabaseDep, cart_item: CartItemModel, ttl_seconds: int) -> None:
+    """Резервирование количества позиции корзины на `ttl_seconds` секунд (без commit).
+
+    Резерв позиции заменяется целиком, поэтому изменение количества продлевает его срок.
+    """
+    # новая позиция записывается только после блокировки товара: вставка с внешним ключом на товар
+    # блокирует его строку в режиме KEY SHARE, и параллельные резервирования взаимоблокировались бы
+    with database.no_autoflush:
+        available = await _get_available_stock(database, [cart_item.product_id], cart_item.user_id)
+    if available.get(cart_item.product_id, 0) < cart_item.quantity:
+        raise HTTPException(
+            status_code=status.HTTP_409_CONFLICT,
+            detail=f'Not enough stock for product {cart_item.product_id}',
+        )
+    await database.flush()
+    expires_at = func.now() + timedelta(seconds=ttl_seconds)
+    reservation = insert(StockReservationModel).values(
+        cart_item_id=cart_item.id,
+        user_id=cart_item.user_id,
+        product_id=cart_item.product_id,
+        quantity=cart_item.quantity,
+        expires_at=expires_at,
+    )
+    await database.execute(reservation.on_conflict_do_update(
+        index_elements=['cart_item_id'],
+        set_={'quantity': reservation.excluded.quantity, 'expires_at': reservation.excluded.expires_at},
+    ))
+
+
+def _product_load_options(fieldset: FieldSet | None) -> list[ExecutableOption]:
+    """Загрузка только запрошенных колонок товара."""
+    if fieldset is None:
+        return []
+    return [load_only(*(getattr(ProductModel, name) for name in fieldset.columns))]
+
+
+def _product_list_schema(schema: type[BaseModel], fieldset: FieldSet) -> type[BaseModel]:
+    """Сокращённая схема ответа со списком товаров в поле `items`."""
+    product_schema = sparse_schema(ProductSchema, fieldset.columns)
+    return sparse_schema(schema, frozenset(schema.model_fields), (('items', list[product_schema]),))  # type: ignore[valid-type]
+
+
+def _cart_item_load_options(fieldset: FieldSet) -> list[ExecutableOption]:
+    """Загружаемые колонки позиций корзины, резерв (для `reserved_until`) и, если запрошен, товар."""
+    columns = fieldset.columns - {'reserved_until'}
+    options: list[ExecutableOption] = [load_only(*(getattr(CartItemModel, name) for name in columns or {'id'}))]
+    if 'reserved_until' in fieldset.columns:
+        options.append(selectinload(CartItemModel.reservation))
+    if 'product' in fieldset.expand:
+        options.append(selectinload(CartItemModel.product))
+    return options
+
+
+def _cart_schema(fieldset: FieldSet) -> type[BaseModel]:
+    """Сокращённая схема корзины: итоги корзины и запрошенные поля позиций."""
+    item_fields = fieldset.columns | {'product'} if 'product' in fieldset.expand else fieldset.columns
+    item_schema = sparse_schema(CartItemSchema, item_fields)
+    return sparse_schema(CartSchema, frozenset(CartSchema.model_fields), (('items', list[item_schema]),))  # type: ignore[valid-type]
+
+
+async def _get_cart_totals(database: AsyncDatabaseDep, user_id: int) -> tuple[int, Decimal]:
+    """Количество и стоимость товаров в корзине одним запросом, без загрузки товаров."""
+    result = await database.execute(
+        select(
+            func.coalesce(func.sum(CartItemModel.quantity), 0),
+            func.coalesce(func.sum(CartItemModel.quantity * ProductModel.price), 0),
+        )
+        .join(ProductModel, CartItemModel.product_id == ProductModel.id)
+        .where(CartItemModel.user_id == user_id),
+    )
+    total_quantity, total_price = result.one()
+    return int(total_quantity), Decimal(total_price)
+
+
+def _order_load_options(fieldset: FieldSet | None) -> list[ExecutableOption]:
+    """Загружаемые колонки и связи заказа; без `fieldset` — заказ целиком с позициями и товарами.
+
+    Владелец заказа загружается всегда: по нему проверяется доступ.
+    """
+    if fieldset is None:
+        return [selectinload(OrderModel.items).selectinload(OrderItemModel.product)]
+    columns = [getattr(OrderModel, name) for name in fieldset.columns]
+    options: list[ExecutableOption] = [load_only(OrderModel.user_id, *columns)]
+    if 'items.product' in fieldset.expand:
+        options.append(selectinload(OrderModel.items).selectinload(OrderItemModel.product))
+    elif 'items' in fieldset.expand:
+        options.append(selectinload(OrderModel.items))
+    return options
+
+
+def _order_schema(fieldset: FieldSet) -> type[BaseModel]:
+    """Сокращённая схема заказа по запрошенным полям и вложенным объектам."""
+    if 'items' not in fieldset.expand:
+        return sparse_schema(OrderSchema, fieldset.columns)
+    item_fields = frozenset(OrderItemSchema.model_fields)
+    if 'items.product' not in fieldset.expand:
+        item_fields -= {'product'}
+    item_schema = sparse_schema(OrderItemSchema, item_fields)
+    return sparse_schema(OrderSchema, fieldset.columns | {'items'}, (('items', list[item_schema]),))  # type: ignore[valid-type]
+
+
+def _encode_order_cursor(order: OrderModel) -> str:
+    """Значение курсора пагинации заказов: время создания и ID последнего заказа страницы."""
+    return urlsafe_b64encode(f'{order.created_at.isoformat()},{order.id}'.encode()).decode()
+
+
+def _decode_order_cursor(cursor: str) -> tuple[datetime, int]:
+    """Разбор курсора пагинации заказов."""
+    try:
+        created_at, order_id = urlsafe_b64decode(cursor.encode()).decode().split(',')
+        return datetime.fromisoformat(created_at), int(order_id)
+    except ValueError as exc:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail='Invalid cursor') from exc
+
+
+async def _load_order_with_items(database: AsyncDatabaseDep, order_id: int, fieldset: FieldSet | None = None) -> OrderModel | None:
+    """Загрузка заказа с товарами или только запрошенных колонок и связей."""
     result = await database.scalars(
         select(OrderModel)
-        .options(
-            selectinload(OrderModel.items).selectinload(OrderItemModel.product),
-        )
+        .options(*_order_load_options(fieldset))
         .where(OrderModel.id == order_id),
     )
     return result.first()
@@ -117,15 +726,13 @@ async def _validate_jwt_payload(
     secret_key: str,
     algorithm: str,
     database: AsyncDatabaseDep,
-    type_check: bool = False,
 ) -> UserModel:
-    """Проверяет валидность JWT-токена и наличие активного пользователя в базе данных."""
+    """Проверяет валидность access-токена и наличие активного пользователя в базе данных."""
     try:
-        payload = jwt.decode(token, secret_key, algorithms=[algorithm])
+        payload = decoded_tokens.decode(token, secret_key, algorithm)
         email = payload.get('sub')
-        token_condition = payload.get('token_type').startswith('refresh') if type_check else True
 
-        if email is None or not token_condition:
+        if email is None or payload.get('token_type') != 'access':
             raise CredentialsException(detail='Could not validate token: email or token_type is invalid') from None
     except jwt.ExpiredSignatureError:
         raise CredentialsException(detail='Could not validate token: it has expired') from None
@@ -141,3 +748,50 @@ async def _validate_jwt_payload(
     if user is None:
         raise CredentialsException(detail='Could not validate token: inactive user')
     return user
+
+
+def _decode_refresh_token(token: str, secret_key: str, algorithm: str, revoked_tokens: RevokedTokens) -> dict[str, Any]:
+    """Проверяет подпись, тип и идентификатор refresh-токена и что он не отозван (без обращения к базе данных)."""
+    try:
+        payload = jwt.decode(token, secret_key, algorithms=[algorithm])
+    except jwt.ExpiredSignatureError:
+        raise CredentialsException(detail='Could not validate token: it has expired') from None
+    except jwt.PyJWTError:
+        raise CredentialsException(detail='Could not validate token: payload decoding error') from None
+
+    if payload.get('token_type') != 'refresh' or any(payload.get(claim) is None for claim in ('sub', 'id', 'jti')):
+        raise CredentialsException(detail='Could not validate token: email, token_type or jti is invalid')
+    if payload['jti'] in revoked_tokens:
+        raise CredentialsException(detail='Could not validate token: it has been revoked')
+    return payload
+
+
+async def _revoke_refresh_token(
+    payload: dict[str, Any],
+    database: AsyncDatabaseDep,
+    revoked_tokens: RevokedTokens,
+    active_user_only: bool = True,
+) -> bool:
+    """Отзывает refresh-токен одним запросом, который заодно проверяет пользователя.
+
+    Возвращает False, если токен уже отозван (в том числе параллельным запросом другого воркера)
+    или пользователь не найден либо неактивен.
+    """
+    user_filters = [UserModel.id == payload['id'], UserModel.email == payload['sub']]
+    if active_user_only:
+        user_filters.append(UserModel.is_active == True)
+    expires_at = datetime.fromtimestamp(payload['exp'], UTC)
+    revoked_jti = await database.scalar(
+        insert(RevokedTokenModel)
+        .from_select(
+            ['jti', 'user_id', 'expires_at'],
+            select(literal(payload['jti']), UserModel.id, literal(expires_at, DateTime(timezone=True))).where(*user_filters),
+        )
+        .on_conflict_do_nothing(index_elements=[RevokedTokenModel.jti])
+        .returning(RevokedTokenModel.jti),
+    )
+    await database.commit()
+    if revoked_jti is None:
+        return False
+    revoked_tokens.add(revoked_jti, expires_at.timestamp())
+    return True